@@ -2,44 +2,48 @@
 Input simulator - generates fake visitor positions for testing
 """
 
-import random
 import math
+import numpy as np
 
 class InputSimulator:
     """Simulates mocap input by moving people around the canvas."""
     
-    def __init__(self, canvas_width, canvas_height, num_people=4):
+    def __init__(self, canvas_width, canvas_height, num_people=4, seed=None):
         """
         Initialize input simulator.
         
         Args:
             canvas_width, canvas_height: Canvas dimensions
             num_people: Number of simulated people
+            seed: RNG seed (None = different every run)
         """
         self.canvas_width = canvas_width
         self.canvas_height = canvas_height
+        self.rng = np.random.default_rng(seed)
         self.people = []
         self.dragging_person = None
         
         # Create initial people
         for i in range(num_people):
-            self.people.append({
-                'id': i,
-                'x': random.uniform(200, canvas_width - 200),
-                'y': random.uniform(200, canvas_height - 200),
-                'vx': random.uniform(-20, 20),
-                'vy': random.uniform(-20, 20),
-            })
+            self.people.append(self._new_person(i))
             
+    def _new_person(self, person_id):
+        """Create a person at a random position with a random velocity."""
+        x, y = self.rng.uniform((200, 200), (self.canvas_width - 200, self.canvas_height - 200))
+        vx, vy = self.rng.uniform(-20, 20, 2)
+        return {'id': person_id, 'x': float(x), 'y': float(y), 'vx': float(vx), 'vy': float(vy)}
+        
     def update(self, dt):
         """Update simulated people positions."""
-        for person in self.people:
-            if person == self.dragging_person:
+        # Wander noise for everyone in one draw
+        noise = self.rng.uniform(-10, 10, (len(self.people), 2)).tolist()
+        for person, (nx, ny) in zip(self.people, noise):
+            if person is self.dragging_person:
                 continue
                 
             # Simple wandering movement
-            person['vx'] += random.uniform(-10, 10) * dt
-            person['vy'] += random.uniform(-10, 10) * dt
+            person['vx'] += nx * dt
+            person['vy'] += ny * dt
             
             # Limit speed
             speed = math.sqrt(person['vx']**2 + person['vy']**2)
@@ -94,13 +98,7 @@ class InputSimulator:
     def add_person(self):
         """Add a new person."""
         new_id = max([p['id'] for p in self.people]) + 1 if self.people else 0
-        self.people.append({
-            'id': new_id,
-            'x': random.uniform(200, self.canvas_width - 200),
-            'y': random.uniform(200, self.canvas_height - 200),
-            'vx': random.uniform(-20, 20),
-            'vy': random.uniform(-20, 20),
-        })
+        self.people.append(self._new_person(new_id))
         
     def remove_person(self):
         """Remove a person."""
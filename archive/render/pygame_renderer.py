@@ -39,7 +39,7 @@ class PygameRenderer:
         self.clear()
         
         # Render layers in order (bottom to top)
-        self._render_mycelium(render_data.get('mycelium', []))
+        self._render_mycelium(render_data.get('mycelium'))
         self._render_visitor_trails(render_data.get('visitor_trails', []))
         self._render_dances(render_data.get('dances', []))
         self._render_structures(render_data.get('structures', []))
@@ -51,29 +51,32 @@ class PygameRenderer:
         
     def _render_mycelium(self, mycelium_data):
         """Render mycelial network lines and particles."""
-        for connection in mycelium_data:
-            line = connection['line']
-            alpha = int(line['flow'] * self.intensity * 255 * 0.3)
-            color = (140, 185, 102)
-            
-            # Draw connection line
+        if not mycelium_data:
+            return
+
+        alpha = int(mycelium_data['flow'] * self.intensity * 255 * 0.3)
+        color = (140, 185, 102)
+        
+        # Draw connection lines
+        lines = zip(mycelium_data['x1'], mycelium_data['y1'], mycelium_data['x2'], mycelium_data['y2'])
+        for x1, y1, x2, y2 in lines:
             self._draw_line_alpha(
-                (line['x1'], line['y1']),
-                (line['x2'], line['y2']),
+                (x1, y1),
+                (x2, y2),
                 color,
                 alpha,
                 1
             )
             
-            # Draw flow particles
-            for p in connection['particles']:
-                p_alpha = int(p['alpha'] * self.intensity * 255 * 0.5)
-                self._draw_circle_alpha(
-                    (int(p['x']), int(p['y'])),
-                    4,
-                    color,
-                    p_alpha
-                )
+        # Draw flow particles
+        particles = mycelium_data['particles']
+        for x, y, p_alpha in zip(particles['x'], particles['y'], particles['alpha']):
+            self._draw_circle_alpha(
+                (int(x), int(y)),
+                4,
+                color,
+                int(p_alpha * self.intensity * 255 * 0.5)
+            )
                 
     def _render_visitor_trails(self, trails_data):
         """Render movement trails."""
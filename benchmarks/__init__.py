@@ -0,0 +1,3 @@
+"""
+Benchmark suites for the Biotelia Pollination System
+"""
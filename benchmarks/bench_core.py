@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Biotelia Pollination System - Core Simulation Benchmark
+
+Drives PollinationSystem with synthetic visitors, agents and structures
+and reports, per configuration:
+  - per-frame time distributions of the simulation step and of
+    get_render_data, timed separately
+  - tracemalloc allocation stats (net new blocks per frame, peak memory)
+  - object counts per subsystem (auras, trails, dances, agents, mycelium)
+  - construction time for a few structure layouts (the mycelium
+    neighbour search, including rows of trees)
+
+Results can be saved and compared against a saved baseline; regressions
+above a threshold are flagged and make the run exit with status 1.
+
+Examples:
+  python benchmarks/bench_core.py --save bench/core.json
+  python benchmarks/bench_core.py --baseline bench/core.json --threshold 0.15
+  python benchmarks/bench_core.py --config 200,500,100 --frames 5000
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import config
+from core import PollinationSystem, Clock
+from benchmarks.scenes import grid_structures, row_structures
+from benchmarks.bench_renderer import summarize, git_commit
+
+# Default configurations: (visitors, agents, structures)
+DEFAULT_CONFIGS = [
+    (1, 0, 3),
+    (9, 3, 3),
+    (50, 50, 30),
+    (200, 0, 3),
+    (9, 500, 3),
+    (9, 3, 100),
+    (200, 500, 100),
+]
+
+# Construction benchmarks: (layout, structures); 'row' / 'near_row' are the degenerate layouts
+BUILD_LAYOUTS = [
+    ('grid', 100),
+    ('grid', 400),
+    ('row', 40),
+    ('near_row', 200),
+]
+
+AGENT_TYPES = ('bee', 'butterfly', 'moth')
+
+class SyntheticVisitors:
+    """Seeded random-walk visitors (vectorized)."""
+
+    def __init__(self, count, width, height, seed=0, max_speed=150.0):
+        self.rng = np.random.default_rng(seed)
+        self.width = width
+        self.height = height
+        self.max_speed = max_speed
+        self.pos = self.rng.uniform((0, 0), (width, height), size=(count, 2))
+        self.vel = self.rng.uniform(-max_speed, max_speed, size=(count, 2)) * 0.5
+
+    def step(self, dt):
+        """Advance and return visitor positions (list of {id, x, y})."""
+        self.vel += self.rng.normal(0.0, 200.0, size=self.vel.shape) * dt
+        speed = np.linalg.norm(self.vel, axis=1, keepdims=True)
+        self.vel *= np.minimum(1.0, self.max_speed / np.maximum(speed, 1e-9))
+        self.pos += self.vel * dt
+
+        # Bounce off the walls
+        for axis, limit in ((0, self.width), (1, self.height)):
+            out = (self.pos[:, axis] < 0) | (self.pos[:, axis] > limit)
+            self.vel[out, axis] *= -1
+            np.clip(self.pos[:, axis], 0, limit, out=self.pos[:, axis])
+
+        return [{'id': i, 'x': x, 'y': y} for i, (x, y) in enumerate(self.pos.tolist())]
+
+def build_system(num_visitors, num_agents, num_structures, width, height, seed):
+    """Create a seeded system and visitor source for one configuration."""
+    structures = config.STRUCTURES if num_structures == len(config.STRUCTURES) else grid_structures(num_structures)
+    system = PollinationSystem(width, height, structures_config=structures, mycelium_seed=seed, seed=seed,
+                               clock=Clock('fixed', dt=1.0 / 60.0, start_time=0.0))
+    for i in range(num_agents):
+        system.add_autonomous_agent(AGENT_TYPES[i % len(AGENT_TYPES)])
+    return system, SyntheticVisitors(num_visitors, width, height, seed=seed)
+
+def layout_structures(layout, count):
+    """Structure configs for a construction benchmark layout."""
+    if layout == 'grid':
+        return grid_structures(count)
+    if layout == 'row':
+        return row_structures(count)
+    if layout == 'near_row':
+        return row_structures(count, jitter=0.001)
+    raise ValueError(f"Unknown layout: {layout!r}")
+
+def bench_build(layout, num_structures, repeats, width, height, seed):
+    """Time PollinationSystem construction (dominated by the mycelium build)."""
+    structures = layout_structures(layout, num_structures)
+    build_ms = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        system = PollinationSystem(width, height, structures_config=structures, mycelium_seed=seed, seed=seed,
+                                   clock=Clock('fixed', dt=1.0 / 60.0, start_time=0.0))
+        build_ms.append((time.perf_counter() - start) * 1000.0)
+    return {
+        'layout': layout,
+        'structures': num_structures,
+        'edges': system.mycelial_network.num_connections,
+        'build': summarize(build_ms),
+    }
+
+def object_counts(system):
+    """Count live objects per subsystem."""
+    network = system.mycelial_network
+    return {
+        'auras': len(system.visitor_auras),
+        'auras_colored': sum(1 for a in system.visitor_auras.values() if a.has_color()),
+        'trails': len(system.visitor_trails),
+        'trail_points': sum(len(t.points) for t in system.visitor_trails.values()),
+        'dances': len(system.dances),
+        'dance_particles': sum(len(d.particles) for d in system.dances),
+        'agents': len(system.agents),
+        'agent_trail_points': sum(len(a.trail) for a in system.agents),
+        'mycelium_edges': network.num_connections,
+        'mycelium_particles': len(network.particle_progress),
+    }
+
+def bench_config(num_visitors, num_agents, num_structures, frames, warmup, alloc_frames, width, height, seed):
+    """Benchmark one configuration."""
+    system, visitors = build_system(num_visitors, num_agents, num_structures, width, height, seed)
+    dt = 1.0 / 60.0
+
+    step_ms = []
+    render_ms = []
+    peak_counts = {}
+
+    for i in range(warmup + frames):
+        positions = visitors.step(dt)
+        start = time.perf_counter()
+        system.step(positions, dt)
+        step_done = time.perf_counter()
+        system.get_render_data(positions)
+        end = time.perf_counter()
+
+        if i >= warmup:
+            step_ms.append((step_done - start) * 1000.0)
+            render_ms.append((end - step_done) * 1000.0)
+            if i % 50 == 0:
+                for key, value in object_counts(system).items():
+                    peak_counts[key] = max(peak_counts.get(key, 0), value)
+
+    # Allocation pass (tracemalloc slows everything down, so it runs separately)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    for _ in range(alloc_frames):
+        positions = visitors.step(dt)
+        system.update(positions, dt)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    net_blocks = sum(s.count_diff for s in stats)
+    net_bytes = sum(s.size_diff for s in stats)
+    top = sorted(stats, key=lambda s: -abs(s.size_diff))[:5]
+
+    return {
+        'visitors': num_visitors,
+        'agents': num_agents,
+        'structures': num_structures,
+        'frames': frames,
+        'step': summarize(step_ms),
+        'render_data': summarize(render_ms),
+        'total': summarize(np.add(step_ms, render_ms)),
+        'allocations': {
+            'frames': alloc_frames,
+            'net_blocks_per_frame': net_blocks / max(alloc_frames, 1),
+            'net_bytes_per_frame': net_bytes / max(alloc_frames, 1),
+            'peak_kib': peak / 1024.0,
+            'top_files': [{'file': str(s.traceback), 'size_diff': s.size_diff, 'count_diff': s.count_diff}
+                          for s in top],
+        },
+        'objects_final': object_counts(system),
+        'objects_peak': peak_counts,
+    }
+
+def config_key(result):
+    if 'layout' in result:
+        return f"build_{result['layout']}_s{result['structures']}"
+    return f"v{result['visitors']}_a{result['agents']}_s{result['structures']}"
+
+def compare_baseline(results, builds, baseline_path, threshold):
+    """
+    Compare median and p95 frame times against a saved baseline.
+
+    Returns:
+        List of regression descriptions
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old = {config_key(r): r for r in baseline['results'] + baseline.get('builds', [])}
+    regressions = []
+    print(f"\nComparison with {baseline_path} ({baseline['meta'].get('commit')}), threshold +{threshold:.0%}:")
+    for r in results + builds:
+        key = config_key(r)
+        if key not in old:
+            print(f"  {key:>18}: (not in baseline)")
+            continue
+        for section in (('build',) if 'layout' in r else ('step', 'render_data')):
+            for stat in ('median_ms', 'p95_ms'):
+                before = old[key][section][stat]
+                after = r[section][stat]
+                change = (after - before) / before if before > 0 else 0.0
+                flag = ""
+                if change > threshold:
+                    flag = "  ← REGRESSION"
+                    regressions.append(f"{key} {section} {stat}: {before:.3f} -> {after:.3f} ms ({change:+.0%})")
+                print(f"  {key:>18} {section:>11} {stat:>9}: {before:8.3f} -> {after:8.3f} ms ({change:+6.1%}){flag}")
+    return regressions
+
+def parse_config(text):
+    visitors, agents, structures = (int(v) for v in text.split(','))
+    return visitors, agents, structures
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PollinationSystem.update and get_render_data.")
+    parser.add_argument('--config', type=parse_config, action='append',
+                        help="visitors,agents,structures (repeatable; default: built-in set)")
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--alloc-frames', type=int, default=200, help="Frames traced with tracemalloc")
+    parser.add_argument('--build-repeats', type=int, default=5, help="Constructions timed per build layout")
+    parser.add_argument('--resolution', choices=['test', 'production'], default='production')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help="Write results JSON (e.g. a new baseline)")
+    parser.add_argument('--baseline', help="Saved results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative slow-down flagged as a regression (default 0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.resolution == 'production':
+        width, height = config.PRODUCTION_WIDTH, config.PRODUCTION_HEIGHT
+    else:
+        width, height = config.TEST_WIDTH, config.TEST_HEIGHT
+
+    results = []
+    for num_visitors, num_agents, num_structures in (args.config or DEFAULT_CONFIGS):
+        r = bench_config(num_visitors, num_agents, num_structures, args.frames, args.warmup,
+                         args.alloc_frames, width, height, args.seed)
+        results.append(r)
+        objects = r['objects_peak']
+        print(f"{config_key(r):>18}: step median {r['step']['median_ms']:7.3f} ms p99 {r['step']['p99_ms']:7.3f}  "
+              f"render_data median {r['render_data']['median_ms']:7.3f} ms p99 {r['render_data']['p99_ms']:7.3f}  "
+              f"alloc {r['allocations']['net_blocks_per_frame']:+.1f} blocks/frame  "
+              f"peak trails {objects.get('trail_points', 0)} dances {objects.get('dances', 0)}")
+
+    builds = []
+    for layout, num_structures in BUILD_LAYOUTS:
+        r = bench_build(layout, num_structures, args.build_repeats, width, height, args.seed)
+        builds.append(r)
+        print(f"{config_key(r):>18}: build median {r['build']['median_ms']:7.3f} ms max {r['build']['max_ms']:7.3f}  "
+              f"edges {r['edges']}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump({
+                'meta': {
+                    'commit': git_commit(),
+                    'date': datetime.datetime.now().isoformat(timespec='seconds'),
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'platform': platform.platform(),
+                    'frames': args.frames,
+                    'resolution': args.resolution,
+                    'seed': args.seed,
+                },
+                'results': results,
+                'builds': builds,
+            }, f, indent=2)
+        print(f"\n✓ Results written to {args.save}")
+
+    if args.baseline:
+        regressions = compare_baseline(results, builds, args.baseline, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) above +{args.threshold:.0%}")
+            return 1
+        print("\n✓ No regressions")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
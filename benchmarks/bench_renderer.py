@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Biotelia Pollination System - Renderer Benchmark
+
+Times every stage of improved_rendering's cook (background fill, each
+render layer, final composite and output encode) on the canonical scenes
+at test and production resolution, and writes median / p95 / p99 per
+stage to a JSON file for comparison across commits.
+
+Examples:
+  python benchmarks/bench_renderer.py --out bench/renderer.json
+  python benchmarks/bench_renderer.py --scenes crowd_9 dance_storm --resolutions production
+  python benchmarks/bench_renderer.py --out bench/new.json --compare bench/old.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import config
+import improved_rendering
+from rendering.output import OutputEncoder
+from benchmarks.scenes import SCENES, RESOLUTIONS, build_scene
+
+def summarize(samples_ms):
+    """Median / p95 / p99 / mean / max of a list of milliseconds."""
+    a = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        'median_ms': float(np.median(a)),
+        'p95_ms': float(np.percentile(a, 95)),
+        'p99_ms': float(np.percentile(a, 99)),
+        'mean_ms': float(a.mean()),
+        'max_ms': float(a.max()),
+    }
+
+def git_commit():
+    """Current git commit hash of the project (or None)."""
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=root,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+def bench_scene(scene, width, height, iterations, warmup, cached, output_format):
+    """
+    Time the renderer stages on one scene.
+
+    Returns:
+        Result dict with per-stage summaries, total cook summary and splat counts
+    """
+    render_data, _ = build_scene(scene, width, height)
+    stack = improved_rendering.build_layer_stack(config, rates=None if cached else {})
+    encoder = OutputEncoder(output_format, config.OUTPUT_DITHER)
+    canvas = np.empty((height, width, 3), dtype=np.float32)
+
+    stage_names = ['background'] + [layer.name for layer in stack.layers] + ['composite', 'encode']
+    samples = {name: [] for name in stage_names}
+    totals = []
+
+    for i in range(warmup + iterations):
+        flow_time = 100.0 + i / 60.0
+
+        start = time.perf_counter()
+        improved_rendering.fill_background(canvas)
+        background_done = time.perf_counter()
+        stack.render(canvas, render_data, flow_time)
+        render_done = time.perf_counter()
+        encoder.encode(canvas)
+        end = time.perf_counter()
+
+        if i < warmup:
+            continue
+        timings = stack.get_timings()
+        samples['background'].append((background_done - start) * 1000.0)
+        for layer in stack.layers:
+            samples[layer.name].append(timings[layer.name]['ms'])
+        samples['composite'].append(timings['composite_ms'])
+        samples['encode'].append((end - render_done) * 1000.0)
+        totals.append((end - start) * 1000.0)
+
+    return {
+        'scene': scene,
+        'width': width,
+        'height': height,
+        'stages': {name: summarize(samples[name]) for name in stage_names},
+        'total': summarize(totals),
+        'splats': stack.get_cull_stats(),
+    }
+
+def compare(results, baseline_path):
+    """Print total median cook time against a previous results file."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old = {(r['scene'], r['resolution']): r for r in baseline['results']}
+    print(f"\nComparison with {baseline_path} ({baseline['meta'].get('commit')}):")
+    for r in results:
+        key = (r['scene'], r['resolution'])
+        if key not in old:
+            continue
+        before = old[key]['total']['median_ms']
+        after = r['total']['median_ms']
+        print(f"  {key[0]:>14} {key[1]:>10}: {before:8.1f} -> {after:8.1f} ms  ({after / before:5.2f}x)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark improved_rendering stages on canonical scenes.")
+    parser.add_argument('--scenes', nargs='+', choices=sorted(SCENES), default=list(SCENES))
+    parser.add_argument('--resolutions', nargs='+', choices=sorted(RESOLUTIONS), default=['test', 'production'])
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--cached', action='store_true',
+                        help="Use config.LAYER_RATES (default: every layer redraws every frame)")
+    parser.add_argument('--output-format', choices=['uint8', 'float16', 'float32'], default=config.OUTPUT_FORMAT)
+    parser.add_argument('--out', default='bench/renderer.json', help="Results JSON path")
+    parser.add_argument('--compare', help="Previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    results = []
+    for resolution in args.resolutions:
+        width, height = RESOLUTIONS[resolution]
+        for scene in args.scenes:
+            result = bench_scene(scene, width, height, args.iterations, args.warmup,
+                                 args.cached, args.output_format)
+            result['resolution'] = resolution
+            results.append(result)
+
+            total = result['total']
+            print(f"{scene:>14} {resolution:>10}: median {total['median_ms']:7.1f} ms  "
+                  f"p95 {total['p95_ms']:7.1f}  p99 {total['p99_ms']:7.1f}")
+            slowest = sorted(result['stages'].items(), key=lambda kv: -kv[1]['median_ms'])[:3]
+            print("                 slowest: " +
+                  ", ".join(f"{name} {s['median_ms']:.1f}" for name, s in slowest))
+
+    output = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'iterations': args.iterations,
+            'cached_layers': args.cached,
+            'output_format': args.output_format,
+        },
+        'results': results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"\n✓ Results written to {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""
+Canonical scenes - Deterministic render_data for renderer benchmarks and comparisons
+"""
+
+import math
+import numpy as np
+import config
+from core import PollinationSystem, PollinationDance, Clock
+
+# Scene name -> description (see build_scene)
+SCENES = {
+    'empty': "Empty room: 3 trees, no visitors",
+    'visitor_1': "1 visitor carrying a colour with a half-length trail",
+    'crowd_9': "9 visitors with full 80-point trails",
+    'dance_storm': "3 visitors and 24 overlapping pollination dances",
+    'structures_3': "3 trees, 3 visitors, 3 agents",
+    'structures_30': "30 trees, 3 visitors, 3 agents",
+}
+
+RESOLUTIONS = {
+    'test': (config.TEST_WIDTH, config.TEST_HEIGHT),
+    'production': (config.PRODUCTION_WIDTH, config.PRODUCTION_HEIGHT),
+}
+
+def grid_structures(count, radius=180):
+    """Structures spread on a jittered grid (normalized positions)."""
+    colors = list(config.STRUCTURE_COLORS.values())
+    cols = int(math.ceil(math.sqrt(count)))
+    rows = int(math.ceil(count / cols))
+    rng = np.random.default_rng(30)
+    structures = []
+    for i in range(count):
+        cx = (i % cols + 0.5) / cols + rng.uniform(-0.2, 0.2) / cols
+        cy = (i // cols + 0.5) / rows + rng.uniform(-0.2, 0.2) / rows
+        structures.append({'id': i, 'x': cx, 'y': cy, 'radius': radius, 'color': colors[i % len(colors)]})
+    return structures
+
+def row_structures(count, radius=180, jitter=0.0):
+    """
+    Structures in one horizontal row (normalized positions) - the degenerate
+    layout for the mycelium neighbour search. `jitter` offsets each
+    structure vertically by up to that fraction of the height.
+    """
+    colors = list(config.STRUCTURE_COLORS.values())
+    rng = np.random.default_rng(31)
+    structures = []
+    for i in range(count):
+        cy = 0.5 + (rng.uniform(-jitter, jitter) if jitter else 0.0)
+        structures.append({'id': i, 'x': (i + 0.5) / count, 'y': cy, 'radius': radius,
+                           'color': colors[i % len(colors)]})
+    return structures
+
+def _visitor_positions(count, width, height):
+    """Visitors spread across the floor (deterministic)."""
+    visitors = []
+    for i in range(count):
+        angle = i * 2.399  # Golden angle
+        r = 0.15 + 0.3 * ((i * 0.618) % 1.0)
+        visitors.append({
+            'id': i,
+            'x': width * (0.5 + r * math.cos(angle)),
+            'y': height * (0.5 + r * math.sin(angle)),
+        })
+    return visitors
+
+def _fill_trail(trail, visitor, color, num_points, collected_time):
+    """Give a trail `num_points` points along a curve ending at the visitor."""
+    trail.aura.collect_color(color, collected_time)  # Fixed pulse phase
+    trail.points = []
+    for k in range(num_points):
+        back = num_points - k  # Distance (in points) behind the visitor
+        angle = back * 0.08 + visitor['id']
+        trail.points.append({
+            'x': visitor['x'] - back * 9 * math.cos(angle),
+            'y': visitor['y'] - back * 9 * math.sin(angle),
+            'color': np.array(color, dtype=np.uint8),
+            'life': max(0.05, 1.0 - back / (num_points + 1)),
+            'max_life': 1.0,
+            'time': back * 0.1,
+        })
+    trail.last_position = (visitor['x'], visitor['y'])
+
+def build_scene(name, width, height, current_time=100.0):
+    """
+    Build a canonical scene.
+
+    Args:
+        name: Scene name (key of SCENES)
+        width, height: Canvas size in pixels
+        current_time: Timestamp passed to get_render_data
+
+    Returns:
+        (render_data, system) - render_data as produced by
+        PollinationSystem.get_render_data()
+    """
+    if name not in SCENES:
+        raise KeyError(f"Unknown scene '{name}', expected one of {sorted(SCENES)}")
+
+    structures = grid_structures(30) if name == 'structures_30' else config.STRUCTURES
+    # Fixed clock whose first tick lands on current_time
+    clock = Clock('fixed', dt=1.0 / 60.0, start_time=current_time - 1.0 / 60.0)
+    system = PollinationSystem(width, height, structures_config=structures, mycelium_seed=config.MYCELIUM_SEED, seed=0,
+                               clock=clock)
+
+    num_visitors = {'empty': 0, 'visitor_1': 1, 'crowd_9': 9}.get(name, 3)
+    trail_points = config.TRAIL_MAX_POINTS // 2 if name == 'visitor_1' else config.TRAIL_MAX_POINTS
+    visitors = _visitor_positions(num_visitors, width, height)
+    colors = list(config.STRUCTURE_COLORS.values())
+
+    # One update creates auras/trails, then give every visitor a colour and a trail
+    system.update(visitors)
+    for v in visitors:
+        _fill_trail(system.visitor_trails[v['id']], v, colors[v['id'] % len(colors)], trail_points,
+                    current_time - 1.0 - v['id'] * 0.3)
+
+    if name in ('structures_3', 'structures_30'):
+        for agent_type in ('bee', 'butterfly', 'moth'):
+            agent = system.add_autonomous_agent(agent_type)
+            agent.collect_color(colors[agent.id % len(colors)], current_time - 0.5 - agent.id * 0.4)
+
+    if name == 'dance_storm':
+        for k in range(24):
+            s = system.structures[k % len(system.structures)]
+            dance = PollinationDance(s.x, s.y, colors[k % 3], colors[(k + 1) % 3], structure_radius=s.radius,
+                                    rng=system.rng.stream('dances'))
+            dance.update(k * 0.08)  # Spread the dances over their lifetime
+            system.dances.append(dance)
+
+    return system.get_render_data(visitors, current_time), system
@@ -50,11 +50,30 @@ DEFAULT_HEIGHT = PRODUCTION_HEIGHT if USE_PRODUCTION_RESOLUTION else TEST_HEIGHT
 
 # Mocap Integration Settings
 USE_MOCAP_INPUT = False  # Set to True to use OSC mocap instead of mouse/autonomous agents
-MAX_VISITORS = 9  # 3 robot pollinators + 6 humans
+MAX_VISITORS = 9  # Initial recorder slots (mocap pNx/pNy channels are discovered, any count works)
+MOCAP_RESCAN_FRAMES = 120  # Frames between full rescans of the mocap CHOP's channel names
+
+# Mocap session recording (binary columnar log of visitor positions, see ingest/recorder.py)
+MOCAP_RECORD = False  # Start recording when the system initializes
+MOCAP_RECORD_DIR = 'recordings'  # Relative to the project folder
+MOCAP_RECORD_COMPRESS = True  # zlib-compress chunks (written on a background thread)
+
+# State snapshots (warm restart after a DAT reload or TD restart)
+SNAPSHOT_PATH = 'snapshots/state.bsnp'  # Relative to the project folder
+SNAPSHOT_INTERVAL = 10.0  # Seconds between snapshots (0 = only at shutdown)
+SNAPSHOT_RESTORE = True  # Restore the snapshot when the system initializes
+SNAPSHOT_MAX_AGE = 900.0  # Ignore older snapshots (seconds; None = any age)
+
+# Hot reload (live tuning during rehearsals; keep off for shows)
+HOT_RELOAD = False  # Reload core/ and config.py when their files change
+HOT_RELOAD_INTERVAL = 0.5  # Seconds between file checks
+HOT_RELOAD_BUDGET_MS = 4.0  # Reload work per frame (spread over frames)
+
 OSC_PORT = 9000  # Default OSC port for mocap data
 OSC_CHANNEL_PATTERN = 'p{id}x'  # Pattern: p0x, p0y, p1x, p1y, etc.
 
 # Mocap coordinate mapping
+MOCAP_CALIBRATION = 'calibration.json'  # Fitted tracker -> canvas transform (tools/calibrate_mocap.py); unused if missing
 MOCAP_X_MIN = 0.0  # Minimum X value from mocap system
 MOCAP_X_MAX = 1.0  # Maximum X value from mocap system
 MOCAP_Y_MIN = 0.0  # Minimum Y value from mocap system
@@ -62,6 +81,10 @@ MOCAP_Y_MAX = 1.0  # Maximum Y value from mocap system
 
 # Settings
 TARGET_FPS = 60
+CLOCK_MODE = 'real'  # 'real' (wall clock, measured dt) or 'fixed' (1/TARGET_FPS steps, frame-exact)
+SIM_FIXED_STEP = True  # Step the simulation at SIM_HZ whatever the render rate (overrides CLOCK_MODE)
+SIM_HZ = 60  # Simulation steps per second (render data interpolated between steps)
+SIM_MAX_CATCHUP = 4  # Most steps per rendered frame; time beyond it is dropped
 INTENSITY = 0.7
 SPEED = 2.0  # Increased for better visibility
 
@@ -75,3 +98,59 @@ TRAIL_MAX_POINTS = 80
 TRAIL_MIN_DISTANCE = 8
 TRAIL_FADE_RATE = 0.15
 TRAIL_POINT_SIZE = 6
+
+# Output settings (overridden by settings_control 'Outputformat' / 'Dither' if present)
+OUTPUT_FORMAT = 'uint8'  # 'uint8' (8-bit projector signal), 'float16' or 'float32' (legacy)
+OUTPUT_DITHER = True  # Ordered dithering for uint8 output (avoids banding in dark gradients)
+
+# Projection warp (keystone / lens correction as the renderer's last stage, see rendering/warp.py)
+WARP_ENABLED = False  # Overridden by settings_control 'Warp' if present
+WARP_CALIBRATION = 'warp.json'  # Corner pins or mesh, next to config.py; no warp if missing
+WARP_INTERPOLATION = 'nearest'  # 'nearest' (one gather per pixel) or 'bilinear' (smoother, ~4x the cost)
+WARP_CHECK_INTERVAL = 1.0  # Seconds between checks for an edited calibration file (table rebuilt on change)
+
+# Multi-projector tiling (see rendering/tiles.py); the floor canvas grows to cover the grid
+TILE_COLUMNS = 1  # Projectors across the floor (1 x 1 = single output)
+TILE_ROWS = 1  # Projectors down the floor
+TILE_OVERLAP = 240  # Pixels shared by neighbouring projectors (soft-edge blend zone)
+TILE_BLEND_GAMMA = 2.2  # Projector gamma for the blend ramps
+TILE_WORKERS = True  # One render process per projector (False = tiles rendered in turn in TD's process)
+TILE_PYTHON = None  # Worker interpreter (inside TD: path to a standalone Python with numpy)
+
+# Distributed rendering (see net/): one node simulates and publishes render data, render nodes draw it
+NODE_ROLE = 'standalone'  # 'standalone', 'publisher' (simulate + broadcast) or 'render' (draw received frames)
+BROADCAST_MODE = 'state'  # 'state' (render data every frame) or 'lockstep' (inputs only; every node simulates)
+BROADCAST_TRANSPORT = 'udp'  # 'udp' (multicast, lossy - recovers at keyframes) or 'tcp' (one stream per render node)
+BROADCAST_ADDRESS = '239.0.0.42'  # UDP: multicast group; TCP: the publisher's address (render nodes only)
+BROADCAST_PORT = 9100
+BROADCAST_KEYFRAME_INTERVAL = 30  # Frames between full frames (others are deltas against the previous frame)
+LOCKSTEP_HASH_INTERVAL = 60  # Frames between state hash checks in lockstep mode (a few ms each on busy floors)
+
+# Render layer update rates in Hz (layers not listed redraw every frame)
+# Slow layers redraw into a cached buffer that is composited every frame
+LAYER_RATES = {
+    'ripples': 20,
+    'mycelium': 30,
+    'trees': 30,
+}
+LAYER_STAGGER = True  # Offset slow layers' redraws across frames to flatten frame-time spikes
+
+# Splat culling (before any pixel work)
+CULL_ENABLED = True
+CULL_MIN_CONTRIBUTION = 0.001  # Drop splats adding less than this (0-1) to their brightest channel
+
+# Frame profiler (per-subsystem span timings, see PollinationSystem.get_profile()
+# and improved_rendering.get_frame_profile())
+PROFILE_FRAMES = 600  # Frames kept in the rolling window (0 = disabled)
+
+# Latency test marker for photodiode measurement (overridden by settings_control 'Latencyflash')
+LATENCY_FLASH = 'off'  # 'off', 'periodic' (square wave) or 'input' (lit while a visitor is past the trigger line)
+LATENCY_FLASH_PERIOD = 1.0  # Seconds per on/off cycle in 'periodic' mode
+LATENCY_FLASH_TRIGGER_X = 0.5  # Trigger line in 'input' mode (0-1 of canvas width)
+LATENCY_FLASH_SIZE = 64  # Marker square size in pixels (bottom-right corner)
+
+# Mycelial network
+MYCELIUM_SEED = 0  # Fixed seed so the network layout is reproducible
+
+# Simulation seed (agents and dances) - stored in mocap sessions for deterministic replay
+SIMULATION_SEED = 0
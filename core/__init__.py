@@ -9,6 +9,12 @@ from .agent import AutonomousAgent
 from .structure import Structure
 from .mycelium import MycelialNetwork
 from .system import PollinationSystem
+from .profiler import FrameProfiler
+from .latency import LatencyTracker
+from .rng import RNGService
+from .clock import Clock
+from .stepper import FixedTimestepper
+from .reload import ReloadManager
 
 __all__ = [
     'VisitorAura',
@@ -18,4 +24,10 @@ __all__ = [
     'Structure',
     'MycelialNetwork',
     'PollinationSystem',
+    'FrameProfiler',
+    'LatencyTracker',
+    'RNGService',
+    'Clock',
+    'FixedTimestepper',
+    'ReloadManager',
 ]
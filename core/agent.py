@@ -4,8 +4,6 @@ AutonomousAgent - Bees, butterflies, and moths that pollinate independently
 
 import numpy as np
 import math
-import random
-import time
 
 class AutonomousAgent:
     """
@@ -13,7 +11,8 @@ class AutonomousAgent:
     collects colors from structures, and leaves trails.
     """
     
-    def __init__(self, agent_id, agent_type, structures, start_x=None, start_y=None, canvas_size=(1920, 1080)):
+    def __init__(self, agent_id, agent_type, structures, start_x=None, start_y=None, canvas_size=(1920, 1080),
+                 rng=None):
         """
         Initialize autonomous pollinator.
         
@@ -23,15 +22,17 @@ class AutonomousAgent:
             structures: List of Structure objects
             start_x, start_y: Starting position (random if None)
             canvas_size: (width, height) for boundary checking
+            rng: numpy Generator (e.g. RNGService.stream('agents'); default: unseeded)
         """
+        self.rng = rng if rng is not None else np.random.default_rng()
         self.id = agent_id
         self.type = agent_type
         self.structures = structures
         self.canvas_width, self.canvas_height = canvas_size
         
         # Position and movement
-        self.x = start_x if start_x is not None else random.uniform(100, canvas_size[0] - 100)
-        self.y = start_y if start_y is not None else random.uniform(100, canvas_size[1] - 100)
+        self.x = start_x if start_x is not None else float(self.rng.uniform(100, canvas_size[0] - 100))
+        self.y = start_y if start_y is not None else float(self.rng.uniform(100, canvas_size[1] - 100))
         self.target_structure = None
         self.state = 'flying'  # 'flying' or 'collecting'
         self.state_timer = 0.0
@@ -74,15 +75,15 @@ class AutonomousAgent:
         """Pick a random structure to fly toward."""
         if not self.structures:
             return
-        self.target_structure = random.choice(self.structures)
+        self.target_structure = self.structures[self.rng.integers(len(self.structures))]
         self.state = 'flying'
-        self.state_timer = random.uniform(3, 8)
+        self.state_timer = float(self.rng.uniform(3, 8))
         
-    def collect_color(self, color):
+    def collect_color(self, color, timestamp):
         """Collect color from structure (same as visitors)."""
         self.current_color = np.array(color, dtype=np.uint8).copy()
         self.glow_intensity = 1.0
-        self.collected_time = time.time()
+        self.collected_time = timestamp
         
     def update(self, dt, current_time, speed_multiplier=0.6):
         """
@@ -116,7 +117,7 @@ class AutonomousAgent:
             # Arrived at structure?
             if distance < 30:
                 self.state = 'collecting'
-                self.state_timer = random.uniform(1, 2)
+                self.state_timer = float(self.rng.uniform(1, 2))
                 
         elif self.state == 'collecting':
             # Circle around structure
@@ -142,7 +143,7 @@ class AutonomousAgent:
                             'radius': self.target_structure.radius
                         }
 
-                self.collect_color(new_color)
+                self.collect_color(new_color, current_time)
                 self._pick_new_target()
                 
         # Keep in bounds
@@ -191,6 +192,48 @@ class AutonomousAgent:
             point['life'] -= dt * 0.15
         self.trail = [p for p in self.trail if p['life'] > 0]
         
+    def get_state(self):
+        """Agent state for snapshots: trail as parallel arrays (see core.snapshot)."""
+        trail = self.trail
+        return {
+            'type': self.type,
+            'x': self.x,
+            'y': self.y,
+            'target': None if self.target_structure is None else self.structures.index(self.target_structure),
+            'state': self.state,
+            'state_timer': self.state_timer,
+            'color': None if self.current_color is None else self.current_color.tolist(),
+            'glow_intensity': self.glow_intensity,
+            'collected_time': self.collected_time,
+            'last_trail_position': None if self.last_trail_position is None else list(self.last_trail_position),
+            'trail_x': np.array([p['x'] for p in trail], dtype=np.float64),
+            'trail_y': np.array([p['y'] for p in trail], dtype=np.float64),
+            'trail_life': np.array([p['life'] for p in trail], dtype=np.float64),
+            'trail_color': np.array([p['color'] for p in trail], dtype=np.uint8).reshape(-1, 3),
+        }
+
+    def set_state(self, state):
+        """Restore state saved by get_state() (the agent type is set at construction)."""
+        self.x = state['x']
+        self.y = state['y']
+        target = state['target']
+        self.target_structure = None if target is None else self.structures[target]
+        self.state = state['state']
+        self.state_timer = state['state_timer']
+        color = state['color']
+        self.current_color = None if color is None else np.array(color, dtype=np.uint8)
+        self.glow_intensity = state['glow_intensity']
+        self.collected_time = state['collected_time']
+        last = state['last_trail_position']
+        self.last_trail_position = None if last is None else tuple(last)
+        self.last_pollination = None
+        self.trail = [
+            {'x': x, 'y': y, 'color': np.array(color, dtype=np.uint8), 'life': life}
+            for x, y, color, life in zip(
+                state['trail_x'].tolist(), state['trail_y'].tolist(),
+                state['trail_color'].tolist(), state['trail_life'].tolist())
+        ]
+
     def get_render_data(self, current_time):
         """Get data for rendering this agent."""
         trail_data = []
@@ -3,7 +3,6 @@ VisitorAura - Bioluminescent glow around visitors carrying tree colors
 """
 
 import numpy as np
-import time
 import math
 
 class VisitorAura:
@@ -32,17 +31,18 @@ class VisitorAura:
         self.intensity = 0.0  # 0 to 1
         self.collected_time = 0.0  # Timestamp when color was collected
         
-    def collect_color(self, color):
+    def collect_color(self, color, timestamp):
         """
         Collect a new color from a structure.
         Replaces any existing color (visitor carries ONE color at a time).
         
         Args:
             color: numpy array [R, G, B] (0-255)
+            timestamp: Time of collection (clock time)
         """
         self.current_color = np.array(color, dtype=np.uint8).copy()
         self.intensity = 1.0
-        self.collected_time = time.time()
+        self.collected_time = timestamp
         
     def update(self, dt):
         """
@@ -74,6 +74,21 @@ class VisitorAura:
         """Get current intensity (0-1)."""
         return self.intensity
     
+    def get_state(self):
+        """Aura state for snapshots (see core.snapshot)."""
+        return {
+            'color': None if self.current_color is None else self.current_color.tolist(),
+            'intensity': self.intensity,
+            'collected_time': self.collected_time,
+        }
+
+    def set_state(self, state):
+        """Restore state saved by get_state()."""
+        color = state['color']
+        self.current_color = None if color is None else np.array(color, dtype=np.uint8)
+        self.intensity = state['intensity']
+        self.collected_time = state['collected_time']
+
     def get_render_data(self, person_x, person_y, current_time):
         """
         Get data needed for rendering this aura.
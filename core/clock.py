@@ -0,0 +1,108 @@
+"""
+Clock - Single simulation clock, read once per frame
+"""
+
+import time
+
+CLOCK_MODES = ('real', 'fixed', 'replay')
+
+class Clock:
+    """
+    Frame clock shared by the simulation and the renderer.
+
+    tick() is called once per frame (by PollinationSystem.step); everything
+    else reads `now` / `dt` instead of calling time.time() itself.
+
+    Modes:
+        real:   now = wall clock, dt = time since the previous tick (capped)
+        fixed:  dt = fixed step, now advances by dt (no syscalls; frame-exact,
+                can run faster than real time for soak tests)
+        replay: now and dt are supplied by the caller every tick (recorded
+                session values)
+    """
+
+    def __init__(self, mode='real', dt=1.0 / 60.0, start_time=None, max_dt=0.1, time_source=time.time):
+        """
+        Initialize clock.
+
+        Args:
+            mode: 'real', 'fixed' or 'replay'
+            dt: Step in seconds for 'fixed' mode
+            start_time: Time before the first tick (default: wall clock in
+                        'real' mode, 0.0 otherwise)
+            max_dt: Largest dt 'real' mode reports (avoids jumps after stalls)
+            time_source: Wall clock for 'real' mode
+        """
+        self.time_source = time_source
+        self.max_dt = max_dt
+        self.configure(mode, dt, start_time)
+
+    def configure(self, mode, dt=None, start_time=None):
+        """
+        Switch mode (and optionally step / start time).
+
+        Args:
+            mode: 'real', 'fixed' or 'replay'
+            dt: Step for 'fixed' mode (default: keep the current step)
+            start_time: Restart the clock at this time (default: keep `now`,
+                        or the wall clock when switching to 'real')
+        """
+        if mode not in CLOCK_MODES:
+            raise ValueError(f"Unknown clock mode '{mode}' (expected one of {', '.join(CLOCK_MODES)})")
+        self.mode = mode
+        if dt is not None:
+            self.step = dt
+        if start_time is None:
+            if mode == 'real':
+                start_time = self.time_source()
+            else:
+                start_time = getattr(self, 'now', 0.0)
+        self.start_time = start_time
+        self.now = start_time  # Time of the current frame
+        self.dt = 0.0  # Step of the current frame
+        self.frame = getattr(self, 'frame', 0)
+
+    def tick(self, dt=None, timestamp=None):
+        """
+        Advance to the next frame.
+
+        Args:
+            dt: Override the frame step (e.g. a host's fixed 1/60)
+            timestamp: Override the frame time (required in 'replay' mode)
+
+        Returns:
+            dt of the new frame
+        """
+        if self.mode == 'real':
+            now = timestamp if timestamp is not None else self.time_source()
+            if dt is None:
+                dt = min(max(now - self.now, 0.0), self.max_dt)
+        elif self.mode == 'fixed':
+            if dt is None:
+                dt = self.step
+            now = timestamp if timestamp is not None else self.now + dt
+        else:
+            if dt is None or timestamp is None:
+                raise ValueError("Replay clock needs dt and timestamp on every tick")
+            now = timestamp
+
+        self.now = now
+        self.dt = dt
+        self.frame += 1
+        return dt
+
+    def get_state(self):
+        """Clock position for snapshots (mode and step stay as configured)."""
+        return {'now': self.now, 'dt': self.dt, 'frame': self.frame, 'start_time': self.start_time}
+
+    def set_state(self, state):
+        """Restore state saved by get_state()."""
+        self.now = state['now']
+        self.dt = state['dt']
+        self.frame = state['frame']
+        self.start_time = state['start_time']
+
+    @property
+    def elapsed(self):
+        """Seconds since start_time."""
+        return self.now - self.start_time
@@ -4,7 +4,6 @@ PollinationDance - Swirl effect when visitor color meets new tree color
 
 import numpy as np
 import math
-import random
 
 class PollinationDance:
     """
@@ -12,7 +11,7 @@ class PollinationDance:
     touches a structure with a different color.
     """
     
-    def __init__(self, x, y, visitor_color, structure_color, duration=2.5, structure_radius=650):
+    def __init__(self, x, y, visitor_color, structure_color, duration=2.5, structure_radius=650, rng=None):
         """
         Initialize pollination dance effect.
 
@@ -22,7 +21,10 @@ class PollinationDance:
             structure_color: RGB color of the structure
             duration: How long the swirl lasts (seconds)
             structure_radius: Radius of the structure (for edge positioning)
+            rng: numpy Generator (e.g. RNGService.stream('dances'); default: unseeded)
         """
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.id = None  # Serial number, assigned by PollinationSystem
         self.x = x
         self.y = y
         self.visitor_color = np.array(visitor_color, dtype=np.uint8)
@@ -45,6 +47,11 @@ class PollinationDance:
         # Start particles at the edge of the structure circle
         edge_radius = self.structure_radius * 0.85  # Slightly inside edge
 
+        # Draw all particles' variation at once
+        radius_variations = self.rng.uniform(-50, 100, particle_count).tolist()
+        angular_speeds = self.rng.uniform(1.0, 2.0, particle_count).tolist()
+        sizes = self.rng.uniform(12, 24, particle_count).tolist()  # Larger particles
+
         for i in range(particle_count):
             angle = (i / particle_count) * 2 * math.pi
             spiral = i / particle_count  # 0 to 1
@@ -53,16 +60,14 @@ class PollinationDance:
             color = self.visitor_color if i % 2 == 0 else self.structure_color
 
             # Particles start at edge and spiral outward with variation
-            radius_variation = random.uniform(-50, 100)
-
             particles.append({
                 'angle': angle,
                 'spiral': spiral,
-                'radius': edge_radius + radius_variation + spiral * 80,
-                'angular_speed': random.uniform(1.0, 2.0),
+                'radius': edge_radius + radius_variations[i] + spiral * 80,
+                'angular_speed': angular_speeds[i],
                 'color': color,
                 'life': 1.0,
-                'size': random.uniform(12, 24),  # Larger particles
+                'size': sizes[i],
             })
 
         return particles
@@ -70,18 +75,19 @@ class PollinationDance:
     def _create_rings(self):
         """Create expanding rings at the edge of the structure."""
         edge_radius = self.structure_radius * 0.85
+        speeds = self.rng.uniform(60, 100, 2).tolist()
         return [
             {
                 'radius': edge_radius,
                 'max_radius': edge_radius + 200,
                 'color': self.visitor_color,
-                'speed': random.uniform(60, 100),
+                'speed': speeds[0],
             },
             {
                 'radius': edge_radius - 20,
                 'max_radius': edge_radius + 180,
                 'color': self.structure_color,
-                'speed': random.uniform(60, 100),
+                'speed': speeds[1],
             },
         ]
     
@@ -108,6 +114,62 @@ class PollinationDance:
         """Check if animation is complete."""
         return self.life <= 0
     
+    def get_state(self):
+        """Dance state for snapshots: particles and rings as parallel arrays (see core.snapshot)."""
+        particles = self.particles
+        rings = self.rings
+        return {
+            'id': self.id,
+            'x': self.x,
+            'y': self.y,
+            'visitor_color': self.visitor_color.tolist(),
+            'structure_color': self.structure_color.tolist(),
+            'duration': self.duration,
+            'structure_radius': self.structure_radius,
+            'life': self.life,
+            'particles': np.array(
+                [[p['angle'], p['spiral'], p['radius'], p['angular_speed'], p['life'], p['size']] for p in particles],
+                dtype=np.float64).reshape(-1, 6),
+            'rings': np.array(
+                [[r['radius'], r['max_radius'], r['speed']] for r in rings], dtype=np.float64).reshape(-1, 3),
+        }
+
+    @classmethod
+    def from_state(cls, state, rng=None):
+        """
+        Recreate a dance saved by get_state() (without drawing new particles).
+
+        Args:
+            state: Dict from get_state()
+            rng: numpy Generator (as in __init__)
+
+        Returns:
+            PollinationDance
+        """
+        dance = cls.__new__(cls)
+        dance.rng = rng if rng is not None else np.random.default_rng()
+        dance.id = state['id']
+        dance.x = state['x']
+        dance.y = state['y']
+        dance.visitor_color = np.array(state['visitor_color'], dtype=np.uint8)
+        dance.structure_color = np.array(state['structure_color'], dtype=np.uint8)
+        dance.duration = state['duration']
+        dance.structure_radius = state['structure_radius']
+        dance.life = state['life']
+
+        # Colors alternate the same way as in _create_swirl_particles / _create_rings
+        colors = (dance.visitor_color, dance.structure_color)
+        dance.particles = [
+            {'angle': angle, 'spiral': spiral, 'radius': radius, 'angular_speed': angular_speed,
+             'color': colors[i % 2], 'life': life, 'size': size}
+            for i, (angle, spiral, radius, angular_speed, life, size) in enumerate(state['particles'].tolist())
+        ]
+        dance.rings = [
+            {'radius': radius, 'max_radius': max_radius, 'color': colors[i % 2], 'speed': speed}
+            for i, (radius, max_radius, speed) in enumerate(state['rings'].tolist())
+        ]
+        return dance
+
     def get_render_data(self):
         """
         Get data for rendering the swirl effect.
@@ -146,6 +208,7 @@ class PollinationDance:
                 })
                 
         return {
+            'id': self.id,
             'center_x': self.x,
             'center_y': self.y,
             'particles': particles_data,
@@ -0,0 +1,135 @@
+"""
+LatencyTracker - Per-stage latency histograms for the input-to-output pipeline
+"""
+
+import bisect
+import time
+import numpy as np
+
+# Pipeline timestamps (perf_counter_ns), in the order a frame passes them:
+#   ingest        visitor positions read from the CHOP/OSC input (update_frame)
+#   update_start  PollinationSystem.update entered
+#   update_end    render data built
+#   render_start  renderer starts drawing (onCook, after update_frame returned)
+#   encode_done   output frame encoded
+#   output        copyNumpyArray returned (frame handed to TouchDesigner)
+PIPELINE_STAGES = (
+    ('parse', 'ingest', 'update_start'),
+    ('simulate', 'update_start', 'update_end'),
+    ('handoff', 'update_end', 'render_start'),
+    ('render', 'render_start', 'encode_done'),
+    ('output', 'encode_done', 'output'),
+    ('total', 'ingest', 'output'),
+)
+
+def now_ns():
+    """Pipeline timestamp (monotonic nanoseconds)."""
+    return time.perf_counter_ns()
+
+class LatencyTracker:
+    """
+    Accumulates per-stage latency histograms from per-frame timestamps.
+
+    Histogram bins are log-spaced (10 us to 1 s) so one fixed-size array
+    per stage covers both sub-millisecond stages and whole-frame stalls.
+    """
+
+    def __init__(self, stages=PIPELINE_STAGES, min_ms=0.01, max_ms=1000.0, bins_per_decade=24):
+        """
+        Initialize latency tracker.
+
+        Args:
+            stages: Tuple of (name, start_stamp, end_stamp)
+            min_ms: Lower edge of the first histogram bin
+            max_ms: Upper edge of the last histogram bin
+            bins_per_decade: Histogram resolution
+        """
+        self.stages = tuple(stages)
+        decades = np.log10(max_ms / min_ms)
+        self.edges_ms = np.geomspace(min_ms, max_ms, int(round(decades * bins_per_decade)) + 1)
+        self._edges_ns = [int(e * 1e6) for e in self.edges_ms]
+
+        # Bin 0 = below min_ms, last bin = above max_ms
+        self.histograms = {name: np.zeros(len(self.edges_ms) + 1, dtype=np.int64)
+                           for name, _, _ in self.stages}
+        self.sums_ns = {name: 0 for name, _, _ in self.stages}
+        self.maxima_ns = {name: 0 for name, _, _ in self.stages}
+        self.last_ms = {}
+        self.frames = 0
+
+    def record(self, stamps):
+        """
+        Add one frame's timestamps.
+
+        Args:
+            stamps: Dict stamp name -> perf_counter_ns (missing stamps skip
+                    the stages that need them)
+        """
+        for name, start, end in self.stages:
+            if start not in stamps or end not in stamps:
+                continue
+            ns = stamps[end] - stamps[start]
+            self.histograms[name][bisect.bisect_right(self._edges_ns, ns)] += 1
+            self.sums_ns[name] += ns
+            if ns > self.maxima_ns[name]:
+                self.maxima_ns[name] = ns
+            self.last_ms[name] = ns / 1e6
+        self.frames += 1
+
+    def reset(self):
+        """Clear all histograms."""
+        for name, _, _ in self.stages:
+            self.histograms[name].fill(0)
+            self.sums_ns[name] = 0
+            self.maxima_ns[name] = 0
+        self.last_ms = {}
+        self.frames = 0
+
+    def percentile(self, name, q):
+        """
+        Estimate a percentile of a stage from its histogram (bin upper edge).
+
+        Returns:
+            Latency in ms (None if the stage has no samples)
+        """
+        counts = self.histograms[name]
+        total = counts.sum()
+        if total == 0:
+            return None
+        index = int(np.searchsorted(np.cumsum(counts), total * q / 100.0))
+        # Bin i ends at edges_ms[i]; never report more than the observed maximum
+        upper = float(self.edges_ms[min(index, len(self.edges_ms) - 1)])
+        return min(upper, self.maxima_ns[name] / 1e6)
+
+    def get_report(self, q=(50, 95, 99)):
+        """
+        Summary of every stage.
+
+        Returns:
+            Dict stage name -> {count, mean_ms, p50_ms, ..., max_ms, last_ms}
+        """
+        report = {}
+        for name, _, _ in self.stages:
+            count = int(self.histograms[name].sum())
+            if count == 0:
+                continue
+            stats = {
+                'count': count,
+                'mean_ms': self.sums_ns[name] / count / 1e6,
+            }
+            for p in q:
+                stats[f'p{p:g}_ms'] = self.percentile(name, p)
+            stats['max_ms'] = self.maxima_ns[name] / 1e6
+            stats['last_ms'] = self.last_ms.get(name)
+            report[name] = stats
+        return report
+
+    def get_histogram(self, name):
+        """
+        Raw histogram of a stage.
+
+        Returns:
+            (edges_ms, counts): counts[0] is below edges_ms[0], counts[-1]
+            above edges_ms[-1], counts[i] covers edges_ms[i-1]..edges_ms[i]
+        """
+        return self.edges_ms.copy(), self.histograms[name].copy()
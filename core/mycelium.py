@@ -4,110 +4,216 @@ MycelialNetwork - Background connections between structures
 
 import numpy as np
 import math
-import random
 
 class MycelialNetwork:
     """
     Represents the always-present mycelial connections between structures.
     Shows that the ecosystem is already alive and connecting.
+
+    Connections are stored as edge arrays (structure index pairs) and flow
+    particles as parallel arrays, so updates are whole-array operations.
     """
-    
-    def __init__(self, structures):
+
+    def __init__(self, structures, max_distance=2000, seed=0, min_connections=2, max_connections=3,
+                 spawn_rate=0.5, particle_speed=0.2, particle_life=3.0, rng=None):
         """
         Initialize mycelial network.
-        
+
         Args:
             structures: List of Structure objects
+            max_distance: Maximum connection length (pixels)
+            seed: RNG seed (fixed so the network layout is reproducible)
+            min_connections, max_connections: Range of connections per structure
+            spawn_rate: Flow particles spawned per connection per second
+            particle_speed: Flow particle speed (fraction of the connection per second)
+            particle_life: Flow particle lifetime in seconds
+            rng: numpy Generator (default: default_rng(seed))
         """
         self.structures = structures
-        self.connections = self._create_connections()
-        
+        self.max_distance = max_distance
+        self.seed = seed
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.spawn_rate = spawn_rate
+        self.particle_speed = particle_speed
+        self.particle_life = particle_life
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+
+        self.positions = np.array([[s.x, s.y] for s in structures], dtype=np.float64).reshape(-1, 2)
+
+        # Edge arrays (edge_a < edge_b, indices into structures)
+        self.edge_a, self.edge_b = self._create_connections()
+        self.flow = 0.2
+
+        # Flow particles (parallel arrays)
+        self.particle_edge = np.zeros(0, dtype=np.int64)
+        self.particle_progress = np.zeros(0, dtype=np.float64)
+        self.particle_direction = np.zeros(0, dtype=np.float64)
+        self.particle_life_left = np.zeros(0, dtype=np.float64)
+
+    @property
+    def num_connections(self):
+        """Number of connections (edges)."""
+        return len(self.edge_a)
+
     def _create_connections(self):
-        """Create connections between nearby structures."""
-        connections = []
-        max_distance = 2000
-        
-        for i, struct_a in enumerate(self.structures):
-            # Find nearby structures
-            nearby = []
-            for j, struct_b in enumerate(self.structures):
-                if i >= j:
-                    continue
-                dx = struct_b.x - struct_a.x
-                dy = struct_b.y - struct_a.y
-                distance = math.sqrt(dx * dx + dy * dy)
-                
-                if distance < max_distance:
-                    nearby.append((j, distance, struct_b))
-                    
-            # Sort by distance
-            nearby.sort(key=lambda x: x[1])
-            
-            # Connect to 2-3 nearest (but only if we have nearby structures)
-            if len(nearby) > 0:
-                num_connections = min(random.randint(2, 3), len(nearby))
-                for k in range(num_connections):
-                    if k < len(nearby):
-                        _, _, struct_b = nearby[k]
-                        connections.append({
-                            'struct_a': struct_a,
-                            'struct_b': struct_b,
-                            'flow': 0.2,
-                            'particles': [],
-                        })
-                    
-        return connections
-    
+        """
+        Connect each structure to its 2-3 nearest higher-index neighbours.
+
+        Neighbours are found with a uniform grid (about sqrt(n) structures
+        per cell along the longer side, so a row of trees doesn't shrink the
+        cells to a few pixels) searched one ring of cells at a time, so
+        building is roughly O(n).
+
+        Returns:
+            (edge_a, edge_b) int64 arrays
+        """
+        n = len(self.positions)
+        if n < 2:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        positions = self.positions
+        lo = positions.min(axis=0)
+        extent = positions.max(axis=0) - lo
+        cell = max(1.0, float(extent.max()) / math.sqrt(n))
+        cells = np.floor((positions - lo) / cell).astype(np.int64)
+        max_ring = int(cells.max()) + 1
+
+        grid = {}
+        for idx, key in enumerate(map(tuple, cells.tolist())):
+            grid.setdefault(key, []).append(idx)
+
+        # How many connections each structure wants (2-3)
+        counts = self.rng.integers(self.min_connections, self.max_connections + 1, size=n)
+
+        edge_a = []
+        edge_b = []
+        for i in range(n):
+            cx, cy = cells[i]
+            higher = n - 1 - i  # Candidates that exist at all
+            candidates = []
+            ring = 0
+            while higher:
+                if ring == 0:
+                    ring_cells = [(cx, cy)]
+                else:
+                    # Only the ring's perimeter: top and bottom rows, then the sides
+                    ring_cells = [(gx, gy) for gx in range(cx - ring, cx + ring + 1)
+                                  for gy in (cy - ring, cy + ring)]
+                    ring_cells += [(gx, gy) for gy in range(cy - ring + 1, cy + ring)
+                                   for gx in (cx - ring, cx + ring)]
+                for key in ring_cells:
+                    candidates.extend(j for j in grid.get(key, ()) if j > i)
+
+                # Everything within ring * cell has been visited
+                reach = ring * cell
+                if reach >= self.max_distance or ring >= max_ring or len(candidates) == higher:
+                    break
+                if len(candidates) >= counts[i]:
+                    d = np.hypot(*(positions[candidates] - positions[i]).T)
+                    if np.partition(d, counts[i] - 1)[counts[i] - 1] <= reach:
+                        break
+                ring += 1
+
+            if not candidates:
+                continue
+
+            candidates = np.sort(np.array(candidates, dtype=np.int64))
+            d = np.hypot(*(positions[candidates] - positions[i]).T)
+            nearby = d <= self.max_distance
+            candidates, d = candidates[nearby], d[nearby]
+
+            # Connect to the nearest (ties broken by index)
+            nearest = candidates[np.argsort(d, kind='stable')[:counts[i]]]
+            edge_a.extend([i] * len(nearest))
+            edge_b.extend(nearest.tolist())
+
+        return np.array(edge_a, dtype=np.int64), np.array(edge_b, dtype=np.int64)
+
     def update(self, dt, time):
         """Update network flow and particles."""
-        for conn in self.connections:
-            # Gentle flow variation
-            conn['flow'] = 0.2 + math.sin(time * 0.3) * 0.1
-            
-            # Spawn flow particles occasionally
-            if random.random() < dt * 0.5:
-                conn['particles'].append({
-                    'progress': random.choice([0.0, 1.0]),
-                    'direction': random.choice([-1, 1]),
-                    'life': 3.0,
-                })
-                
-            # Update particles
-            for p in conn['particles']:
-                p['progress'] += p['direction'] * dt * 0.2
-                p['life'] -= dt
-                
-            # Remove dead particles
-            conn['particles'] = [p for p in conn['particles'] if p['life'] > 0 and 0 <= p['progress'] <= 1]
-            
+        # Gentle flow variation
+        self.flow = 0.2 + math.sin(time * 0.3) * 0.1
+
+        num_edges = len(self.edge_a)
+        if num_edges == 0:
+            return
+
+        # Spawn flow particles occasionally (one draw per connection)
+        spawned = np.flatnonzero(self.rng.random(num_edges) < dt * self.spawn_rate)
+        if len(spawned):
+            count = len(spawned)
+            self.particle_edge = np.concatenate([self.particle_edge, spawned])
+            self.particle_progress = np.concatenate(
+                [self.particle_progress, self.rng.integers(0, 2, size=count).astype(np.float64)])
+            self.particle_direction = np.concatenate(
+                [self.particle_direction, self.rng.integers(0, 2, size=count) * 2.0 - 1.0])
+            self.particle_life_left = np.concatenate(
+                [self.particle_life_left, np.full(count, self.particle_life)])
+
+        # Update particles
+        self.particle_progress += self.particle_direction * dt * self.particle_speed
+        self.particle_life_left -= dt
+
+        # Remove dead particles
+        alive = ((self.particle_life_left > 0) &
+                 (self.particle_progress >= 0) & (self.particle_progress <= 1))
+        if not alive.all():
+            self.particle_edge = self.particle_edge[alive]
+            self.particle_progress = self.particle_progress[alive]
+            self.particle_direction = self.particle_direction[alive]
+            self.particle_life_left = self.particle_life_left[alive]
+
+    def get_state(self):
+        """Flow and particle state for snapshots (the layout is rebuilt from the seed)."""
+        return {
+            'num_connections': self.num_connections,
+            'flow': self.flow,
+            'particle_edge': self.particle_edge,
+            'particle_progress': self.particle_progress,
+            'particle_direction': self.particle_direction,
+            'particle_life_left': self.particle_life_left,
+        }
+
+    def set_state(self, state):
+        """Restore state saved by get_state() into a network with the same layout."""
+        if state['num_connections'] != self.num_connections:
+            raise ValueError(
+                f"Mycelium layout differs from the snapshot ({self.num_connections} connections, "
+                f"snapshot has {state['num_connections']})")
+        self.flow = state['flow']
+        self.particle_edge = np.array(state['particle_edge'], dtype=np.int64)
+        self.particle_progress = np.array(state['particle_progress'], dtype=np.float64)
+        self.particle_direction = np.array(state['particle_direction'], dtype=np.float64)
+        self.particle_life_left = np.array(state['particle_life_left'], dtype=np.float64)
+
     def get_render_data(self):
-        """Get data for rendering the network."""
-        render_data = []
-        
-        for conn in self.connections:
-            # Line data
-            line_data = {
-                'x1': conn['struct_a'].x,
-                'y1': conn['struct_a'].y,
-                'x2': conn['struct_b'].x,
-                'y2': conn['struct_b'].y,
-                'flow': conn['flow'],
-            }
-            
-            # Particle data
-            particles_data = []
-            for p in conn['particles']:
-                px = conn['struct_a'].x + (conn['struct_b'].x - conn['struct_a'].x) * p['progress']
-                py = conn['struct_a'].y + (conn['struct_b'].y - conn['struct_a'].y) * p['progress']
-                particles_data.append({
-                    'x': px,
-                    'y': py,
-                    'alpha': p['life'] / 3.0,
-                })
-                
-            render_data.append({
-                'line': line_data,
-                'particles': particles_data,
-            })
-            
-        return render_data
+        """
+        Get data for rendering the network.
+
+        Returns:
+            Dictionary of arrays: edge_a/edge_b (structure indices),
+            x1/y1/x2/y2 (edge endpoints), flow (scalar) and
+            particles {x, y, alpha}
+        """
+        start = self.positions[self.edge_a]
+        end = self.positions[self.edge_b]
+
+        pe = self.particle_edge
+        progress = self.particle_progress[:, np.newaxis]
+        particle_pos = start[pe] + (end[pe] - start[pe]) * progress
+
+        return {
+            'edge_a': self.edge_a,
+            'edge_b': self.edge_b,
+            'x1': start[:, 0],
+            'y1': start[:, 1],
+            'x2': end[:, 0],
+            'y2': end[:, 1],
+            'flow': self.flow,
+            'particles': {
+                'x': particle_pos[:, 0],
+                'y': particle_pos[:, 1],
+                'alpha': self.particle_life_left / self.particle_life,
+            },
+        }
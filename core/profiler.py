@@ -0,0 +1,172 @@
+"""
+FrameProfiler - Lightweight per-subsystem frame timing
+"""
+
+import time
+import numpy as np
+
+class FrameProfiler:
+    """
+    Records per-frame span durations (perf_counter_ns) and element counts
+    into a fixed-size ring buffer.
+
+    A frame is opened with begin_frame(), split into spans with lap(name)
+    (each lap records the time since the previous lap) and closed with
+    end_frame(**counts). Recording costs one perf_counter_ns() call and a
+    list store per span, plus one row copy per frame, so it can stay on
+    in production. Statistics are only computed when queried.
+    """
+
+    def __init__(self, spans, counts=(), capacity=600, enabled=True):
+        """
+        Initialize frame profiler.
+
+        Args:
+            spans: Span names, in the order they are recorded
+            counts: Element count names stored with each frame
+            capacity: Number of frames kept (ring buffer size)
+            enabled: Record frames (begin/lap/end are no-ops when False)
+        """
+        self.spans = tuple(spans)
+        self.counts = tuple(counts)
+        self.capacity = capacity
+        self.enabled = enabled
+
+        self._span_index = {name: i for i, name in enumerate(self.spans)}
+        self._count_index = {name: i for i, name in enumerate(self.counts)}
+
+        # Ring buffer (row = frame_number % capacity)
+        self.durations = np.zeros((capacity, len(self.spans)), dtype=np.int64)  # ns
+        self.totals = np.zeros(capacity, dtype=np.int64)  # ns, begin -> end
+        self.element_counts = np.zeros((capacity, len(self.counts)), dtype=np.int64)
+        self.frame_numbers = np.full(capacity, -1, dtype=np.int64)
+        self.frames_recorded = 0
+
+        # Frame in progress
+        self._active = False
+        self._current = [0] * len(self.spans)
+        self._frame_start = 0
+        self._last = 0
+
+    def begin_frame(self):
+        """Start timing a frame."""
+        if not self.enabled:
+            return
+        self._current = [0] * len(self.spans)
+        self._active = True
+        self._frame_start = self._last = time.perf_counter_ns()
+
+    @property
+    def active(self):
+        """A frame is open (begin_frame() called, end_frame() not yet)."""
+        return self._active
+
+    def lap(self, name):
+        """
+        Close the current span: time since the previous lap is added to `name`.
+
+        Laps outside begin_frame()/end_frame() are ignored, so instrumented
+        code can also run unprofiled.
+        """
+        if not self._active:
+            return
+        now = time.perf_counter_ns()
+        self._current[self._span_index[name]] += now - self._last
+        self._last = now
+
+    def skip(self):
+        """Restart the span clock without recording (excludes untracked work)."""
+        if self._active:
+            self._last = time.perf_counter_ns()
+
+    def end_frame(self, **counts):
+        """
+        Finish the frame and store it in the ring buffer.
+
+        Args:
+            **counts: Element counts for this frame (names from `counts`)
+        """
+        if not self._active:
+            return
+        end = time.perf_counter_ns()
+        row = self.frames_recorded % self.capacity
+        self.durations[row] = self._current
+        self.totals[row] = end - self._frame_start
+        if self.counts:
+            self.element_counts[row] = 0
+            for name, value in counts.items():
+                self.element_counts[row, self._count_index[name]] = value
+        self.frame_numbers[row] = self.frames_recorded
+        self.frames_recorded += 1
+        self._active = False
+
+    def cancel_frame(self):
+        """Drop the frame in progress without recording it."""
+        self._active = False
+
+    def reset(self):
+        """Clear all recorded frames."""
+        self.durations.fill(0)
+        self.totals.fill(0)
+        self.element_counts.fill(0)
+        self.frame_numbers.fill(-1)
+        self.frames_recorded = 0
+        self._active = False
+
+    def _filled(self):
+        """Number of valid rows in the ring buffer."""
+        return min(self.frames_recorded, self.capacity)
+
+    def percentiles(self, q=(50, 95, 99)):
+        """
+        Rolling percentiles over the frames in the ring buffer.
+
+        Args:
+            q: Percentiles to compute
+
+        Returns:
+            Dict span name (plus 'total') -> {'p50_ms': ..., 'max_ms': ...}
+        """
+        filled = self._filled()
+        if filled == 0:
+            return {}
+
+        columns = np.column_stack([self.durations[:filled], self.totals[:filled]]) / 1e6
+        values = np.percentile(columns, q, axis=0)
+        maxima = columns.max(axis=0)
+
+        stats = {}
+        for i, name in enumerate(self.spans + ('total',)):
+            stats[name] = {f'p{p:g}_ms': float(values[j, i]) for j, p in enumerate(q)}
+            stats[name]['max_ms'] = float(maxima[i])
+        return stats
+
+    def worst_frames(self, n=5):
+        """
+        The slowest frames in the ring buffer, slowest first.
+
+        Returns:
+            List of {frame, total_ms, spans: {name: ms}, counts: {name: n}}
+        """
+        filled = self._filled()
+        if filled == 0:
+            return []
+
+        order = np.argsort(self.totals[:filled])[::-1][:n]
+        frames = []
+        for row in order:
+            frames.append({
+                'frame': int(self.frame_numbers[row]),
+                'total_ms': self.totals[row] / 1e6,
+                'spans': {name: self.durations[row, i] / 1e6 for i, name in enumerate(self.spans)},
+                'counts': {name: int(self.element_counts[row, i]) for i, name in enumerate(self.counts)},
+            })
+        return frames
+
+    def get_report(self, worst=5):
+        """Percentiles plus worst frames, e.g. for logging."""
+        return {
+            'frames': self._filled(),
+            'percentiles': self.percentiles(),
+            'worst_frames': self.worst_frames(worst),
+        }
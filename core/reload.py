@@ -0,0 +1,200 @@
+"""
+ReloadManager - Hot reload of core modules and config with a frame budget
+"""
+
+import importlib
+import os
+import sys
+import time
+
+class ReloadManager:
+    """
+    Watches the core package and config by mtime and reloads what changed.
+
+    poll() is called once per frame. Every `interval` seconds it stats the
+    watched modules' files; when one changed, the module and everything
+    that imports from it are reloaded (dependencies first), then the
+    on_reload hook migrates live objects to the new classes. The work is
+    split into steps (one module reload, one migration step) and poll()
+    only runs steps until `budget_ms` is used up, so a reload is spread
+    over a few frames instead of stalling one.
+    """
+
+    def __init__(self, packages=('core',), modules=('config',), interval=0.5, budget_ms=4.0,
+                 on_reload=None, time_source=time.monotonic):
+        """
+        Initialize reload manager.
+
+        Args:
+            packages: Packages whose loaded submodules are watched
+            modules: Extra top-level modules to watch
+            interval: Seconds between mtime checks
+            budget_ms: Work per poll() (at least one step always runs)
+            on_reload: Optional callback(module_names) run after the
+                       reload; may return an iterable whose items are
+                       further budgeted steps (e.g. state migration)
+            time_source: Clock for the check interval
+        """
+        self.packages = tuple(packages)
+        self.modules = tuple(modules)
+        self.interval = interval
+        self.budget_ms = budget_ms
+        self.on_reload = on_reload
+        self.time_source = time_source
+
+        self._mtimes = {name: self._mtime(name) for name in self._watched()}
+        self._last_check = time_source()
+        self._job = None
+
+        # Counters
+        self.checks = 0
+        self.reloads = 0  # Completed reloads
+        self.failures = 0  # Reloads aborted by an exception
+        self.last_modules = []  # Modules of the last reload
+        self.last_error = None
+        self.last_frames = 0  # Frames the last reload was spread over
+        self.max_step_ms = 0.0  # Longest single step so far
+
+    def _watched(self):
+        """Names of the loaded modules to watch (never this module)."""
+        names = []
+        for name, module in list(sys.modules.items()):
+            if module is None or name == __name__ or not getattr(module, '__file__', None):
+                continue
+            if name in self.modules or name in self.packages or name.split('.')[0] in self.packages:
+                names.append(name)
+        return names
+
+    @staticmethod
+    def _mtime(name):
+        try:
+            return os.stat(sys.modules[name].__file__).st_mtime_ns
+        except (KeyError, OSError):
+            return None
+
+    def _dependencies(self, name, watched):
+        """Watched modules `name` imports from (module objects or their classes/functions)."""
+        deps = set()
+        for value in vars(sys.modules[name]).values():
+            other = value.__name__ if type(value) is type(sys) else getattr(value, '__module__', None)
+            if other in watched and other != name:
+                deps.add(other)
+        return deps
+
+    def reload_order(self, changed):
+        """
+        Changed modules plus their dependents, dependencies first.
+
+        Args:
+            changed: Names of changed modules
+
+        Returns:
+            List of module names
+        """
+        watched = set(self._watched())
+        deps = {name: self._dependencies(name, watched) for name in watched}
+
+        # Everything that (transitively) imports from a changed module
+        affected = set(changed)
+        grew = True
+        while grew:
+            grew = False
+            for name, uses in deps.items():
+                if name not in affected and uses & affected:
+                    affected.add(name)
+                    grew = True
+
+        order = []
+        visiting = set()
+
+        def visit(name):
+            if name in order or name in visiting:
+                return
+            visiting.add(name)
+            for dep in sorted(deps[name] & affected):
+                visit(dep)
+            order.append(name)
+
+        for name in sorted(affected):
+            visit(name)
+        return order
+
+    def changed_modules(self):
+        """Stat the watched files; returns the names whose mtime changed."""
+        self.checks += 1
+        changed = []
+        for name in self._watched():
+            mtime = self._mtime(name)
+            if name not in self._mtimes:
+                self._mtimes[name] = mtime  # Newly imported: watch from now on
+            elif mtime != self._mtimes[name]:
+                self._mtimes[name] = mtime
+                changed.append(name)
+        return changed
+
+    def _run(self, names):
+        """Reload job: one step per module, then the on_reload steps."""
+        for name in names:
+            importlib.reload(sys.modules[name])
+            yield name
+        if self.on_reload is not None:
+            steps = self.on_reload(names)
+            if steps is not None:
+                for step in steps:
+                    yield step
+
+    def poll(self):
+        """
+        Check for changes and run reload steps within the frame budget.
+
+        Returns:
+            True while a reload is in progress
+        """
+        if self._job is None:
+            now = self.time_source()
+            if now - self._last_check < self.interval:
+                return False
+            self._last_check = now
+            changed = self.changed_modules()
+            if not changed:
+                return False
+            self.last_modules = self.reload_order(changed)
+            self.last_frames = 0
+            self._job = self._run(self.last_modules)
+
+        self.last_frames += 1
+        start = time.perf_counter()
+        while True:
+            step_start = time.perf_counter()
+            try:
+                next(self._job)
+            except StopIteration:
+                self._job = None
+                self.reloads += 1
+                self.last_error = None
+                print(f"✓ Reloaded {', '.join(self.last_modules)} ({self.last_frames} frames)")
+            except Exception as e:
+                # Keep running on what is loaded; the next save triggers a new attempt
+                self._job = None
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"⚠ Reload failed: {self.last_error}")
+            now = time.perf_counter()
+            self.max_step_ms = max(self.max_step_ms, (now - step_start) * 1000.0)
+            if self._job is None or (now - start) * 1000.0 >= self.budget_ms:
+                break
+        return self._job is not None
+
+    def get_stats(self):
+        """Reload counters."""
+        return {
+            'watched': len(self._mtimes),
+            'checks': self.checks,
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'in_progress': self._job is not None,
+            'last_modules': list(self.last_modules),
+            'last_frames': self.last_frames,
+            'last_error': self.last_error,
+            'max_step_ms': self.max_step_ms,
+        }
@@ -0,0 +1,172 @@
+"""
+Snapshot - Save and restore the full PollinationSystem state
+
+File layout (little-endian):
+
+    magic b'BSNP', schema u16, header JSON length u32, crc32 u32, JSON, payload
+
+The JSON holds the state tree from PollinationSystem.get_state() with
+every numpy array replaced by {"__array__": index}; the arrays (trail
+points, dance particles, mycelium particles, ...) are stored back to back
+in the payload, 8-byte aligned, and described in the JSON's "arrays"
+list. The crc32 covers JSON and payload. Files are written to a temporary
+name and renamed, so a crash while saving leaves the previous snapshot
+intact.
+"""
+
+import json
+import os
+import struct
+import time
+import zlib
+import numpy as np
+
+MAGIC = b'BSNP'
+SCHEMA_VERSION = 1  # Bump whenever get_state() / set_state() change shape
+ALIGN = 8
+
+_HEADER = struct.Struct('<4sHII')
+
+def encode_snapshot(state, created=None):
+    """
+    Serialize a state tree.
+
+    Args:
+        state: Dict from PollinationSystem.get_state()
+        created: Wall time stamped into the file (default: now)
+
+    Returns:
+        bytes
+    """
+    arrays = []
+
+    def pack(value):
+        if isinstance(value, np.ndarray):
+            arrays.append(np.ascontiguousarray(value))
+            return {'__array__': len(arrays) - 1}
+        if isinstance(value, dict):
+            return {key: pack(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [pack(item) for item in value]
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    tree = pack(state)
+    layout = []
+    offset = 0
+    for array in arrays:
+        offset = -(-offset // ALIGN) * ALIGN
+        layout.append({'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset})
+        offset += array.nbytes
+
+    payload = bytearray(offset)
+    for array, entry in zip(arrays, layout):
+        payload[entry['offset']:entry['offset'] + array.nbytes] = array.tobytes()
+
+    header = json.dumps({
+        'schema': SCHEMA_VERSION,
+        'created': time.time() if created is None else created,
+        'arrays': layout,
+        'state': tree,
+    }, separators=(',', ':')).encode('utf-8')
+    crc = zlib.crc32(payload, zlib.crc32(header))
+    return _HEADER.pack(MAGIC, SCHEMA_VERSION, len(header), crc) + header + bytes(payload)
+
+def decode_snapshot(data):
+    """
+    Parse bytes written by encode_snapshot().
+
+    Args:
+        data: bytes or bytearray (arrays are views into it when writable)
+
+    Returns:
+        (info, state): info has schema and created; state is the tree for
+        PollinationSystem.set_state()
+
+    Raises:
+        ValueError: Not a snapshot, wrong schema version, or corrupt
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Snapshot file is truncated")
+    magic, schema, header_len, crc = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a snapshot file")
+    if schema != SCHEMA_VERSION:
+        raise ValueError(f"Snapshot schema {schema} does not match this version ({SCHEMA_VERSION})")
+    body = memoryview(data)[_HEADER.size:]
+    if len(body) < header_len or zlib.crc32(body) != crc:
+        raise ValueError("Snapshot file is corrupt")
+
+    header = json.loads(bytes(body[:header_len]))
+    payload = body[header_len:]
+    arrays = [
+        np.frombuffer(payload, dtype=np.dtype(entry['dtype']), count=int(np.prod(entry['shape'])),
+                      offset=entry['offset']).reshape(entry['shape'])
+        for entry in header['arrays']
+    ]
+
+    def unpack(value):
+        if isinstance(value, dict):
+            if '__array__' in value:
+                return arrays[value['__array__']]
+            return {key: unpack(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [unpack(item) for item in value]
+        return value
+
+    info = {'schema': header['schema'], 'created': header['created']}
+    return info, unpack(header['state'])
+
+def save_snapshot(system, path):
+    """
+    Write a system's state to a snapshot file (atomically replaced).
+
+    Args:
+        system: PollinationSystem
+        path: Output file path
+
+    Returns:
+        Dict with path, bytes and ms (capture + write time)
+    """
+    start = time.perf_counter()
+    data = encode_snapshot(system.get_state())
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return {'path': path, 'bytes': len(data), 'ms': (time.perf_counter() - start) * 1000.0}
+
+def load_snapshot(path):
+    """Read a snapshot file. Returns (info, state); see decode_snapshot()."""
+    with open(path, 'rb') as f:
+        data = bytearray(f.read())
+    return decode_snapshot(data)
+
+def restore_snapshot(system, path, max_age=None):
+    """
+    Restore a system from a snapshot file.
+
+    Args:
+        system: PollinationSystem created with the same canvas, structures
+                and mycelium seed as the saved one
+        path: Snapshot file path
+        max_age: Refuse snapshots older than this many seconds (None = any age)
+
+    Returns:
+        Dict with path, age (seconds), frame and ms (load + restore time)
+
+    Raises:
+        FileNotFoundError: No snapshot at path
+        ValueError: Wrong schema, corrupt file, too old, or a different layout
+    """
+    start = time.perf_counter()
+    info, state = load_snapshot(path)
+    age = time.time() - info['created']
+    if max_age is not None and age > max_age:
+        raise ValueError(f"Snapshot is {age:.0f} s old (limit {max_age:.0f} s)")
+    system.set_state(state)
+    return {'path': path, 'age': age, 'frame': system.frame, 'ms': (time.perf_counter() - start) * 1000.0}
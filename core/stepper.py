@@ -0,0 +1,217 @@
+"""
+FixedTimestepper - Fixed-rate simulation steps with render interpolation
+"""
+
+import time
+
+from .latency import now_ns
+
+class FixedTimestepper:
+    """
+    Runs PollinationSystem at a fixed simulation rate, whatever the render rate.
+
+    Each advance() adds the real frame time to an accumulator and takes as
+    many fixed steps as fit (at most max_catchup, the rest is dropped so a
+    long stall can't cause a spiral of ever-longer frames). Render data is
+    interpolated between the last two steps by the leftover fraction, so
+    motion stays smooth when render and simulation rates differ. All steps
+    of one advance() are recorded as one system profiler frame.
+    """
+
+    def __init__(self, system, sim_hz=60.0, max_catchup=4, time_source=time.perf_counter, on_step=None):
+        """
+        Initialize stepper.
+
+        Args:
+            system: PollinationSystem (its clock is switched to fixed steps of 1/sim_hz)
+            sim_hz: Simulation steps per second
+            max_catchup: Most steps taken in one advance()
+            time_source: Monotonic clock measuring real frame time
+            on_step: Optional callback(visitor_positions) after every step
+                     (e.g. the session recorder)
+        """
+        self.system = system
+        self.max_catchup = max_catchup
+        self.time_source = time_source
+        self.on_step = on_step
+        self.set_rate(sim_hz)
+
+        self.accumulator = 0.0
+        self.alpha = 0.0  # Interpolation fraction of the last advance()
+        self._last_time = None
+        self._prev_render = None  # Render data of the step before the latest
+        self._curr_render = None  # Render data of the latest step
+
+        # Counters
+        self.frames = 0  # advance() calls
+        self.steps = 0  # Steps taken
+        self.catchup_steps = 0  # Steps beyond the first in a frame
+        self.skipped_steps = 0  # Steps dropped by the catch-up limit
+        self.idle_frames = 0  # Frames without a step (render faster than sim)
+
+    def set_rate(self, sim_hz):
+        """Change the simulation rate."""
+        self.sim_hz = sim_hz
+        self.step_dt = 1.0 / sim_hz
+        self.system.clock.configure('fixed', dt=self.step_dt)
+
+    def advance(self, visitor_positions, frame_dt=None):
+        """
+        Advance the simulation to the current time and get render data.
+
+        Args:
+            visitor_positions: List of dicts with {id, x, y} (latest input,
+                               used for every step of this frame)
+            frame_dt: Real time since the previous frame (default: measured)
+
+        Returns:
+            Render data interpolated between the last two steps
+        """
+        if frame_dt is None:
+            now = self.time_source()
+            frame_dt = self.step_dt if self._last_time is None else now - self._last_time
+            self._last_time = now
+        self.frames += 1
+        self.accumulator += frame_dt
+
+        # Count the steps first: only the last two need render data
+        steps = 0
+        accumulator = self.accumulator
+        while accumulator >= self.step_dt and steps < self.max_catchup:
+            accumulator -= self.step_dt
+            steps += 1
+        update_start = now_ns()
+        if steps:
+            # One profiler frame for the whole catch-up (the steps' laps add to it)
+            profiler = self.system.profiler
+            profiler.begin_frame()
+            try:
+                for i in range(steps):
+                    self._step(visitor_positions, render=i >= steps - 2)
+            except Exception:
+                profiler.cancel_frame()
+                raise
+            self.system.end_profile_frame(visitor_positions, steps)
+        self.accumulator = accumulator
+
+        if self.accumulator >= self.step_dt:
+            dropped = int(self.accumulator / self.step_dt)
+            self.skipped_steps += dropped
+            self.accumulator -= dropped * self.step_dt
+
+        stepped = steps > 0
+        if steps == 0:
+            self.idle_frames += 1
+            if self._curr_render is None:
+                self._step(visitor_positions)
+                stepped = True
+        else:
+            self.catchup_steps += steps - 1
+
+        self.alpha = self.accumulator / self.step_dt
+        data = interpolate_render_data(self._prev_render, self._curr_render, self.alpha, visitor_positions)
+        if stepped:
+            # Simulate stage: from the first step of this frame to the end of the last
+            data['timestamps']['update_start'] = update_start
+        else:
+            # No simulation this frame: no update stamps (the latest step's belong to an earlier frame)
+            data['timestamps'].pop('update_start', None)
+            data['timestamps'].pop('update_end', None)
+        return data
+
+    def _step(self, visitor_positions, render=True):
+        """
+        Take one fixed step.
+
+        Args:
+            visitor_positions: Input of the step
+            render: Build its render data (kept with the previous step's for
+                    interpolation); catch-up steps before the last two skip it
+        """
+        if render:
+            self._prev_render = self._curr_render
+            self._curr_render = self.system.update(visitor_positions)
+        else:
+            self.system.step(visitor_positions)
+        self.steps += 1
+        if self.on_step is not None:
+            self.on_step(visitor_positions)
+
+    def get_stats(self):
+        """Stepper counters."""
+        return {
+            'sim_hz': self.sim_hz,
+            'frames': self.frames,
+            'steps': self.steps,
+            'catchup_steps': self.catchup_steps,
+            'skipped_steps': self.skipped_steps,
+            'idle_frames': self.idle_frames,
+            'alpha': self.alpha,
+        }
+
+def _lerp(a, b, t):
+    return a + (b - a) * t
+
+def interpolate_render_data(prev, curr, alpha, visitor_positions=None):
+    """
+    Blend two consecutive steps' render data.
+
+    The frame time and moving elements (agents, dance particles and rings)
+    are interpolated from the previous step toward the latest one; trails,
+    auras and other per-step data come from the latest step. Visitors are
+    the latest input (interpolating them would only add latency).
+
+    Args:
+        prev: Render data of the previous step (None = no interpolation)
+        curr: Render data of the latest step
+        alpha: 0 = previous step, 1 = latest step
+        visitor_positions: Latest visitor positions
+
+    Returns:
+        Render data dict (shallow copy of curr with blended fields)
+    """
+    data = dict(curr)
+    # Own timestamps per frame (callers stamp them; an idle frame reuses curr)
+    data['timestamps'] = dict(curr.get('timestamps', ()))
+    if visitor_positions is not None:
+        data['visitors'] = visitor_positions
+    if prev is None or alpha >= 1.0:
+        return data
+
+    data['time'] = _lerp(prev['time'], curr['time'], alpha)
+
+    # Agents persist across steps (same order)
+    if len(prev['agents']) == len(curr['agents']):
+        agents = []
+        for a, b in zip(prev['agents'], curr['agents']):
+            agent = dict(b)
+            agent['x'] = _lerp(a['x'], b['x'], alpha)
+            agent['y'] = _lerp(a['y'], b['y'], alpha)
+            agents.append(agent)
+        data['agents'] = agents
+
+    # Dances are matched by serial number; new dances start at their first step
+    prev_dances = {d['id']: d for d in prev['dances']}
+    dances = []
+    for b in curr['dances']:
+        a = prev_dances.get(b['id'])
+        if a is None:
+            dances.append(b)
+            continue
+        dance = dict(b)
+        dance['alpha'] = _lerp(a['alpha'], b['alpha'], alpha)
+        if len(a['particles']) == len(b['particles']):
+            dance['particles'] = [
+                dict(q, x=_lerp(p['x'], q['x'], alpha), y=_lerp(p['y'], q['y'], alpha),
+                     alpha=_lerp(p['alpha'], q['alpha'], alpha))
+                for p, q in zip(a['particles'], b['particles'])
+            ]
+        if len(a['rings']) == len(b['rings']):
+            dance['rings'] = [
+                dict(q, radius=_lerp(p['radius'], q['radius'], alpha), alpha=_lerp(p['alpha'], q['alpha'], alpha))
+                for p, q in zip(a['rings'], b['rings'])
+            ]
+        dances.append(dance)
+    data['dances'] = dances
+
+    return data
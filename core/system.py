@@ -2,7 +2,7 @@
 PollinationSystem - Main orchestrator for the pollination visualization
 """
 
-import time
+import hashlib
 import numpy as np
 from .structure import Structure
 from .aura import VisitorAura
@@ -10,6 +10,14 @@ from .trail import MovementTrail
 from .dance import PollinationDance
 from .agent import AutonomousAgent
 from .mycelium import MycelialNetwork
+from .profiler import FrameProfiler
+from .latency import now_ns
+from .rng import RNGService
+from .clock import Clock
+
+# Frame profiler spans (in update order) and per-frame element counts
+PROFILE_SPANS = ('structures', 'mycelium', 'collisions', 'trails', 'dances', 'agents', 'render_data')
+PROFILE_COUNTS = ('steps', 'visitors', 'trail_points', 'dances', 'agents', 'mycelium_particles')
 
 class PollinationSystem:
     """
@@ -17,7 +25,9 @@ class PollinationSystem:
     Receives position data and produces render data.
     """
     
-    def __init__(self, canvas_width=1920, canvas_height=1080, structures_config=None):
+    def __init__(self, canvas_width=1920, canvas_height=1080, structures_config=None,
+                 mycelium_seed=0, mycelium_max_distance=None, profile_frames=600, seed=None,
+                 clock=None):
         """
         Initialize the pollination system.
         
@@ -25,11 +35,22 @@ class PollinationSystem:
             canvas_width: Canvas width in pixels
             canvas_height: Canvas height in pixels
             structures_config: List of structure dicts with {id, x, y, radius, color}
+            mycelium_seed: Seed for the mycelial network layout
+            mycelium_max_distance: Maximum mycelial connection length
+                                   (default: canvas diagonal)
+            profile_frames: Frames kept by the frame profiler (0 = disabled)
+            seed: Root seed of the per-subsystem RNG streams (None = unseeded);
+                  with the same seed, inputs, dt and timestamps, runs are identical
+            clock: core.Clock ticked once per step (default: real-time clock)
         """
         self.canvas_width = canvas_width
         self.canvas_height = canvas_height
-        self.time = 0.0
-        self.start_time = time.time()
+        self.time = 0.0  # Simulation time (sum of dt)
+        self.clock = clock if clock is not None else Clock('real')
+        self.start_time = self.clock.now
+        self.seed = seed
+        self.rng = RNGService(seed)  # One random stream per subsystem
+        self.frame = 0  # Steps taken
         
         # Create structures
         self.structures = []
@@ -40,8 +61,19 @@ class PollinationSystem:
                 y = s['y'] * canvas_height if s['y'] <= 1.0 else s['y']
                 self.structures.append(Structure(s['id'], x, y, s['radius'], s['color']))
                 
+        # Structure positions/radii as arrays (collision tests for all visitors at once)
+        self._structure_xy = np.array([[s.x, s.y] for s in self.structures], dtype=np.float64).reshape(-1, 2)
+        self._structure_radius = np.array([s.radius for s in self.structures], dtype=np.float64)
+
         # Create mycelial network
-        self.mycelial_network = MycelialNetwork(self.structures)
+        if mycelium_max_distance is None:
+            mycelium_max_distance = float(np.hypot(canvas_width, canvas_height))
+        self.mycelial_network = MycelialNetwork(
+            self.structures,
+            max_distance=mycelium_max_distance,
+            seed=mycelium_seed,
+            rng=self.rng.stream('mycelium', seed=mycelium_seed)
+        )
         
         # Visitor tracking
         self.visitor_auras = {}  # person_id -> VisitorAura
@@ -49,6 +81,7 @@ class PollinationSystem:
         
         # Active pollination dances
         self.dances = []
+        self.dances_created = 0  # Next dance serial number
         
         # Autonomous agents
         self.agents = []
@@ -56,6 +89,14 @@ class PollinationSystem:
         # Settings
         self.intensity = 0.7
         self.speed = 5.0  # Increased for better visibility
+
+        # Per-subsystem frame timing (see get_profile())
+        self.profiler = FrameProfiler(
+            PROFILE_SPANS,
+            PROFILE_COUNTS,
+            capacity=max(profile_frames, 1),
+            enabled=profile_frames > 0
+        )
         
     def add_autonomous_agent(self, agent_type):
         """Add a bee, butterfly, or moth."""
@@ -64,47 +105,108 @@ class PollinationSystem:
             agent_id, 
             agent_type, 
             self.structures,
-            canvas_size=(self.canvas_width, self.canvas_height)
+            canvas_size=(self.canvas_width, self.canvas_height),
+            rng=self.rng.stream('agents')
         )
         self.agents.append(agent)
         return agent
         
+    def _add_dance(self, dance):
+        """Start a pollination dance (numbered so renderers can match it across steps)."""
+        dance.id = self.dances_created
+        self.dances_created += 1
+        self.dances.append(dance)
+        
     def _colors_match(self, color1, color2):
         """Check if two RGB colors match."""
         return np.array_equal(color1, color2)
         
-    def update(self, visitor_positions, dt=None):
+    def update(self, visitor_positions, dt=None, timestamp=None):
         """
         Update the entire system.
         
         Args:
             visitor_positions: List of dicts with {id, x, y}
-            dt: Delta time in seconds (auto-calculated if None)
+            dt: Delta time in seconds (default: from the clock)
+            timestamp: Time of this frame (default: from the clock);
+                       pass the recorded time when replaying
             
         Returns:
             Complete render data for all visual elements
         """
-        # Calculate dt if not provided
-        if dt is None:
-            current_time = time.time()
-            dt = current_time - (self.start_time + self.time)
-            dt = min(dt, 0.1)  # Cap at 100ms
+        update_start = now_ns()
+        profiler = self.profiler
+        # Inside a frame opened by the caller (e.g. a fixed-step catch-up), laps add to it
+        owns_frame = not profiler.active
+        if owns_frame:
+            profiler.begin_frame()
+        try:
+            self.step(visitor_positions, dt, timestamp)
+
+            # Return complete render data
+            render_data = self.get_render_data(visitor_positions, self.clock.now)
+        except Exception:
+            if owns_frame:
+                profiler.cancel_frame()  # Don't leave it open for the next update()
+            raise
+        profiler.lap('render_data')
+        # Pipeline timestamps for latency tracking (see core.latency)
+        render_data['timestamps'] = {'update_start': update_start, 'update_end': now_ns()}
+        if owns_frame:
+            self.end_profile_frame(visitor_positions)
+        return render_data
+
+    def end_profile_frame(self, visitor_positions, steps=1):
+        """
+        Close the profiler frame with this state's element counts.
+
+        Args:
+            visitor_positions: Input of the frame
+            steps: Simulation steps the frame spanned
+        """
+        profiler = self.profiler
+        if profiler.enabled:
+            profiler.end_frame(
+                steps=steps,
+                visitors=len(visitor_positions),
+                trail_points=sum(len(t.points) for t in self.visitor_trails.values()),
+                dances=len(self.dances),
+                agents=len(self.agents),
+                mycelium_particles=len(self.mycelial_network.particle_progress)
+            )
+        
+    def step(self, visitor_positions, dt=None, timestamp=None):
+        """
+        Advance the simulation without building render data.
+        
+        Args:
+            visitor_positions: List of dicts with {id, x, y}
+            dt: Delta time in seconds (default: from the clock)
+            timestamp: Time of this frame (default: from the clock)
+        """
+        profiler = self.profiler
+
+        # The only clock read of the frame
+        dt = self.clock.tick(dt, timestamp)
+        current_timestamp = self.clock.now
             
         self.time += dt
-        current_timestamp = time.time()
+        self.frame += 1
         
         # Update structures
         for structure in self.structures:
             structure.update(dt, self.time)
+        profiler.lap('structures')
             
         # Update mycelial network
         self.mycelial_network.update(dt, self.time)
+        profiler.lap('mycelium')
         
-        # Update visitors
+        # Update visitors: collisions first, then auras/trails (per-visitor
+        # state only, so splitting the loop keeps the result the same)
         active_visitor_ids = set()
         for visitor in visitor_positions:
             person_id = visitor['id']
-            px, py = visitor['x'], visitor['y']
             active_visitor_ids.add(person_id)
             
             # Create aura and trail if new
@@ -113,45 +215,59 @@ class PollinationSystem:
             if person_id not in self.visitor_trails:
                 aura = self.visitor_auras[person_id]
                 self.visitor_trails[person_id] = MovementTrail(person_id, aura)
-                
-            aura = self.visitor_auras[person_id]
-            trail = self.visitor_trails[person_id]
-            
-            # Check collisions with structures
-            for structure in self.structures:
-                if structure.contains_point(px, py):
-                    # Check if different color (pollination!)
-                    current_color = aura.get_color()
-                    is_different = current_color is not None and not self._colors_match(current_color, structure.color)
-                    
-                    if is_different and aura.has_color():
-                        # Create pollination dance at edge of structure
-                        dance = PollinationDance(
-                            structure.x,
-                            structure.y,
-                            current_color,
-                            structure.color,
-                            structure_radius=structure.radius
-                        )
-                        self.dances.append(dance)
-                        
-                    # Collect new color
-                    aura.collect_color(structure.color)
+
+        # Collisions with structures: one distance test for all visitors x
+        # structures, then only the hits (in visitor, then structure order)
+        if visitor_positions and self.structures:
+            xy = np.array([(v['x'], v['y']) for v in visitor_positions], dtype=np.float64)
+            dx = xy[:, 0:1] - self._structure_xy[:, 0]
+            dy = xy[:, 1:2] - self._structure_xy[:, 1]
+            visitor_hits, structure_hits = np.nonzero(np.sqrt(dx * dx + dy * dy) < self._structure_radius)
+            hits = zip(visitor_hits.tolist(), structure_hits.tolist())
+        else:
+            hits = ()
+        for v, s in hits:
+            aura = self.visitor_auras[visitor_positions[v]['id']]
+            structure = self.structures[s]
+
+            # Check if different color (pollination!)
+            current_color = aura.get_color()
+            is_different = current_color is not None and not self._colors_match(current_color, structure.color)
+
+            if is_different and aura.has_color():
+                # Create pollination dance at edge of structure
+                dance = PollinationDance(
+                    structure.x,
+                    structure.y,
+                    current_color,
+                    structure.color,
+                    structure_radius=structure.radius,
+                    rng=self.rng.stream('dances')
+                )
+                self._add_dance(dance)
+
+            # Collect new color
+            aura.collect_color(structure.color, current_timestamp)
+        profiler.lap('collisions')
                     
-            # Update aura and trail
-            aura.update(dt)
-            trail.update(px, py, dt)
+        # Update auras and trails
+        for visitor in visitor_positions:
+            person_id = visitor['id']
+            self.visitor_auras[person_id].update(dt)
+            self.visitor_trails[person_id].update(visitor['x'], visitor['y'], dt)
             
         # Remove auras/trails for visitors who left
         for person_id in list(self.visitor_auras.keys()):
             if person_id not in active_visitor_ids:
                 del self.visitor_auras[person_id]
                 del self.visitor_trails[person_id]
+        profiler.lap('trails')
                 
         # Update dances
         for dance in self.dances:
             dance.update(dt)
         self.dances = [d for d in self.dances if not d.is_dead()]
+        profiler.lap('dances')
         
         # Update autonomous agents
         for agent in self.agents:
@@ -166,22 +282,28 @@ class PollinationSystem:
                     pollination['y'],
                     pollination['old_color'],
                     pollination['new_color'],
-                    structure_radius=pollination.get('radius', 650)
+                    structure_radius=pollination.get('radius', 650),
+                    rng=self.rng.stream('dances')
                 )
-                self.dances.append(dance)
+                self._add_dance(dance)
                 # Clear the pollination flag
                 agent.last_pollination = None
-            
-        # Return complete render data
-        return self.get_render_data(visitor_positions, current_timestamp)
-        
-    def get_render_data(self, visitor_positions, current_time):
+        profiler.lap('agents')
+                
+
+    def get_render_data(self, visitor_positions, current_time=None):
         """
         Get all rendering data.
         
+        Args:
+            visitor_positions: List of dicts with {id, x, y}
+            current_time: Frame time for pulses (default: clock time)
+            
         Returns:
             Dictionary with all visual elements
         """
+        if current_time is None:
+            current_time = self.clock.now
         return {
             'mycelium': self.mycelial_network.get_render_data(),
             'structures': [s.get_render_data(self.time) for s in self.structures],
@@ -196,4 +318,154 @@ class PollinationSystem:
             'dances': [d.get_render_data() for d in self.dances],
             'agents': [a.get_render_data(current_time) for a in self.agents],
             'visitors': visitor_positions,  # Pass through for person indicators
+            'time': current_time,  # Frame time for render animation (clock time)
         }
+
+    def state_hash(self):
+        """
+        Hash of the full simulation state (for replay checkpoints).
+
+        Two systems with the same seed fed the same inputs, dt and
+        timestamps produce the same hash after every step.
+
+        Returns:
+            Hex digest string
+        """
+        h = hashlib.blake2b(digest_size=16)
+
+        def feed(*values):
+            h.update(np.asarray(values, dtype=np.float64).tobytes())
+
+        def feed_color(color):
+            if color is None:
+                feed(-1.0)
+            else:
+                feed(*color)
+
+        feed(self.frame, self.time, self.clock.now, self.dances_created)
+        h.update(self.rng.state_digest())
+
+        for s in self.structures:
+            feed(s.energy)
+
+        network = self.mycelial_network
+        feed(network.flow)
+        for array in (network.particle_edge, network.particle_progress,
+                      network.particle_direction, network.particle_life_left):
+            h.update(np.ascontiguousarray(array).tobytes())
+
+        for person_id, aura in self.visitor_auras.items():
+            feed(person_id, aura.intensity, aura.collected_time)
+            feed_color(aura.current_color)
+            trail = self.visitor_trails[person_id]
+            feed(*(trail.last_position or ()))
+            for p in trail.points:
+                feed(p['x'], p['y'], p['life'])
+                feed_color(p['color'])
+
+        for dance in self.dances:
+            feed(dance.x, dance.y, dance.life)
+            for p in dance.particles:
+                feed(p['angle'], p['radius'], p['angular_speed'], p['life'], p['size'])
+            for ring in dance.rings:
+                feed(ring['radius'], ring['speed'])
+
+        for agent in self.agents:
+            h.update(agent.state.encode())
+            feed(agent.x, agent.y, agent.state_timer, agent.glow_intensity, agent.collected_time,
+                 agent.target_structure.id if agent.target_structure is not None else -1)
+            feed_color(agent.current_color)
+            for p in agent.trail:
+                feed(p['x'], p['y'], p['life'])
+
+        return h.hexdigest()
+
+    def get_state(self):
+        """
+        Full simulation state for snapshots (see core.snapshot).
+
+        Returns:
+            Nested dict of JSON values and numpy arrays
+        """
+        return {
+            'canvas': [self.canvas_width, self.canvas_height],
+            'seed': self.seed,
+            'frame': self.frame,
+            'time': self.time,
+            'start_time': self.start_time,
+            'dances_created': self.dances_created,
+            'intensity': self.intensity,
+            'speed': self.speed,
+            'clock': self.clock.get_state(),
+            'rng': self.rng.get_state(),
+            'structures': np.array([s.energy for s in self.structures], dtype=np.float64),
+            'mycelium': self.mycelial_network.get_state(),
+            'visitors': [
+                {'id': person_id, 'aura': aura.get_state(), 'trail': self.visitor_trails[person_id].get_state()}
+                for person_id, aura in self.visitor_auras.items()
+            ],
+            'dances': [d.get_state() for d in self.dances],
+            'agents': [a.get_state() for a in self.agents],
+        }
+
+    def set_state(self, state):
+        """
+        Restore state saved by get_state().
+
+        The system must have been created with the same canvas size,
+        structures and mycelium seed; agents are recreated from the state.
+
+        Raises:
+            ValueError: If the state doesn't fit this system's layout
+        """
+        if list(state['canvas']) != [self.canvas_width, self.canvas_height]:
+            raise ValueError(
+                f"Snapshot canvas {state['canvas'][0]}x{state['canvas'][1]} differs from "
+                f"{self.canvas_width}x{self.canvas_height}")
+        if len(state['structures']) != len(self.structures):
+            raise ValueError(
+                f"Snapshot has {len(state['structures'])} structures, system has {len(self.structures)}")
+        self.mycelial_network.set_state(state['mycelium'])
+
+        self.frame = state['frame']
+        self.time = state['time']
+        self.start_time = state['start_time']
+        self.dances_created = state['dances_created']
+        self.intensity = state['intensity']
+        self.speed = state['speed']
+        self.clock.set_state(state['clock'])
+        for structure, energy in zip(self.structures, state['structures'].tolist()):
+            structure.energy = energy
+
+        self.visitor_auras = {}
+        self.visitor_trails = {}
+        for visitor in state['visitors']:
+            person_id = visitor['id']
+            aura = VisitorAura(person_id)
+            aura.set_state(visitor['aura'])
+            trail = MovementTrail(person_id, aura)
+            trail.set_state(visitor['trail'])
+            self.visitor_auras[person_id] = aura
+            self.visitor_trails[person_id] = trail
+
+        self.dances = [PollinationDance.from_state(d, rng=self.rng.stream('dances')) for d in state['dances']]
+
+        self.agents = []
+        for agent_state in state['agents']:
+            self.add_autonomous_agent(agent_state['type']).set_state(agent_state)
+
+        # Last: creating agents above draws from the streams
+        self.rng.set_state(state['rng'])
+
+    def get_profile(self, worst=5):
+        """
+        Per-subsystem frame timing from the built-in profiler.
+
+        Args:
+            worst: Number of slowest frames to include
+
+        Returns:
+            Dict with frames, percentiles (per span, ms) and worst_frames
+            (span breakdown and element counts)
+        """
+        return self.profiler.get_report(worst)
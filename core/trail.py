@@ -85,6 +85,30 @@ class MovementTrail:
         # Remove dead points
         self.points = [p for p in self.points if p['life'] > 0]
         
+    def get_state(self):
+        """Trail state for snapshots: points as parallel arrays (see core.snapshot)."""
+        points = self.points
+        return {
+            'last_position': None if self.last_position is None else list(self.last_position),
+            'x': np.array([p['x'] for p in points], dtype=np.float64),
+            'y': np.array([p['y'] for p in points], dtype=np.float64),
+            'life': np.array([p['life'] for p in points], dtype=np.float64),
+            'max_life': np.array([p['max_life'] for p in points], dtype=np.float64),
+            'time': np.array([p['time'] for p in points], dtype=np.float64),
+            'color': np.array([p['color'] for p in points], dtype=np.uint8).reshape(-1, 3),
+        }
+
+    def set_state(self, state):
+        """Restore state saved by get_state()."""
+        last = state['last_position']
+        self.last_position = None if last is None else tuple(last)
+        self.points = [
+            {'x': x, 'y': y, 'color': np.array(color, dtype=np.uint8), 'life': life, 'max_life': max_life, 'time': t}
+            for x, y, color, life, max_life, t in zip(
+                state['x'].tolist(), state['y'].tolist(), state['color'].tolist(),
+                state['life'].tolist(), state['max_life'].tolist(), state['time'].tolist())
+        ]
+
     def get_render_data(self):
         """
         Get list of trail points for rendering.
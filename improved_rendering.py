@@ -1,10 +1,199 @@
 # Improved rendering with better trail visibility
+import math
 import numpy as np
 
-def onCook(scriptOp):
-    """Render pollination system with enhanced trail visibility."""
+# Persistent buffers (reused between cooks instead of reallocated every frame)
+_context = None  # rendering.RendererContext (operator handles, settings, resolution)
+_canvas = None  # (H, W, 3) float32 RGB accumulation canvas
+_encoder = None  # rendering.OutputEncoder for the copyNumpyArray output
+_layer_stack = None  # rendering.LayerStack with the layers below
+_warp = None  # rendering.WarpStage (projection warp, created when first enabled)
+_tiles = None  # rendering.TileRenderer (multi-projector output, see config.TILE_*)
+_frame_profiler = None  # core.FrameProfiler for onCook (update, layers, encode, output)
+_latency = None  # core.LatencyTracker for input -> output timestamps
+_flash_events = None  # Recent latency-marker transitions (photodiode test mode)
+
+def _get_canvas(height, width):
+    """Get the persistent RGB accumulation canvas for this resolution."""
+    global _canvas
+    if _canvas is None or _canvas.shape[:2] != (height, width):
+        _canvas = np.empty((height, width, 3), dtype=np.float32)
+    return _canvas
+
+def _get_encoder(output_format, dither):
+    """Get the persistent output encoder configured for this cook."""
+    global _encoder
+    from rendering.output import OutputEncoder
+    if _encoder is None:
+        _encoder = OutputEncoder(output_format, dither)
+    else:
+        _encoder.set_format(output_format, dither)
+    return _encoder
+
+def _get_warp(context):
+    """Get the persistent projection warp stage (reads config.WARP_CALIBRATION next to config.py)."""
+    global _warp
+    if _warp is None:
+        import os
+        from rendering.warp import WarpStage
+        config = context.config
+        _warp = WarpStage(
+            os.path.join(context.project_folder, config.WARP_CALIBRATION),
+            config.WARP_INTERPOLATION,
+            config.WARP_CHECK_INTERVAL
+        )
+    return _warp
+
+def _get_tile_renderer(context):
+    """Get the persistent multi-projector tile renderer (workers start on first use)."""
+    global _tiles
+    config = context.config
+    if _tiles is not None and (_tiles.layout.tile_width, _tiles.layout.tile_height,
+                               _tiles.output_format, _tiles.dither) != (context.width, context.height,
+                                                                        context.output_format, context.dither):
+        close_tiles()
+    if _tiles is None:
+        from rendering.tiles import TileLayout, TileRenderer
+        layout = TileLayout(context.width, context.height, config.TILE_COLUMNS, config.TILE_ROWS,
+                            config.TILE_OVERLAP, config.TILE_BLEND_GAMMA)
+        _tiles = TileRenderer(layout, context.project_folder, config,
+                              workers=config.TILE_WORKERS,
+                              output_format=context.output_format,
+                              dither=context.dither,
+                              python=config.TILE_PYTHON)
+    return _tiles
+
+def get_tile_frame(index):
+    """
+    Get one projector's frame of the last cook (for its Script TOP's onCook).
+
+    Returns:
+        (H, W, 4) array, or None before the first tiled cook
+    """
+    if _tiles is None or index >= len(_tiles.frames):
+        return None
+    return _tiles.frames[index]
+
+def get_tile_stats():
+    """Get per-projector render times and splat counts (or None when not tiled)."""
+    if _tiles is None:
+        return None
+    return _tiles.get_stats()
+
+def close_tiles():
+    """Stop the tile workers (call from an Execute DAT's onExit)."""
+    global _tiles
+    if _tiles is not None:
+        _tiles.close()
+        _tiles = None
+
+def get_warp_stats():
+    """Get the projection warp state (or None if the warp was never enabled)."""
+    if _warp is None:
+        return None
+    return _warp.get_stats()
+
+def fill_background(canvas):
+    """Fill the canvas with the background (dark forest floor)."""
+    canvas[:, :, 0] = 10 / 255.0
+    canvas[:, :, 1] = 15 / 255.0
+    canvas[:, :, 2] = 8 / 255.0
+
+def build_layer_stack(config, rates=None, viewport=None):
+    """
+    Build the renderer's layer stack (bottom to top).
+
+    Args:
+        config: Config module (stagger and culling settings)
+        rates: Dict layer name -> update Hz (default: config.LAYER_RATES,
+               {} = every layer redraws every frame)
+        viewport: Optional (x, y, floor_width, floor_height) to render one
+                  projector tile of a larger floor (see rendering.tiles)
+    """
+    from rendering.layers import RenderLayer, LayerStack
+    from rendering import drawlist
+    if rates is None:
+        rates = config.LAYER_RATES
+    primitives = {
+        drawlist.ADDITIVE: draw_circle_additive,
+        drawlist.BLEND: draw_circle,
+        drawlist.RING_SOFT: draw_circle_ring_soft,
+    }
+    return LayerStack([
+        # Background effects
+        RenderLayer('ripples', draw_ripples_layer, rates.get('ripples')),
+        RenderLayer('mycelium', draw_mycelium_layer, rates.get('mycelium')),
+        # Scene
+        RenderLayer('trees', draw_trees_layer, rates.get('trees')),
+        RenderLayer('agent_trails', draw_agent_trails_layer, rates.get('agent_trails')),
+        RenderLayer('visitor_trails', draw_visitor_trails_layer, rates.get('visitor_trails')),
+        RenderLayer('visitor_auras', draw_visitor_auras_layer, rates.get('visitor_auras')),
+        RenderLayer('agents', draw_agents_layer, additive=False),  # Bodies are alpha-blended
+        RenderLayer('visitors', draw_visitors_layer, rates.get('visitors')),
+        RenderLayer('dances', draw_dances_layer, rates.get('dances')),
+    ], primitives,
+        stagger=config.LAYER_STAGGER,
+        cull=config.CULL_ENABLED,
+        min_contribution=config.CULL_MIN_CONTRIBUTION,
+        viewport=viewport)
+
+def _get_layer_stack(config):
+    """Get the persistent layer stack used by onCook."""
+    global _layer_stack
+    if _layer_stack is None:
+        _layer_stack = build_layer_stack(config)
+        _layer_stack.profiler = _get_frame_profiler(config, _layer_stack)
+    return _layer_stack
+
+def _get_frame_profiler(config, layer_stack):
+    """Get the persistent cook profiler (one span per stage and layer)."""
+    global _frame_profiler
+    if _frame_profiler is None:
+        from core.profiler import FrameProfiler
+        spans = (('update', 'background')
+                 + tuple(layer.name for layer in layer_stack.layers)
+                 + ('composite', 'warp', 'tiles', 'encode', 'output'))
+        _frame_profiler = FrameProfiler(
+            spans,
+            ('visitors', 'agents', 'dances', 'splats'),
+            capacity=max(config.PROFILE_FRAMES, 1),
+            enabled=config.PROFILE_FRAMES > 0
+        )
+    return _frame_profiler
+
+def get_frame_profile(worst=5):
+    """
+    Get rolling cook-time percentiles and the slowest cooks (or None before the first cook).
+
+    Args:
+        worst: Number of slowest frames to include
+
+    Returns:
+        Dict with frames, percentiles (per span, ms) and worst_frames
+        (span breakdown and element counts)
+    """
+    if _frame_profiler is None:
+        return None
+    return _frame_profiler.get_report(worst)
+
+def get_layer_timings():
+    """Get the per-layer timing breakdown of the last cook (or None before the first cook)."""
+    if _layer_stack is None:
+        return None
+    return _layer_stack.get_timings()
+
+def get_cull_stats():
+    """Get per-layer splat/cull counts of the last redraw (or None before the first cook)."""
+    if _layer_stack is None:
+        return None
+    return _layer_stack.get_cull_stats()
+
+def _get_context():
+    """Get the cached renderer context, resolving it on the first cook after invalidation."""
+    global _context
+    if _context is not None and _context.is_valid():
+        return _context
 
-    # Get canvas dimensions from TouchDesigner UI settings or config
     import sys
     import os
 
@@ -20,54 +209,171 @@ def onCook(scriptOp):
         sys.path.insert(0, biotelia_path)
 
     import config
+    from rendering.context import RendererContext
 
-    # Try to get settings from TouchDesigner UI
-    settings = op('/project1/settings_control')
+    context = RendererContext(op, biotelia_path, config)
+    context.encoder = _get_encoder(context.output_format, context.dither)
 
-    if settings and hasattr(settings.par, 'Resmode'):
-        # Use TouchDesigner parameter (string: "test" or "production")
-        use_production = (settings.par.Resmode.eval() == "production")
-        width = config.PRODUCTION_WIDTH if use_production else config.TEST_WIDTH
-        height = config.PRODUCTION_HEIGHT if use_production else config.TEST_HEIGHT
-    else:
-        # Fallback to config defaults
-        width = config.DEFAULT_WIDTH
-        height = config.DEFAULT_HEIGHT
+    # Keep resolving until the system DAT exists
+    _context = context if context.pollination_dat else None
+    return context
 
-    pollination_dat = op('/project1/pollination_system')
-    input_chop = op('/project1/input_switch')
+def invalidate_context():
+    """
+    Drop the cached renderer context (re-resolved on the next cook).
 
-    if not pollination_dat:
-        scriptOp.copyNumpyArray(np.zeros((height, width, 4), dtype=np.float32))
+    Call from a Parameter Execute DAT on settings_control (onValueChange)
+    so Resmode / Outputformat / Dither / Latencyflash changes take effect,
+    and after replacing the operators the renderer looks up.
+    """
+    global _context
+    _context = None
+
+def onCook(scriptOp):
+    """Render pollination system with enhanced trail visibility."""
+    context = _get_context()
+    config = context.config
+    width, height = context.width, context.height
+    encoder = context.encoder
+
+    if not context.pollination_dat:
+        scriptOp.copyNumpyArray(encoder.blank(height, width))
         return
 
+    now_ns = context.now_ns
+    layer_stack = _get_layer_stack(config)
+    profiler = layer_stack.profiler
+    profiler.begin_frame()
+
     try:
-        render_data = pollination_dat.module.update_frame(input_chop, 1.0/60.0)
+        render_data = context.pollination_dat.module.update_frame(context.input_chop)
     except Exception as e:
-        scriptOp.copyNumpyArray(np.zeros((height, width, 4), dtype=np.float32))
+        profiler.end_frame()
+        scriptOp.copyNumpyArray(encoder.blank(height, width))
+        return
+    profiler.lap('update')
+    stamps = dict(render_data.get('timestamps', ()))
+    stamps['render_start'] = now_ns()
+
+    # Time for trail flow animation: the simulation clock's frame time
+    flow_time = render_data['time']
+
+    # Multi-projector output: every tile rendered from this frame's state,
+    # this TOP shows projector 0 (the others read get_tile_frame())
+    if context.tiled:
+        frames = _get_tile_renderer(context).render(render_data, flow_time)
+        profiler.lap('tiles')
+        scriptOp.copyNumpyArray(frames[0])
+        stamps['output'] = now_ns()
+        profiler.lap('output')
+        _get_latency_tracker().record(stamps)
+        if profiler.enabled:
+            profiler.end_frame(
+                visitors=len(render_data.get('visitors', ())),
+                agents=len(render_data.get('agents', ())),
+                dances=len(render_data.get('dances', ())),
+                splats=sum(s.get('drawn', 0) for s in _tiles.tile_stats if s)
+            )
         return
 
-    # Create canvas with configured dimensions
-    canvas = np.zeros((height, width, 4), dtype=np.float32)
+    # Persistent RGB canvas with configured dimensions (alpha is added by the encoder)
+    canvas = _get_canvas(height, width)
 
     # Background (dark forest floor)
-    canvas[:, :, 0] = 10 / 255.0
-    canvas[:, :, 1] = 15 / 255.0
-    canvas[:, :, 2] = 8 / 255.0
-    canvas[:, :, 3] = 1.0
-
-    # Get time for trail flow animation
-    import time
-    import random
-    import math
-    flow_time = time.time()
-
-    # Get structure positions for mycelial network
-    structures = render_data.get('structures', [])
-
-    # === BACKGROUND EFFECTS ===
-
-    # 0a. Subtle watery ripples throughout the space
+    fill_background(canvas)
+    profiler.lap('background')
+
+    # Draw/composite all layers (slow layers redraw at their own rate)
+    layer_stack.render(canvas, render_data, flow_time)
+
+    # Keystone / lens correction: gather through the precomputed remap table
+    if context.warp:
+        canvas = _get_warp(context).apply(canvas)
+        profiler.lap('warp')
+
+    # Photodiode test marker (motion-to-photon measurement; after the warp, so it stays in the projector's corner)
+    flash_mode = context.flash_mode
+    tracker = _get_latency_tracker()
+    if flash_mode != 'off':
+        lit = latency_marker_lit(flash_mode, render_data, flow_time, width, config)
+        draw_latency_marker(canvas, lit, config.LATENCY_FLASH_SIZE)
+
+    output = encoder.encode(canvas)
+    stamps['encode_done'] = now_ns()
+    profiler.lap('encode')
+    scriptOp.copyNumpyArray(output)
+    stamps['output'] = now_ns()
+    profiler.lap('output')
+    tracker.record(stamps)
+    if flash_mode != 'off':
+        if not _flash_events or _flash_events[-1]['lit'] != lit:
+            _flash_events.append({
+                'lit': lit,
+                'time': flow_time,  # Clock (wall) time of the frame
+                'ingest_ns': stamps.get('ingest'),
+                'output_ns': stamps['output'],
+            })
+    if profiler.enabled:
+        profiler.end_frame(
+            visitors=len(render_data.get('visitors', ())),
+            agents=len(render_data.get('agents', ())),
+            dances=len(render_data.get('dances', ())),
+            splats=layer_stack.count_drawn()
+        )
+
+def _get_latency_tracker():
+    """Get the persistent latency tracker (and flash event log)."""
+    global _latency, _flash_events
+    if _latency is None:
+        from collections import deque
+        from core.latency import LatencyTracker
+        _latency = LatencyTracker()
+        _flash_events = deque(maxlen=256)
+    return _latency
+
+def get_latency_report():
+    """
+    Get per-stage input -> output latency (or None before the first cook).
+
+    Returns:
+        Dict with stages (count, mean/percentiles/max in ms per stage, see
+        core.latency.PIPELINE_STAGES) and flash_events (latency-marker
+        transitions with their ingest/output timestamps, for matching
+        against an external photodiode capture)
+    """
+    if _latency is None:
+        return None
+    return {
+        'stages': _latency.get_report(),
+        'flash_events': list(_flash_events),
+    }
+
+def latency_marker_lit(mode, render_data, flow_time, width, config):
+    """
+    Whether the latency test marker is lit this frame.
+
+    Modes:
+        'off': never
+        'periodic': square wave with period LATENCY_FLASH_PERIOD (seconds)
+        'input': while any visitor is right of LATENCY_FLASH_TRIGGER_X
+                 (0-1 of the width) - move a tracked marker across that line
+                 next to a light gate to measure tracker-to-photon latency
+    """
+    if mode == 'periodic':
+        return (flow_time % config.LATENCY_FLASH_PERIOD) < config.LATENCY_FLASH_PERIOD / 2
+    if mode == 'input':
+        trigger_x = config.LATENCY_FLASH_TRIGGER_X * width
+        return any(v['x'] > trigger_x for v in render_data.get('visitors', ()))
+    return False
+
+def draw_latency_marker(canvas, lit, size):
+    """Paint the photodiode marker (bottom-right square, white when lit, black otherwise)."""
+    canvas[-size:, -size:, :] = 1.0 if lit else 0.0
+
+# === LAYERS ===
+
+def draw_ripples_layer(draw_list, render_data, flow_time, width, height):
+    """Subtle watery ripples throughout the space."""
     num_ripple_centers = 8  # Number of ripple origin points
     for ripple_idx in range(num_ripple_centers):
         # Deterministic ripple positions spread across canvas
@@ -97,105 +403,120 @@ def onCook(scriptOp):
             ring_width = 15 + ring * 5
 
             if current_radius > ring_width:
-                draw_circle_ring_soft(canvas, ripple_x, ripple_y,
-                                     int(current_radius), int(current_radius - ring_width),
-                                     ripple_color, alpha)
-
-    # 0b. Mycelial network - pulses flowing between trees
-    if len(structures) >= 2:
-        # Create connections between all tree pairs
-        mycelial_color = (100, 75, 130)  # Brighter purple
-
-        for i in range(len(structures)):
-            for j in range(i + 1, len(structures)):
-                s1 = structures[i]
-                s2 = structures[j]
-                x1, y1 = int(s1['x']), int(s1['y'])
-                x2, y2 = int(s2['x']), int(s2['y'])
-
-                # Draw multiple pulses traveling along the connection
-                num_pulses = 3
-                for pulse_idx in range(num_pulses):
-                    # Each pulse travels from one tree to the other
-                    pulse_speed = 0.15 + pulse_idx * 0.05  # Different speeds
-                    pulse_offset = pulse_idx * 0.33  # Stagger pulses
-
-                    # Bidirectional - some go one way, some the other
-                    if pulse_idx % 2 == 0:
-                        t = ((flow_time * pulse_speed + pulse_offset) % 1.0)
-                    else:
-                        t = 1.0 - ((flow_time * pulse_speed + pulse_offset) % 1.0)
-
-                    # Pulse position along the line
-                    px = x1 + (x2 - x1) * t
-                    py = y1 + (y2 - y1) * t
-
-                    # Add organic waviness to path
-                    wave_offset = math.sin(t * math.pi * 4 + flow_time + i + j) * 25
-                    dx, dy = x2 - x1, y2 - y1
-                    length = math.sqrt(dx*dx + dy*dy)
-                    if length > 0:
-                        # Perpendicular offset
-                        px += (-dy / length) * wave_offset
-                        py += (dx / length) * wave_offset
-
-                    # Pulse intensity (brightest in middle of journey) - brighter now
-                    pulse_alpha = math.sin(t * math.pi) * 0.45
-
-                    # Draw pulse as soft glow
-                    pulse_radius = 30 + math.sin(flow_time * 3 + pulse_idx) * 10
-                    draw_circle_additive(canvas, int(px), int(py), int(pulse_radius * 2), mycelial_color, pulse_alpha * 0.3)
-                    draw_circle_additive(canvas, int(px), int(py), int(pulse_radius), mycelial_color, pulse_alpha * 0.5)
-                    draw_circle_additive(canvas, int(px), int(py), int(pulse_radius * 0.5), mycelial_color, pulse_alpha)
-
-    # === RENDER LAYERS ===
-
-    # 1. Structures (trees) - floating particles within circle radius
+                draw_list.ring_soft(ripple_x, ripple_y,
+                                    int(current_radius), int(current_radius - ring_width),
+                                    ripple_color, alpha)
+
+def draw_mycelium_layer(draw_list, render_data, flow_time, width, height):
+    """Mycelial network - pulses flowing between connected trees."""
+    structures = render_data.get('structures', [])
+    mycelium = render_data.get('mycelium')
+
+    if mycelium is not None and 'edge_a' in mycelium:
+        # Connections from the MycelialNetwork edge arrays
+        i = np.asarray(mycelium['edge_a'])
+        j = np.asarray(mycelium['edge_b'])
+        x1, y1 = np.trunc(mycelium['x1']), np.trunc(mycelium['y1'])
+        x2, y2 = np.trunc(mycelium['x2']), np.trunc(mycelium['y2'])
+    elif len(structures) >= 2:
+        # No network data: connect all tree pairs
+        i, j = np.triu_indices(len(structures), 1)
+        positions = np.trunc([[s['x'], s['y']] for s in structures])
+        x1, y1 = positions[i, 0], positions[i, 1]
+        x2, y2 = positions[j, 0], positions[j, 1]
+    else:
+        return
+
+    if len(i) == 0:
+        return
+
+    mycelial_color = (100, 75, 130)  # Brighter purple
+
+    # Multiple pulses traveling along each connection - shape (edges, pulses)
+    num_pulses = 3
+    pulse_idx = np.arange(num_pulses)
+    pulse_speed = 0.15 + pulse_idx * 0.05  # Different speeds
+    pulse_offset = pulse_idx * 0.33  # Stagger pulses
+
+    # Bidirectional - some go one way, some the other
+    t = (flow_time * pulse_speed + pulse_offset) % 1.0
+    t = np.where(pulse_idx % 2 == 0, t, 1.0 - t)[np.newaxis, :]
+
+    # Pulse position along the line
+    x1, y1, x2, y2 = (v[:, np.newaxis] for v in (x1, y1, x2, y2))
+    px = x1 + (x2 - x1) * t
+    py = y1 + (y2 - y1) * t
+
+    # Add organic waviness to path (perpendicular offset)
+    wave_offset = np.sin(t * math.pi * 4 + flow_time + (i + j)[:, np.newaxis]) * 25
+    dx, dy = x2 - x1, y2 - y1
+    length = np.sqrt(dx*dx + dy*dy)
+    safe_length = np.where(length > 0, length, 1.0)
+    px = np.where(length > 0, px + (-dy / safe_length) * wave_offset, px)
+    py = np.where(length > 0, py + (dx / safe_length) * wave_offset, py)
+
+    # Pulse intensity (brightest in middle of journey) - brighter now
+    pulse_alpha = np.broadcast_to(np.sin(t * math.pi) * 0.45, px.shape)
+
+    # Draw pulse as soft glow - three splats per pulse
+    pulse_radius = np.broadcast_to(30 + np.sin(flow_time * 3 + pulse_idx) * 10, px.shape)
+    draw_list.circles_additive(
+        np.repeat(np.trunc(px).ravel(), 3), np.repeat(np.trunc(py).ravel(), 3),
+        np.stack([np.trunc(pulse_radius * 2), np.trunc(pulse_radius), np.trunc(pulse_radius * 0.5)], axis=-1),
+        mycelial_color,
+        np.stack([pulse_alpha * 0.3, pulse_alpha * 0.5, pulse_alpha], axis=-1))
+
+def draw_trees_layer(draw_list, render_data, flow_time, width, height):
+    """Structures (trees) - floating particles within circle radius."""
+    # Generate floating particles within the circle
+    num_particles = 120  # Number of particles per tree
+    i = np.arange(num_particles)
+
+    # Base position within circle (polar coordinates)
+    # Use golden ratio for even distribution
+    golden_angle = math.pi * (3 - math.sqrt(5))
+    theta_base = i * golden_angle
+    # Distribute radius with sqrt for even area coverage
+    r_unit = np.sqrt((i + 0.5) / num_particles) * 0.95
+
     for struct_idx, structure in enumerate(render_data.get('structures', [])):
         x, y = int(structure['x']), int(structure['y'])
         radius = int(structure['radius'])
         color = structure['color']
 
-        # Generate floating particles within the circle
-        num_particles = 120  # Number of particles per tree
-
-        for i in range(num_particles):
-            # Use deterministic seed for each particle (consistent positions)
-            seed = struct_idx * 1000 + i
+        # Use deterministic seed for each particle (consistent positions)
+        seed = struct_idx * 1000 + i
+        r_base = r_unit * radius
 
-            # Base position within circle (polar coordinates)
-            # Use golden ratio for even distribution
-            golden_angle = math.pi * (3 - math.sqrt(5))
-            theta_base = i * golden_angle
-            # Distribute radius with sqrt for even area coverage
-            r_base = math.sqrt((i + 0.5) / num_particles) * radius * 0.95
+        # Add floating animation
+        float_speed = 0.3 + (seed % 100) / 200.0  # Varying speeds
+        float_amp = 20 + (seed % 50)  # Varying amplitudes
 
-            # Add floating animation
-            float_speed = 0.3 + (seed % 100) / 200.0  # Varying speeds
-            float_amp = 20 + (seed % 50)  # Varying amplitudes
+        # Orbital drift
+        theta = theta_base + np.sin(flow_time * float_speed + seed) * 0.3
+        r = r_base + np.sin(flow_time * float_speed * 0.7 + seed * 0.1) * float_amp
 
-            # Orbital drift
-            theta = theta_base + math.sin(flow_time * float_speed + seed) * 0.3
-            r = r_base + math.sin(flow_time * float_speed * 0.7 + seed * 0.1) * float_amp
-
-            # Convert to cartesian
-            px = int(x + math.cos(theta) * r)
-            py = int(y + math.sin(theta) * r)
+        # Convert to cartesian
+        px = np.trunc(x + np.cos(theta) * r)
+        py = np.trunc(y + np.sin(theta) * r)
 
-            # Particle size varies (bigger)
-            particle_size = 12 + (seed % 10)
+        # Particle size varies (bigger)
+        particle_size = 12 + (seed % 10)
 
-            # Alpha varies by distance from center and time (brighter)
-            dist_factor = 1.0 - (r / radius) * 0.2
-            pulse = 0.7 + math.sin(flow_time * 2 + seed * 0.5) * 0.3
-            alpha = 0.8 * dist_factor * pulse
+        # Alpha varies by distance from center and time (brighter)
+        dist_factor = 1.0 - (r / radius) * 0.2
+        pulse = 0.7 + np.sin(flow_time * 2 + seed * 0.5) * 0.3
+        alpha = 0.8 * dist_factor * pulse
 
-            # Draw particle with glow (larger glow radius)
-            draw_circle_additive(canvas, px, py, particle_size * 2.5, color, alpha * 0.5)
-            draw_circle_additive(canvas, px, py, particle_size * 1.5, color, alpha * 0.7)
-            draw_circle_additive(canvas, px, py, particle_size, color, alpha)
+        # Draw particle with glow (larger glow radius) - three splats per particle
+        draw_list.circles_additive(
+            np.repeat(px, 3), np.repeat(py, 3),
+            np.stack([particle_size * 2.5, particle_size * 1.5, particle_size], axis=1),
+            color,
+            np.stack([alpha * 0.5, alpha * 0.7, alpha], axis=1))
 
-    # 2. Agent trails (with watery flow!)
+def draw_agent_trails_layer(draw_list, render_data, flow_time, width, height):
+    """Agent trails (with watery flow!)."""
     for agent_idx, agent in enumerate(render_data.get('agents', [])):
         for point_idx, point in enumerate(agent.get('trail', [])):
             # Add wavy displacement to create flowing water effect
@@ -217,13 +538,14 @@ def onCook(scriptOp):
 
             # Watery trails with larger glow
             # Outer glow (very soft)
-            draw_circle_additive(canvas, x, y, size * 4, color, alpha * 0.3)
+            draw_list.circle_additive(x, y, size * 4, color, alpha * 0.3)
             # Middle glow
-            draw_circle_additive(canvas, x, y, size * 2, color, alpha * 0.5)
+            draw_list.circle_additive(x, y, size * 2, color, alpha * 0.5)
             # Core
-            draw_circle_additive(canvas, x, y, size, color, alpha * 0.7)
+            draw_list.circle_additive(x, y, size, color, alpha * 0.7)
 
-    # 3. Visitor trails (particle effect!)
+def draw_visitor_trails_layer(draw_list, render_data, flow_time, width, height):
+    """Visitor trails (particle effect!)."""
     for trail_idx, trail_points in enumerate(render_data.get('visitor_trails', [])):
         for point_idx, point in enumerate(trail_points):
             base_x = point['x']
@@ -253,18 +575,19 @@ def onCook(scriptOp):
                 p_alpha = alpha * (0.4 + (seed % 10) * 0.06) * (0.7 + math.sin(flow_time * 3 + seed) * 0.3)
 
                 # Draw particle with glow
-                draw_circle_additive(canvas, px, py, int(p_size * 2), color, p_alpha * 0.4)
-                draw_circle_additive(canvas, px, py, int(p_size), color, p_alpha * 0.7)
+                draw_list.circle_additive(px, py, int(p_size * 2), color, p_alpha * 0.4)
+                draw_list.circle_additive(px, py, int(p_size), color, p_alpha * 0.7)
 
             # Still draw core trail point (smaller now, particles are the main effect)
             wave1 = math.sin((base_x * 0.02) + (flow_time * 2) + (trail_idx * 0.5)) * 8
             wave2 = math.cos((base_y * 0.014) + (flow_time * 1.5) + (point_idx * 0.1)) * 5
             x = int(base_x + wave1)
             y = int(base_y + wave2)
-            draw_circle_additive(canvas, x, y, size * 2, color, alpha * 0.5)
-            draw_circle_additive(canvas, x, y, size, color, alpha * 0.8)
+            draw_list.circle_additive(x, y, size * 2, color, alpha * 0.5)
+            draw_list.circle_additive(x, y, size, color, alpha * 0.8)
 
-    # 4. Visitor auras (color from touching trees) - particle cloud
+def draw_visitor_auras_layer(draw_list, render_data, flow_time, width, height):
+    """Visitor auras (color from touching trees) - particle cloud."""
     for aura_idx, aura in enumerate(render_data.get('visitor_auras', [])):
         if aura is not None:
             x, y = int(aura['x']), int(aura['y'])
@@ -304,11 +627,12 @@ def onCook(scriptOp):
                 p_alpha = intensity * 0.7 * dist_factor * pulse
 
                 # Draw particle with glow
-                draw_circle_additive(canvas, px, py, int(particle_size * 2), color, p_alpha * 0.4)
-                draw_circle_additive(canvas, px, py, int(particle_size * 1.3), color, p_alpha * 0.6)
-                draw_circle_additive(canvas, px, py, int(particle_size), color, p_alpha * 0.8)
+                draw_list.circle_additive(px, py, int(particle_size * 2), color, p_alpha * 0.4)
+                draw_list.circle_additive(px, py, int(particle_size * 1.3), color, p_alpha * 0.6)
+                draw_list.circle_additive(px, py, int(particle_size), color, p_alpha * 0.8)
 
-    # 5. Agents (bee/butterfly/moth) with glows
+def draw_agents_layer(draw_list, render_data, flow_time, width, height):
+    """Agents (bee/butterfly/moth) with glows."""
     for agent in render_data.get('agents', []):
         x, y = int(agent['x']), int(agent['y'])
 
@@ -320,14 +644,15 @@ def onCook(scriptOp):
             glow_intensity = glow['intensity']
 
             # Large glow
-            draw_circle_additive(canvas, x, y, glow_radius * 2, glow_color, glow_intensity * 0.4)
+            draw_list.circle_additive(x, y, glow_radius * 2, glow_color, glow_intensity * 0.4)
             # Medium glow
-            draw_circle_additive(canvas, x, y, glow_radius, glow_color, glow_intensity * 0.6)
+            draw_list.circle_additive(x, y, glow_radius, glow_color, glow_intensity * 0.6)
 
         # Agent body
-        draw_circle(canvas, x, y, agent['size'], agent['base_color'], 0.9)
+        draw_list.circle(x, y, agent['size'], agent['base_color'], 0.9)
 
-    # 6. Visitor indicators - white particle cloud (only if not carrying color)
+def draw_visitors_layer(draw_list, render_data, flow_time, width, height):
+    """Visitor indicators - white particle cloud (only if not carrying color)."""
     visitor_auras = render_data.get('visitor_auras', [])
     for visitor_idx, visitor in enumerate(render_data.get('visitors', [])):
         # Check if this visitor has a colored aura
@@ -377,11 +702,12 @@ def onCook(scriptOp):
             p_alpha = 0.35 * dist_factor * pulse
 
             # Draw particle with glow
-            draw_circle_additive(canvas, px, py, int(particle_size * 2), white_color, p_alpha * 0.4)
-            draw_circle_additive(canvas, px, py, int(particle_size * 1.3), white_color, p_alpha * 0.6)
-            draw_circle_additive(canvas, px, py, int(particle_size), white_color, p_alpha * 0.8)
+            draw_list.circle_additive(px, py, int(particle_size * 2), white_color, p_alpha * 0.4)
+            draw_list.circle_additive(px, py, int(particle_size * 1.3), white_color, p_alpha * 0.6)
+            draw_list.circle_additive(px, py, int(particle_size), white_color, p_alpha * 0.8)
 
-    # 7. Pollination dances (spiral effect at edge of trees)
+def draw_dances_layer(draw_list, render_data, flow_time, width, height):
+    """Pollination dances (spiral effect at edge of trees)."""
     for dance in render_data.get('dances', []):
         for particle in dance.get('particles', []):
             x, y = int(particle['x']), int(particle['y'])
@@ -390,11 +716,11 @@ def onCook(scriptOp):
             size = int(particle['size'])
 
             # Larger glow layers for more visible spiral
-            draw_circle_additive(canvas, x, y, size * 3, color, alpha * 0.3)
-            draw_circle_additive(canvas, x, y, size * 2, color, alpha * 0.5)
-            draw_circle_additive(canvas, x, y, size, color, alpha * 0.8)
+            draw_list.circle_additive(x, y, size * 3, color, alpha * 0.3)
+            draw_list.circle_additive(x, y, size * 2, color, alpha * 0.5)
+            draw_list.circle_additive(x, y, size, color, alpha * 0.8)
 
-    scriptOp.copyNumpyArray(canvas)
+# === PRIMITIVES ===
 
 def draw_circle(canvas, x, y, radius, color, alpha):
     """Draw filled circle with alpha blending."""
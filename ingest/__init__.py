@@ -0,0 +1,19 @@
+"""
+Biotelia Pollination System - Input capture and replay
+"""
+
+from .recorder import SessionRecorder, read_session, session_frames
+from .crowd import CrowdSimulator, write_session
+from .channels import MocapChannels, visitors_from_arrays
+from .calibration import Calibration
+
+__all__ = [
+    'SessionRecorder',
+    'read_session',
+    'session_frames',
+    'CrowdSimulator',
+    'write_session',
+    'MocapChannels',
+    'visitors_from_arrays',
+    'Calibration',
+]
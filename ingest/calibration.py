@@ -0,0 +1,178 @@
+"""
+Mocap calibration - Floor-point fit from tracker coordinates to canvas pixels
+
+Measure a few floor points in both systems (stand a marker on a spot,
+read the tracker coordinates, note the pixel where the projection shows
+that spot), fit an affine (3+ points) or homography (4+ points, corrects
+keystone/perspective) transform, and save it as JSON next to config.py.
+The ingest path then maps every visitor's position with one matrix
+operation instead of TD Math CHOPs.
+"""
+
+import json
+import numpy as np
+
+CALIBRATION_KINDS = ('affine', 'homography')
+
+def _normalize(points):
+    """Similarity transform moving points to centroid 0, mean distance sqrt(2) (conditions the fit)."""
+    centroid = points.mean(axis=0)
+    scale = np.sqrt(2.0) / max(np.mean(np.hypot(*(points - centroid).T)), 1e-12)
+    return np.array([
+        [scale, 0.0, -scale * centroid[0]],
+        [0.0, scale, -scale * centroid[1]],
+        [0.0, 0.0, 1.0],
+    ])
+
+def fit_affine(src, dst):
+    """
+    Least-squares affine transform mapping src to dst.
+
+    Args:
+        src, dst: (n, 2) point arrays, n >= 3 (not all on a line)
+
+    Returns:
+        3x3 matrix (last row 0, 0, 1)
+    """
+    src = np.asarray(src, dtype=np.float64)
+    dst = np.asarray(dst, dtype=np.float64)
+    if len(src) < 3 or len(src) != len(dst):
+        raise ValueError("Affine calibration needs at least 3 point pairs")
+    a = np.hstack([src, np.ones((len(src), 1))])
+    solution, _, rank, _ = np.linalg.lstsq(a, dst, rcond=None)
+    if rank < 3:
+        raise ValueError("Calibration points are collinear")
+    return np.vstack([solution.T, [0.0, 0.0, 1.0]])
+
+def fit_homography(src, dst):
+    """
+    Homography mapping src to dst (normalized DLT, least squares for n > 4).
+
+    Args:
+        src, dst: (n, 2) point arrays, n >= 4 (no three collinear)
+
+    Returns:
+        3x3 matrix (scaled so [2, 2] = 1)
+    """
+    src = np.asarray(src, dtype=np.float64)
+    dst = np.asarray(dst, dtype=np.float64)
+    if len(src) < 4 or len(src) != len(dst):
+        raise ValueError("Homography calibration needs at least 4 point pairs")
+    t_src = _normalize(src)
+    t_dst = _normalize(dst)
+    s = apply_matrix(t_src, src)
+    d = apply_matrix(t_dst, dst)
+
+    # Two equations per point pair
+    n = len(s)
+    zeros = np.zeros(n)
+    ones = np.ones(n)
+    rows_x = np.stack([s[:, 0], s[:, 1], ones, zeros, zeros, zeros,
+                       -d[:, 0] * s[:, 0], -d[:, 0] * s[:, 1], -d[:, 0]], axis=1)
+    rows_y = np.stack([zeros, zeros, zeros, s[:, 0], s[:, 1], ones,
+                       -d[:, 1] * s[:, 0], -d[:, 1] * s[:, 1], -d[:, 1]], axis=1)
+    _, singular, vt = np.linalg.svd(np.vstack([rows_x, rows_y]))
+    if singular[7] < 1e-10 * singular[0]:
+        raise ValueError("Calibration points are degenerate (three or more collinear)")
+    h = vt[-1].reshape(3, 3)
+
+    matrix = np.linalg.inv(t_dst) @ h @ t_src
+    return matrix / matrix[2, 2]
+
+def apply_matrix(matrix, points):
+    """Map (n, 2) points through a 3x3 transform (with perspective divide)."""
+    points = np.asarray(points, dtype=np.float64)
+    mapped = points @ matrix[:2, :2].T + matrix[:2, 2]
+    w = points @ matrix[2, :2] + matrix[2, 2]
+    return mapped / w[:, np.newaxis]
+
+class Calibration:
+    """
+    Tracker -> canvas transform with the points it was fitted from.
+    """
+
+    def __init__(self, matrix, kind='homography', src=None, dst=None):
+        """
+        Initialize calibration.
+
+        Args:
+            matrix: 3x3 transform (tracker coordinates -> canvas pixels)
+            kind: 'affine' or 'homography'
+            src, dst: Measured point pairs (kept for reporting / refitting)
+        """
+        self.matrix = np.asarray(matrix, dtype=np.float64).reshape(3, 3)
+        self.kind = kind
+        self.src = None if src is None else np.asarray(src, dtype=np.float64)
+        self.dst = None if dst is None else np.asarray(dst, dtype=np.float64)
+
+    @classmethod
+    def fit(cls, src, dst, kind='homography'):
+        """
+        Fit a calibration from measured point pairs.
+
+        Args:
+            src: (n, 2) tracker coordinates
+            dst: (n, 2) canvas pixels of the same floor points
+            kind: 'affine' (n >= 3) or 'homography' (n >= 4)
+        """
+        if kind not in CALIBRATION_KINDS:
+            raise ValueError(f"Unknown calibration kind '{kind}' (expected one of {', '.join(CALIBRATION_KINDS)})")
+        matrix = fit_affine(src, dst) if kind == 'affine' else fit_homography(src, dst)
+        return cls(matrix, kind, src, dst)
+
+    def apply(self, x, y):
+        """
+        Map visitor positions.
+
+        Args:
+            x, y: Arrays of tracker coordinates
+
+        Returns:
+            (x, y) arrays of canvas pixels
+        """
+        m = self.matrix
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if self.kind == 'affine':
+            return m[0, 0] * x + m[0, 1] * y + m[0, 2], m[1, 0] * x + m[1, 1] * y + m[1, 2]
+        w = m[2, 0] * x + m[2, 1] * y + m[2, 2]
+        return (m[0, 0] * x + m[0, 1] * y + m[0, 2]) / w, (m[1, 0] * x + m[1, 1] * y + m[1, 2]) / w
+
+    def residuals(self):
+        """Pixel error at each measured point (None without points)."""
+        if self.src is None or self.dst is None:
+            return None
+        x, y = self.apply(self.src[:, 0], self.src[:, 1])
+        return np.hypot(x - self.dst[:, 0], y - self.dst[:, 1])
+
+    def rms_error(self):
+        """Root-mean-square pixel error at the measured points (None without points)."""
+        errors = self.residuals()
+        if errors is None or len(errors) == 0:
+            return None
+        return float(np.sqrt(np.mean(errors * errors)))
+
+    def to_dict(self):
+        data = {'kind': self.kind, 'matrix': self.matrix.tolist()}
+        if self.src is not None and self.dst is not None:
+            data['points'] = [{'tracker': s, 'canvas': d} for s, d in zip(self.src.tolist(), self.dst.tolist())]
+            data['rms_error'] = self.rms_error()
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        points = data.get('points')
+        src = [p['tracker'] for p in points] if points else None
+        dst = [p['canvas'] for p in points] if points else None
+        return cls(data['matrix'], data.get('kind', 'homography'), src, dst)
+
+    def save(self, path):
+        """Write the calibration as JSON."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Read a calibration written by save()."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
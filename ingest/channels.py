@@ -0,0 +1,96 @@
+"""
+Mocap channel discovery - Sparse pNx/pNy visitor channels from a CHOP
+"""
+
+import re
+import numpy as np
+
+# p1x / p1y (Mocap CHOP), p1/x (OSC In CHOP from /p1/x), p1_x
+CHANNEL_PATTERN = re.compile(r'^/?p(\d+)[/_]?([xy])$')
+
+class MocapChannels:
+    """
+    Finds the visitor channels a CHOP actually has and reads them as arrays.
+
+    The channel layout (which pN have both an x and a y channel) is parsed
+    once and re-parsed only when the CHOP's channel count changes (or every
+    `rescan_frames` frames, to catch renames). Reads take the whole CHOP
+    as one array (numpyArray() in TouchDesigner), so the per-frame cost
+    follows the channels present, not a configured slot count.
+    """
+
+    def __init__(self, first_id=1, rescan_frames=120):
+        """
+        Initialize channel discovery.
+
+        Args:
+            first_id: Channel number of visitor id 0 (p1 -> id 0)
+            rescan_frames: Frames between full channel-name rescans
+        """
+        self.first_id = first_id
+        self.rescan_frames = rescan_frames
+        self._num_chans = None
+        self._frames_since_scan = 0
+        self.ids = np.zeros(0, dtype=np.int64)  # Visitor id per discovered pair
+        self._x_index = np.zeros(0, dtype=np.int64)  # Channel index of each pair's x
+        self._y_index = np.zeros(0, dtype=np.int64)
+        self._chans = []  # Channel objects (fallback reads without numpyArray)
+        self.scans = 0
+
+    def scan(self, chop):
+        """Parse the CHOP's channel names into (id, x channel, y channel) pairs."""
+        chans = list(chop.chans())
+        pairs = {}
+        for index, chan in enumerate(chans):
+            match = CHANNEL_PATTERN.match(chan.name)
+            if match:
+                pairs.setdefault(int(match.group(1)), {})[match.group(2)] = index
+
+        # Channels below first_id (e.g. p0 with first_id=1) have no visitor id; -1 is the "no id" sentinel
+        numbers = sorted(n for n, axes in pairs.items()
+                         if n >= self.first_id and 'x' in axes and 'y' in axes)
+        self.ids = np.array([n - self.first_id for n in numbers], dtype=np.int64)
+        self._x_index = np.array([pairs[n]['x'] for n in numbers], dtype=np.int64)
+        self._y_index = np.array([pairs[n]['y'] for n in numbers], dtype=np.int64)
+        self._chans = chans
+        self._num_chans = len(chans)
+        self._frames_since_scan = 0
+        self.scans += 1
+
+    def _values(self, chop):
+        """Current value of every channel (last sample)."""
+        if hasattr(chop, 'numpyArray'):
+            samples = chop.numpyArray()
+            return samples[:, -1].astype(np.float64)
+        return np.array([chan.eval() if hasattr(chan, 'eval') else chan[0] for chan in self._chans],
+                        dtype=np.float64)
+
+    def read(self, chop):
+        """
+        Read the visitors present in a CHOP.
+
+        Args:
+            chop: CHOP with pNx/pNy channels (already mapped to pixels)
+
+        Returns:
+            (ids, x, y): arrays over visitors present this frame (pairs
+            with a non-finite value, e.g. a lost body, are left out)
+        """
+        num_chans = chop.numChans if hasattr(chop, 'numChans') else len(chop.chans())
+        self._frames_since_scan += 1
+        if num_chans != self._num_chans or self._frames_since_scan >= self.rescan_frames:
+            self.scan(chop)
+        if len(self.ids) == 0:
+            return self.ids, np.zeros(0), np.zeros(0)
+
+        values = self._values(chop)
+        x = values[self._x_index]
+        y = values[self._y_index]
+        present = np.isfinite(x) & np.isfinite(y)
+        if present.all():
+            return self.ids, x, y
+        return self.ids[present], x[present], y[present]
+
+def visitors_from_arrays(ids, x, y):
+    """Visitor arrays -> list of {id, x, y} (the PollinationSystem input format)."""
+    return [{'id': i, 'x': px, 'y': py} for i, px, py in zip(ids.tolist(), x.tolist(), y.tolist())]
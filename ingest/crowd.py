@@ -0,0 +1,420 @@
+"""
+Crowd simulator - Vectorized synthetic visitors for stress tests
+
+Simulates hundreds of people as parallel arrays (no per-person Python
+objects): people arrive through the canvas edges in small groups, wander,
+walk to trees and queue at them, join and leave groups, and walk out
+again. A tracker model maps people to tracker slots with position jitter,
+dropouts (a person briefly missing from the output) and ID swaps (two
+nearby people exchanging slots), like a real mocap system.
+"""
+
+import numpy as np
+
+# Behaviors
+OUTSIDE = 0  # Not in the space (slot not present)
+WANDER = 1  # Random walk
+SEEK = 2  # Walking to a tree's queue
+QUEUE = 3  # Standing in a tree's queue
+FOLLOW = 4  # Walking with a group leader
+EXIT = 5  # Walking to the nearest edge to leave
+
+BEHAVIOR_NAMES = ('outside', 'wander', 'seek', 'queue', 'follow', 'exit')
+
+def structure_arrays(structures, canvas_width, canvas_height):
+    """
+    Tree positions and radii from a structure config (as PollinationSystem scales them).
+
+    Args:
+        structures: List of dicts with {x, y, radius} (x/y <= 1 are normalized)
+
+    Returns:
+        (positions (n, 2), radii (n,)) float64 arrays
+    """
+    positions = np.array([
+        [s['x'] * canvas_width if s['x'] <= 1.0 else s['x'],
+         s['y'] * canvas_height if s['y'] <= 1.0 else s['y']]
+        for s in structures
+    ], dtype=np.float64).reshape(-1, 2)
+    radii = np.array([s['radius'] for s in structures], dtype=np.float64)
+    return positions, radii
+
+class CrowdSimulator:
+    """
+    Simulates a crowd of visitors as arrays and outputs tracker slots per frame.
+    """
+
+    def __init__(self, canvas_width, canvas_height, structures=(), num_people=200, seed=0,
+                 initial_fraction=0.5, arrival_rate=2.0, max_group=4, walk_speed=70.0,
+                 wander_time=(4.0, 15.0), seek_chance=0.5, exit_chance=0.1,
+                 dwell_time=(2.0, 6.0), queue_spacing=40.0, queue_capacity=2, max_queue=8,
+                 join_rate=0.02, leave_rate=0.05, join_radius=150.0,
+                 jitter=2.0, dropout_rate=0.02, dropout_time=(0.1, 1.0),
+                 swap_rate=0.2, swap_distance=60.0):
+        """
+        Initialize crowd.
+
+        Args:
+            canvas_width, canvas_height: Canvas dimensions
+            structures: Structure config (list of {x, y, radius}) people walk to
+            num_people: Population (= tracker slots; not all are inside at once)
+            seed: RNG seed
+            initial_fraction: Share of people already inside at frame 0
+            arrival_rate: Groups arriving per second
+            max_group: Largest arriving group
+            walk_speed: Walking speed (pixels per second)
+            wander_time: (min, max) seconds of wandering between decisions
+            seek_chance: Chance a decision is to walk to a tree
+            exit_chance: Chance a decision is to leave
+            dwell_time: (min, max) seconds at the front of a queue
+            queue_spacing: Distance between people in a queue (pixels)
+            queue_capacity: People served at once at the front of a queue
+            max_queue: People walking to a longer queue give up and wander
+            join_rate: Per-second chance a wanderer joins a nearby group
+            leave_rate: Per-second chance a follower leaves its group
+            join_radius: Largest distance to a group a wanderer joins (pixels)
+            jitter: Tracker position noise (pixels, standard deviation)
+            dropout_rate: Per-second chance a tracked person drops out
+            dropout_time: (min, max) seconds of a dropout
+            swap_rate: ID swaps per second (between people closer than swap_distance)
+            swap_distance: Largest distance of a swapped pair (pixels)
+        """
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.rng = np.random.default_rng(seed)
+        self.num_people = num_people
+        self.arrival_rate = arrival_rate
+        self.max_group = max_group
+        self.walk_speed = walk_speed
+        self.wander_time = wander_time
+        self.seek_chance = seek_chance
+        self.exit_chance = exit_chance
+        self.dwell_time = dwell_time
+        self.queue_spacing = queue_spacing
+        self.queue_capacity = queue_capacity
+        self.max_queue = max_queue
+        self.join_rate = join_rate
+        self.leave_rate = leave_rate
+        self.join_radius = join_radius
+        self.jitter = jitter
+        self.dropout_rate = dropout_rate
+        self.dropout_time = dropout_time
+        self.swap_rate = swap_rate
+        self.swap_distance = swap_distance
+
+        # Trees and their queue directions (queues extend toward the canvas center)
+        self.tree_pos, self.tree_radius = structure_arrays(structures, canvas_width, canvas_height)
+        center = np.array([canvas_width / 2.0, canvas_height / 2.0])
+        to_center = center - self.tree_pos
+        length = np.maximum(np.hypot(to_center[:, 0], to_center[:, 1]), 1e-9)[:, np.newaxis]
+        self.tree_dir = np.where(length > 1e-6, to_center / length, [1.0, 0.0])
+
+        # People (parallel arrays)
+        n = num_people
+        self.pos = np.zeros((n, 2))
+        self.vel = np.zeros((n, 2))
+        self.behavior = np.full(n, OUTSIDE, dtype=np.int8)
+        self.timer = np.zeros(n)  # Seconds until the next decision / end of dwell
+        self.tree = np.full(n, -1, dtype=np.int64)  # Target tree (SEEK / QUEUE)
+        self.ticket = np.zeros(n, dtype=np.int64)  # Queue order (lower = earlier)
+        self.leader = np.full(n, -1, dtype=np.int64)  # Group leader (FOLLOW)
+        self.offset = np.zeros((n, 2))  # Position relative to the leader
+        self.exit_point = np.zeros((n, 2))
+        self._next_ticket = 0
+
+        # Tracker
+        self.slot = np.arange(n)  # Person -> tracker slot
+        self.dropout = np.zeros(n)  # Seconds left missing from the output
+
+        # Counters
+        self.frames = 0
+        self.arrivals = 0
+        self.departures = 0
+        self.dropouts = 0
+        self.swaps = 0
+
+        # Start with part of the crowd wandering inside
+        inside = self.rng.permutation(n)[:int(n * initial_fraction)]
+        self.pos[inside] = self.rng.uniform((0, 0), (canvas_width, canvas_height), size=(len(inside), 2))
+        self._start_wander(inside)
+
+    # === Behaviors ===
+
+    def _start_wander(self, idx):
+        self.behavior[idx] = WANDER
+        self.leader[idx] = -1
+        self.tree[idx] = -1
+        self.timer[idx] = self.rng.uniform(*self.wander_time, size=len(idx))
+
+    def _start_seek(self, idx):
+        if len(self.tree_pos) == 0:
+            self._start_wander(idx)
+            return
+        self.behavior[idx] = SEEK
+        self.tree[idx] = self.rng.integers(len(self.tree_pos), size=len(idx))
+        self.ticket[idx] = self._next_ticket + np.arange(len(idx))
+        self._next_ticket += len(idx)
+
+    def _start_exit(self, idx):
+        self.behavior[idx] = EXIT
+        # Nearest edge
+        x, y = self.pos[idx, 0], self.pos[idx, 1]
+        distances = np.stack([x, self.canvas_width - x, y, self.canvas_height - y], axis=1)
+        edge = np.argmin(distances, axis=1)
+        target = self.pos[idx].copy()
+        target[edge == 0, 0] = -20.0
+        target[edge == 1, 0] = self.canvas_width + 20.0
+        target[edge == 2, 1] = -20.0
+        target[edge == 3, 1] = self.canvas_height + 20.0
+        self.exit_point[idx] = target
+
+    def _arrive(self, dt):
+        """Bring groups in through the edges."""
+        groups = self.rng.poisson(self.arrival_rate * dt)
+        outside = np.flatnonzero(self.behavior == OUTSIDE)
+        for _ in range(groups):
+            if len(outside) == 0:
+                break
+            size = min(int(self.rng.integers(1, self.max_group + 1)), len(outside))
+            members, outside = outside[:size], outside[size:]
+
+            # Entrance on a random edge
+            edge = self.rng.integers(4)
+            t = self.rng.uniform(0.1, 0.9)
+            entrance = [
+                (0.0, t * self.canvas_height),
+                (self.canvas_width, t * self.canvas_height),
+                (t * self.canvas_width, 0.0),
+                (t * self.canvas_width, self.canvas_height),
+            ][edge]
+            self.pos[members] = np.array(entrance) + self.rng.normal(0.0, 10.0, size=(size, 2))
+            self.vel[members] = 0.0
+            self.dropout[members] = 0.0
+
+            leader = members[0]
+            if self.rng.random() < self.seek_chance:
+                self._start_seek(members[:1])
+            else:
+                self._start_wander(members[:1])
+            followers = members[1:]
+            self.behavior[followers] = FOLLOW
+            self.leader[followers] = leader
+            self.offset[followers] = self.rng.normal(0.0, 30.0, size=(len(followers), 2))
+            self.arrivals += size
+
+    def _decide(self, dt):
+        """Behavior transitions (timers, arrivals at queues, groups)."""
+        behavior = self.behavior
+
+        # Wanderers whose timer ran out: walk to a tree, leave, or keep wandering
+        done = np.flatnonzero((behavior == WANDER) & (self.timer <= 0))
+        if len(done):
+            roll = self.rng.random(len(done))
+            self._start_seek(done[roll < self.seek_chance])
+            self._start_exit(done[(roll >= self.seek_chance) & (roll < self.seek_chance + self.exit_chance)])
+            self._start_wander(done[roll >= self.seek_chance + self.exit_chance])
+
+        # Served at the front of a queue
+        self._start_wander(np.flatnonzero((behavior == QUEUE) & (self.timer <= 0)))
+
+        # Followers whose leader left or stopped leading
+        following = np.flatnonzero(behavior == FOLLOW)
+        if len(following):
+            lead_behavior = behavior[self.leader[following]]
+            lost = (lead_behavior == OUTSIDE) | (lead_behavior == FOLLOW)
+            leaving = self.rng.random(len(following)) < self.leave_rate * dt
+            self._start_wander(following[lost | leaving])
+
+        # Wanderers joining the nearest group (leader = anyone not following)
+        wanderers = np.flatnonzero((behavior == WANDER) & (self.rng.random(self.num_people) < self.join_rate * dt))
+        leaders = np.flatnonzero((behavior == WANDER) | (behavior == SEEK) | (behavior == QUEUE))
+        if len(wanderers) and len(leaders) > 1:
+            d = np.hypot(*(self.pos[wanderers, np.newaxis, :] - self.pos[np.newaxis, leaders, :]).transpose(2, 0, 1))
+            d[wanderers[:, np.newaxis] == leaders[np.newaxis, :]] = np.inf
+            nearest = np.argmin(d, axis=1)
+            joined = d[np.arange(len(wanderers)), nearest] < self.join_radius
+            joiners = wanderers[joined]
+            self.behavior[joiners] = FOLLOW
+            self.leader[joiners] = leaders[nearest[joined]]
+            self.offset[joiners] = self.pos[joiners] - self.pos[self.leader[joiners]]
+
+        # Leavers that reached the edge (their followers go with them)
+        exited = np.flatnonzero((behavior == EXIT) & (
+            (self.pos[:, 0] < 0) | (self.pos[:, 0] > self.canvas_width) |
+            (self.pos[:, 1] < 0) | (self.pos[:, 1] > self.canvas_height)))
+        if len(exited):
+            with_leader = np.isin(self.leader, exited) & (behavior == FOLLOW)
+            gone = np.concatenate([exited, np.flatnonzero(with_leader)])
+            behavior[gone] = OUTSIDE
+            self.leader[gone] = -1
+            self.departures += len(gone)
+
+    def _queue_targets(self, idx):
+        """Queue spot of each SEEK/QUEUE person (ranked by ticket per tree); returns (targets, ranks)."""
+        trees = self.tree[idx]
+        order = np.lexsort((self.ticket[idx], trees))
+        sorted_trees = trees[order]
+        starts = np.flatnonzero(np.r_[True, sorted_trees[1:] != sorted_trees[:-1]])
+        group_start = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        ranks = np.empty(len(idx), dtype=np.int64)
+        ranks[order] = np.arange(len(order)) - group_start
+
+        # Front of the queue just inside the tree, the line extends outward
+        distance = self.tree_radius[trees] * 0.9 + ranks // self.queue_capacity * self.queue_spacing
+        side = (ranks % self.queue_capacity) - (self.queue_capacity - 1) / 2.0
+        direction = self.tree_dir[trees]
+        normal = np.stack([-direction[:, 1], direction[:, 0]], axis=1)
+        targets = (self.tree_pos[trees] + direction * distance[:, np.newaxis]
+                   + normal * (side * self.queue_spacing)[:, np.newaxis])
+        return targets, ranks
+
+    def _move(self, dt):
+        """Steer everyone inside toward their behavior's goal and integrate."""
+        behavior = self.behavior
+        inside = behavior != OUTSIDE
+        desired = self.vel.copy()
+
+        # Wander: smooth random walk at strolling speed
+        wander = behavior == WANDER
+        desired[wander] += self.rng.normal(0.0, self.walk_speed, size=(int(wander.sum()), 2)) * dt * 3.0
+        speed = np.hypot(desired[wander, 0], desired[wander, 1])[:, np.newaxis]
+        desired[wander] *= np.minimum(1.0, self.walk_speed * 0.6 / np.maximum(speed, 1e-9))
+
+        # Goals: queue spots, exits, leaders
+        targets = np.zeros_like(self.pos)
+        queued = np.flatnonzero((behavior == SEEK) | (behavior == QUEUE))
+        if len(queued):
+            targets[queued], ranks = self._queue_targets(queued)
+            # Only the front of each queue is served
+            serving = queued[(behavior[queued] == QUEUE) & (ranks < self.queue_capacity)]
+            self.timer[serving] -= dt
+            arrived = queued[(behavior[queued] == SEEK) &
+                             (np.hypot(*(targets[queued] - self.pos[queued]).T) < self.queue_spacing * 0.5)]
+            behavior[arrived] = QUEUE
+            self.timer[arrived] = self.rng.uniform(*self.dwell_time, size=len(arrived))
+            self._start_wander(queued[(behavior[queued] == SEEK) & (ranks >= self.max_queue)])
+        exiting = behavior == EXIT
+        targets[exiting] = self.exit_point[exiting]
+        following = np.flatnonzero(behavior == FOLLOW)
+        targets[following] = self.pos[self.leader[following]] + self.offset[following]
+
+        goal = (behavior == SEEK) | (behavior == QUEUE) | exiting | (behavior == FOLLOW)
+        to_target = targets[goal] - self.pos[goal]
+        distance = np.hypot(to_target[:, 0], to_target[:, 1])[:, np.newaxis]
+        # Slow down over the last 50 px (arrive without overshooting)
+        desired[goal] = to_target / np.maximum(distance, 1e-9) * self.walk_speed * np.minimum(1.0, distance / 50.0)
+
+        # Smooth velocity changes (people don't turn instantly)
+        blend = min(1.0, dt * 4.0)
+        self.vel[inside] += (desired[inside] - self.vel[inside]) * blend
+        self.vel[~inside] = 0.0
+        self.pos[inside] += self.vel[inside] * dt
+
+        # Everyone but leavers stays on the floor
+        keep = inside & ~exiting
+        self.pos[keep] = np.clip(self.pos[keep], (0, 0), (self.canvas_width, self.canvas_height))
+
+        self.timer[wander] -= dt
+
+    def _track(self, dt):
+        """Tracker model: dropouts and ID swaps."""
+        inside = self.behavior != OUTSIDE
+        self.dropout = np.maximum(self.dropout - dt, 0.0)
+
+        starting = np.flatnonzero(inside & (self.dropout == 0) & (self.rng.random(self.num_people) < self.dropout_rate * dt))
+        self.dropout[starting] = self.rng.uniform(*self.dropout_time, size=len(starting))
+        self.dropouts += len(starting)
+
+        for _ in range(self.rng.poisson(self.swap_rate * dt)):
+            tracked = np.flatnonzero(inside & (self.dropout == 0))
+            if len(tracked) < 2:
+                break
+            a = tracked[self.rng.integers(len(tracked))]
+            d = np.hypot(*(self.pos[tracked] - self.pos[a]).T)
+            d[tracked == a] = np.inf
+            close = tracked[d < self.swap_distance]
+            if len(close) == 0:
+                continue
+            b = close[self.rng.integers(len(close))]
+            self.slot[a], self.slot[b] = self.slot[b], self.slot[a]
+            self.swaps += 1
+
+    def step(self, dt):
+        """
+        Advance the crowd by dt seconds.
+
+        Returns:
+            (x, y, present): float32 / float32 / bool arrays indexed by
+            tracker slot (num_people slots)
+        """
+        self._arrive(dt)
+        self._decide(dt)
+        self._move(dt)
+        self._track(dt)
+        self.frames += 1
+        return self.tracker_output()
+
+    def tracker_output(self):
+        """Current tracker slots: (x, y, present) with jitter applied."""
+        n = self.num_people
+        x = np.zeros(n, dtype=np.float32)
+        y = np.zeros(n, dtype=np.float32)
+        present = np.zeros(n, dtype=bool)
+        seen = (self.behavior != OUTSIDE) & (self.dropout == 0)
+        noisy = self.pos + self.rng.normal(0.0, self.jitter, size=self.pos.shape)
+        slots = self.slot[seen]
+        x[slots] = noisy[seen, 0]
+        y[slots] = noisy[seen, 1]
+        present[slots] = True
+        return x, y, present
+
+    def get_counts(self):
+        """People per behavior plus tracker counters."""
+        counts = np.bincount(self.behavior, minlength=len(BEHAVIOR_NAMES))
+        stats = {name: int(count) for name, count in zip(BEHAVIOR_NAMES, counts)}
+        stats.update({
+            'frames': self.frames,
+            'arrivals': self.arrivals,
+            'departures': self.departures,
+            'dropouts': self.dropouts,
+            'swaps': self.swaps,
+            'missing': int(((self.behavior != OUTSIDE) & (self.dropout > 0)).sum()),
+        })
+        return stats
+
+def to_visitors(x, y, present):
+    """Tracker arrays -> visitor list for PollinationSystem.update ({id, x, y})."""
+    from .channels import visitors_from_arrays
+    slots = np.flatnonzero(present)
+    return visitors_from_arrays(slots, x[slots], y[slots])
+
+def write_session(path, crowd, frames, fps=60.0, start_time=0.0, metadata=None, compress=True):
+    """
+    Simulate a crowd into a recorded-session (.bmoc) file.
+
+    Args:
+        path: Output file
+        crowd: CrowdSimulator
+        frames: Number of frames
+        fps: Frame rate (dt = 1/fps)
+        start_time: Timestamp of the first frame
+        metadata: Extra header fields (e.g. structures, seed for ingest.replay)
+        compress: zlib-compress chunks
+
+    Returns:
+        Recorder stats (see SessionRecorder.get_stats)
+    """
+    from .recorder import SessionRecorder
+
+    dt = 1.0 / fps
+    header = {'canvas_width': crowd.canvas_width, 'canvas_height': crowd.canvas_height, 'start_frame': 0,
+              'start_time': start_time, 'source': 'crowd'}
+    header.update(metadata or {})
+    recorder = SessionRecorder(path, num_slots=crowd.num_people, fps=fps, compress=compress, metadata=header)
+    try:
+        for frame in range(frames):
+            x, y, present = crowd.step(dt)
+            recorder.record_columns(start_time + frame * dt, dt, x, y, present)
+    finally:
+        recorder.close()
+    return recorder.get_stats()
@@ -0,0 +1,348 @@
+"""
+Mocap session recorder - Append-only columnar log of visitor positions
+
+File layout (little-endian):
+
+    header   magic b'BMOC', version u16, header JSON length u32, JSON
+             (start time, fps, slot count, ...)
+    chunk*   magic b'CHNK', frames u32, slots u16, flags u16,
+             payload length u32, crc32 u32, payload
+
+A chunk's payload holds its columns back to back, each as one fixed-dtype
+array: t (float64 wall time), dt (float64; float32 in version 1), x and
+y (float32, frames x slots) and present (uint8, frames x slots).
+FLAG_ZLIB marks a zlib-compressed payload. Chunks carry their own slot
+count (the recorder widens when a higher visitor id appears) and the
+reader pads to the widest. Chunks are only ever appended, and the reader stops
+at the first truncated or corrupt chunk, so a crash loses at most the
+chunk being written.
+"""
+
+import json
+import queue
+import struct
+import threading
+import time
+import zlib
+import numpy as np
+
+FILE_MAGIC = b'BMOC'
+CHUNK_MAGIC = b'CHNK'
+VERSION = 2  # 2: dt stored as float64 so replays see the exact dt sequence
+FLAG_ZLIB = 1
+MAX_SLOTS = 65535  # Chunk headers store the slot count as u16
+
+_FILE_HEADER = struct.Struct('<4sHI')
+_CHUNK_HEADER = struct.Struct('<4sIHHII')
+
+def _columns(frames, slots, version=VERSION):
+    """Column names, dtypes and shapes of a chunk, in payload order."""
+    return (
+        ('t', np.float64, (frames,)),
+        ('dt', np.float64 if version >= 2 else np.float32, (frames,)),
+        ('x', np.float32, (frames, slots)),
+        ('y', np.float32, (frames, slots)),
+        ('present', np.uint8, (frames, slots)),
+    )
+
+class _Chunk:
+    """Preallocated column buffers for one chunk."""
+
+    def __init__(self, frames, slots):
+        self.columns = {name: np.zeros(shape, dtype=dtype) for name, dtype, shape in _columns(frames, slots)}
+        self.slots = slots
+        self.count = 0
+
+    def encode(self, compress, level):
+        """Serialize the filled rows (header + payload)."""
+        n = self.count
+        slots = self.columns['x'].shape[1]
+        payload = b''.join(self.columns[name][:n].tobytes() for name, _, _ in _columns(n, slots))
+        flags = 0
+        if compress:
+            payload = zlib.compress(payload, level)
+            flags |= FLAG_ZLIB
+        header = _CHUNK_HEADER.pack(CHUNK_MAGIC, n, slots, flags, len(payload), zlib.crc32(payload))
+        return header + payload
+
+class SessionRecorder:
+    """
+    Records per-frame visitor positions into a session file.
+
+    record() only copies the frame into a preallocated chunk buffer; full
+    chunks are handed to a background thread that compresses and writes
+    them, so the cook never blocks on disk I/O.
+    """
+
+    def __init__(self, path, num_slots, chunk_frames=600, compress=True, compress_level=1,
+                 fps=60, metadata=None, max_pending=16):
+        """
+        Open a new session file and start the writer thread.
+
+        Args:
+            path: Output file path (overwritten)
+            num_slots: Visitor slots per frame (ids 0..num_slots-1); grows at a
+                       chunk boundary when a higher id shows up
+            chunk_frames: Frames per chunk (600 = 10 s at 60 fps)
+            compress: zlib-compress chunk payloads
+            compress_level: zlib level (1 = fastest)
+            fps: Nominal frame rate (stored in the header)
+            metadata: Extra JSON-serializable header fields
+            max_pending: Full chunks queued for the writer before frames
+                         are dropped (a stalled disk never blocks the cook)
+        """
+        self.path = path
+        self.num_slots = num_slots
+        self.chunk_frames = chunk_frames
+        self.compress = compress
+        self.compress_level = compress_level
+
+        self.frames_recorded = 0
+        self.frames_dropped = 0  # Frames lost because the writer fell behind
+        self.ids_out_of_range = 0  # Visitor samples whose id has no slot
+        self.bytes_written = 0
+        self.error = None  # Writer thread exception (recording stops)
+
+        header = {
+            'start_time': time.time(),
+            'fps': fps,
+            'num_slots': num_slots,
+            'chunk_frames': chunk_frames,
+        }
+        if metadata:
+            header.update(metadata)
+        header_json = json.dumps(header).encode('utf-8')
+
+        self._file = open(path, 'wb')
+        self._file.write(_FILE_HEADER.pack(FILE_MAGIC, VERSION, len(header_json)) + header_json)
+        self._file.flush()
+
+        # Two spare buffers are enough unless the writer stalls
+        self._free = queue.Queue()
+        for _ in range(2):
+            self._free.put(_Chunk(chunk_frames, num_slots))
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._chunk = _Chunk(chunk_frames, num_slots)
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._writer, name='mocap-recorder', daemon=True)
+        self._thread.start()
+
+    def record(self, timestamp, dt, visitors):
+        """
+        Record one frame.
+
+        Args:
+            timestamp: Wall-clock time of the sample (seconds)
+            dt: Frame delta time in seconds
+            visitors: List of dicts with {id, x, y}
+        """
+        if self._closed or self.error is not None:
+            return
+
+        top = max((visitor['id'] for visitor in visitors), default=-1)
+        if self.num_slots <= top < MAX_SLOTS:
+            self._grow(top + 1)
+
+        chunk = self._chunk
+        row = chunk.count
+        columns = chunk.columns
+        columns['t'][row] = timestamp
+        columns['dt'][row] = dt
+        present = columns['present'][row]
+        present.fill(0)
+        for visitor in visitors:
+            slot = visitor['id']
+            if 0 <= slot < self.num_slots:
+                columns['x'][row, slot] = visitor['x']
+                columns['y'][row, slot] = visitor['y']
+                present[slot] = 1
+            else:
+                self.ids_out_of_range += 1
+        chunk.count += 1
+        self.frames_recorded += 1
+
+        if chunk.count == self.chunk_frames:
+            self._submit()
+
+    def record_columns(self, timestamp, dt, x, y, present):
+        """
+        Record one frame given as slot arrays (e.g. from ingest.crowd).
+
+        Args:
+            timestamp: Wall-clock time of the sample (seconds)
+            dt: Frame delta time in seconds
+            x, y: Positions per slot (num_slots)
+            present: Bool/uint8 per slot (slots not present are ignored)
+        """
+        if self._closed or self.error is not None:
+            return
+
+        if len(x) > self.num_slots:
+            self._grow(len(x))
+        chunk = self._chunk
+        row = chunk.count
+        columns = chunk.columns
+        columns['t'][row] = timestamp
+        columns['dt'][row] = dt
+        columns['x'][row, len(x):] = 0
+        columns['y'][row, len(x):] = 0
+        columns['present'][row, len(x):] = 0
+        columns['x'][row, :len(x)] = x
+        columns['y'][row, :len(x)] = y
+        columns['present'][row, :len(x)] = present
+        chunk.count += 1
+        self.frames_recorded += 1
+
+        if chunk.count == self.chunk_frames:
+            self._submit()
+
+    def _grow(self, slots):
+        """Widen the slot columns (the current chunk is closed early; chunks carry their own width)."""
+        slots = min(-(-slots // 8) * 8, MAX_SLOTS)
+        if self._chunk.count > 0:
+            self._submit()
+        self.num_slots = slots
+        self._chunk = _Chunk(self.chunk_frames, slots)
+
+    def _submit(self):
+        """Hand the current chunk to the writer and continue in a fresh buffer."""
+        try:
+            self._pending.put_nowait(self._chunk)
+        except queue.Full:
+            # Writer is behind: drop this chunk rather than stall the cook
+            self.frames_dropped += self._chunk.count
+            self._chunk.count = 0
+            return
+        self._chunk = None
+        while self._chunk is None:
+            try:
+                chunk = self._free.get_nowait()
+            except queue.Empty:
+                chunk = _Chunk(self.chunk_frames, self.num_slots)
+            if chunk.slots == self.num_slots:  # Buffers from before a _grow() are dropped
+                self._chunk = chunk
+        self._chunk.count = 0
+
+    def _writer(self):
+        """Background thread: encode and append chunks."""
+        while True:
+            chunk = self._pending.get()
+            if chunk is None:
+                break
+            try:
+                data = chunk.encode(self.compress, self.compress_level)
+                self._file.write(data)
+                self._file.flush()
+                self.bytes_written += len(data)
+            except Exception as e:
+                self.error = e
+                break
+            finally:
+                self._free.put(chunk)
+
+    def close(self, timeout=5.0):
+        """
+        Write the partial chunk, stop the writer thread and close the file.
+
+        Never hangs: after a writer error nothing drains the queue, so the
+        partial chunk is dropped; a writer stalled for `timeout` seconds is
+        left behind (daemon thread) with the file still open.
+
+        Args:
+            timeout: Seconds to wait for queue space and for the writer to finish
+        """
+        if self._closed:
+            return
+        self._closed = True
+        chunk = self._chunk
+        if chunk.count > 0:
+            try:
+                if self.error is not None:
+                    raise queue.Full
+                self._pending.put(chunk, timeout=timeout)
+            except queue.Full:
+                self.frames_dropped += chunk.count
+        if self.error is None:
+            try:
+                self._pending.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._file.close()
+
+    def get_stats(self):
+        """Recording counters (for the Textport / status display)."""
+        return {
+            'path': self.path,
+            'frames_recorded': self.frames_recorded,
+            'frames_dropped': self.frames_dropped,
+            'ids_out_of_range': self.ids_out_of_range,
+            'bytes_written': self.bytes_written,
+            'pending_chunks': self._pending.qsize(),
+            'error': repr(self.error) if self.error is not None else None,
+        }
+
+def read_session(path):
+    """
+    Read a session file.
+
+    Returns:
+        (header, columns): header dict and dict of concatenated arrays
+        t, dt, x, y, present (x/y/present are frames x slots, padded to
+        the widest chunk)
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, version, header_len = _FILE_HEADER.unpack_from(data, 0)
+    if magic != FILE_MAGIC:
+        raise ValueError(f"{path} is not a mocap session file")
+    if version > VERSION:
+        raise ValueError(f"{path} has format version {version} (this reader supports {VERSION})")
+    offset = _FILE_HEADER.size
+    header = json.loads(data[offset:offset + header_len].decode('utf-8'))
+    offset += header_len
+
+    chunks = []
+    while offset + _CHUNK_HEADER.size <= len(data):
+        magic, frames, slots, flags, length, crc = _CHUNK_HEADER.unpack_from(data, offset)
+        start = offset + _CHUNK_HEADER.size
+        payload = data[start:start + length]
+        if magic != CHUNK_MAGIC or len(payload) < length or zlib.crc32(payload) != crc:
+            break  # Truncated tail (recording was interrupted)
+        if flags & FLAG_ZLIB:
+            payload = zlib.decompress(payload)
+        chunk = {}
+        pos = 0
+        for name, dtype, shape in _columns(frames, slots, version):
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            chunk[name] = np.frombuffer(payload, dtype=dtype, count=int(np.prod(shape)), offset=pos).reshape(shape)
+            pos += size
+        chunks.append(chunk)
+        offset = start + length
+
+    slots = max([c['x'].shape[1] for c in chunks] + [header.get('num_slots', 0)])
+    columns = {}
+    for name, dtype, shape in _columns(0, slots):
+        parts = []
+        for c in chunks:
+            column = c[name]
+            if column.ndim == 2 and column.shape[1] < slots:
+                column = np.pad(column, ((0, 0), (0, slots - column.shape[1])))
+            parts.append(column)
+        columns[name] = np.concatenate(parts) if parts else np.zeros(shape, dtype=dtype)
+    return header, columns
+
+def session_frames(columns):
+    """
+    Convert session columns to per-frame visitor lists.
+
+    Returns:
+        List (one per frame) of [[id, x, y], ...] as used by RecordedInput
+    """
+    frames = []
+    for x, y, present in zip(columns['x'].tolist(), columns['y'].tolist(), columns['present'].tolist()):
+        frames.append([[slot, x[slot], y[slot]] for slot, p in enumerate(present) if p])
+    return frames
@@ -0,0 +1,157 @@
+"""
+Deterministic replay of recorded mocap sessions
+
+Feeds PollinationSystem.update the recorded visitor positions, dt and
+timestamps of every frame, as fast as possible, and takes state_hash()
+checkpoints every N frames. With the seed stored in the session header,
+two replays of the same session (on any machine) produce the same
+checkpoints; comparing them against a saved set pinpoints the first frame
+where a code change altered the simulation.
+"""
+
+import json
+import time
+
+from .recorder import read_session, session_frames
+
+def build_system(header, structures=None):
+    """
+    Create a PollinationSystem matching a session header.
+
+    Args:
+        header: Session header dict (see pollination_system_current.start_recording)
+        structures: Structure config (default: header's, else config.STRUCTURES)
+
+    Returns:
+        PollinationSystem
+    """
+    from core.system import PollinationSystem
+    from core.clock import Clock
+    import config
+
+    if structures is None:
+        structures = header.get('structures', config.STRUCTURES)
+    system = PollinationSystem(
+        canvas_width=header.get('canvas_width', config.DEFAULT_WIDTH),
+        canvas_height=header.get('canvas_height', config.DEFAULT_HEIGHT),
+        structures_config=structures,
+        mycelium_seed=header.get('mycelium_seed', config.MYCELIUM_SEED),
+        seed=header.get('seed', config.SIMULATION_SEED),
+        profile_frames=0,
+        clock=Clock('replay', start_time=header.get('start_time', 0.0))
+    )
+    for agent_type in header.get('agents', []):
+        system.add_autonomous_agent(agent_type)
+    return system
+
+class ReplayDriver:
+    """
+    Replays session columns into a PollinationSystem with hash checkpoints.
+    """
+
+    def __init__(self, header, columns, system=None, checkpoint_every=60):
+        """
+        Initialize replay.
+
+        Args:
+            header: Session header dict
+            columns: Session columns from read_session()
+            system: PollinationSystem to drive (default: build_system(header))
+            checkpoint_every: Frames between state_hash() checkpoints
+        """
+        self.header = header
+        self.timestamps = columns['t'].tolist()
+        self.dts = columns['dt'].tolist()
+        self.frames = session_frames(columns)
+        self.system = system if system is not None else build_system(header)
+        self.checkpoint_every = checkpoint_every
+        self.checkpoints = []  # [(frame, hash), ...]
+        self.frame = 0
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        """Create a replay for a session file."""
+        header, columns = read_session(path)
+        return cls(header, columns, **kwargs)
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def exact(self):
+        """Whether recording started with a fresh system (otherwise state before it is unknown)."""
+        return self.header.get('start_frame', 0) == 0
+
+    def step(self):
+        """
+        Replay one frame.
+
+        Returns:
+            Render data of the frame
+        """
+        i = self.frame
+        visitors = [{'id': slot, 'x': x, 'y': y} for slot, x, y in self.frames[i]]
+        render_data = self.system.update(visitors, self.dts[i], self.timestamps[i])
+        self.frame += 1
+        if self.checkpoint_every and self.frame % self.checkpoint_every == 0:
+            self.checkpoints.append((self.frame, self.system.state_hash()))
+        return render_data
+
+    def run(self, frames=None, on_frame=None):
+        """
+        Replay frames as fast as possible.
+
+        Args:
+            frames: Number of frames (default: rest of the session)
+            on_frame: Optional callback(frame_index, render_data)
+
+        Returns:
+            Dict with frames, checkpoints, final_hash, wall_s and speedup
+            (replay speed relative to the recorded duration)
+        """
+        first = self.frame
+        last = len(self.frames) if frames is None else min(len(self.frames), first + frames)
+        start = time.perf_counter()
+        for i in range(first, last):
+            render_data = self.step()
+            if on_frame is not None:
+                on_frame(i, render_data)
+        wall_s = time.perf_counter() - start
+
+        recorded_s = sum(self.dts[first:last])
+        return {
+            'frames': last - first,
+            'checkpoints': list(self.checkpoints),
+            'final_hash': self.system.state_hash(),
+            'wall_s': wall_s,
+            'speedup': recorded_s / wall_s if wall_s > 0 else float('inf'),
+            'exact': self.exact,
+        }
+
+def compare_checkpoints(expected, actual):
+    """
+    Find the first checkpoint that differs.
+
+    Args:
+        expected, actual: Lists of (frame, hash)
+
+    Returns:
+        None if all shared checkpoints match, else (frame, expected_hash, actual_hash)
+    """
+    actual_by_frame = dict((int(f), h) for f, h in actual)
+    for frame, digest in expected:
+        other = actual_by_frame.get(int(frame))
+        if other is not None and other != digest:
+            return int(frame), digest, other
+    return None
+
+def save_checkpoints(path, result):
+    """Write a replay result's checkpoints to JSON."""
+    with open(path, 'w') as f:
+        json.dump({'checkpoints': result['checkpoints'], 'final_hash': result['final_hash'],
+                   'frames': result['frames']}, f, indent=1)
+
+def load_checkpoints(path):
+    """Read checkpoints written by save_checkpoints()."""
+    with open(path) as f:
+        return [tuple(c) for c in json.load(f)['checkpoints']]
@@ -0,0 +1,26 @@
+"""
+Biotelia Pollination System - State broadcast and lockstep for render nodes
+"""
+
+from .frame import FrameEncoder, FrameDecoder, empty_render_data
+from .transport import UdpSender, UdpReceiver, TcpServer, TcpClient
+from .broadcast import StatePublisher, StateSubscriber, create_publisher, create_subscriber
+from .lockstep import LockstepCoordinator, LockstepNode, create_coordinator, create_node
+
+__all__ = [
+    'FrameEncoder',
+    'FrameDecoder',
+    'empty_render_data',
+    'UdpSender',
+    'UdpReceiver',
+    'TcpServer',
+    'TcpClient',
+    'StatePublisher',
+    'StateSubscriber',
+    'create_publisher',
+    'create_subscriber',
+    'LockstepCoordinator',
+    'LockstepNode',
+    'create_coordinator',
+    'create_node',
+]
@@ -0,0 +1,168 @@
+"""
+State broadcast - One simulation node publishes render data, render nodes draw it
+
+The publisher encodes each frame (net.frame) and hands it to a transport
+(net.transport); subscribers decode everything that arrived and keep the
+newest frame, so a render node always draws the latest state even if it
+fell behind. Lost UDP datagrams cost frames until the next keyframe.
+"""
+
+import time
+
+from .frame import FrameEncoder, FrameDecoder
+from .transport import UdpSender, UdpReceiver, TcpServer, TcpClient
+
+class StatePublisher:
+    """
+    Encodes and sends render data every frame.
+    """
+
+    def __init__(self, transport, keyframe_interval=30):
+        """
+        Initialize publisher.
+
+        Args:
+            transport: UdpSender or TcpServer
+            keyframe_interval: Frames between keyframes
+        """
+        self.transport = transport
+        self.encoder = FrameEncoder(keyframe_interval)
+        self.encode_ms = 0.0
+
+    def publish(self, render_data, clock_time):
+        """
+        Send one frame.
+
+        Frames are numbered by the publisher (not the simulation frame, which
+        repeats when a fixed-step frame runs no step), so ids always increase.
+
+        Args:
+            render_data: Dictionary from PollinationSystem.update()
+            clock_time: Simulation clock time
+        """
+        if self.transport.take_joins():
+            # A subscriber just joined - it can't decode deltas yet
+            self.encoder.force_keyframe()
+        start = time.perf_counter()
+        message = self.encoder.encode(render_data, self.encoder.frames + 1, clock_time)
+        self.encode_ms = (time.perf_counter() - start) * 1000
+        self.transport.send(message)
+
+    def get_stats(self):
+        """Get publishing counters."""
+        encoder = self.encoder
+        return {
+            'frames': encoder.frames,
+            'keyframes': encoder.keyframes,
+            'bytes_sent': encoder.bytes_sent,
+            'last_bytes': encoder.last_bytes,
+            'avg_bytes': encoder.bytes_sent / encoder.frames if encoder.frames else 0.0,
+            'encode_ms': self.encode_ms,
+            'send_errors': getattr(self.transport, 'send_errors', 0),
+            'clients': getattr(self.transport, 'num_clients', None),
+        }
+
+    def close(self):
+        self.transport.close()
+
+class StateSubscriber:
+    """
+    Receives render data and keeps the newest decodable frame.
+    """
+
+    def __init__(self, transport):
+        """
+        Initialize subscriber.
+
+        Args:
+            transport: UdpReceiver or TcpClient
+        """
+        self.transport = transport
+        self.decoder = FrameDecoder()
+        self.latest = None  # Newest render data (None until the first keyframe)
+        self.received_at = None  # time.monotonic() when `latest` arrived
+        self.bad_messages = 0
+        self.decode_ms = 0.0
+
+    def poll(self):
+        """
+        Decode every message that arrived since the last poll.
+
+        Returns:
+            The newest render data, or None if no new frame was decoded
+        """
+        messages = self.transport.receive()
+        if not messages:
+            return None
+        start = time.perf_counter()
+        newest = None
+        for message in messages:
+            # Every frame is decoded in order: each delta is the next one's base
+            try:
+                render_data = self.decoder.decode(message)
+            except ValueError:
+                self.bad_messages += 1
+                continue
+            if render_data is not None:
+                newest = render_data
+        self.decode_ms = (time.perf_counter() - start) * 1000
+        if newest is not None:
+            self.latest = newest
+            self.received_at = time.monotonic()
+        return newest
+
+    def get_stats(self):
+        """Get receiving counters."""
+        decoder = self.decoder
+        return {
+            'frames': decoder.frames,
+            'keyframes': decoder.keyframes,
+            'frame_id': decoder.frame_id,
+            'clock_time': decoder.clock_time,
+            'skipped': decoder.skipped,
+            'stale': decoder.stale,
+            'bad_messages': self.bad_messages,
+            'messages_dropped': self.transport.messages_dropped,
+            'decode_ms': self.decode_ms,
+            'age': time.monotonic() - self.received_at if self.received_at is not None else None,
+        }
+
+    def close(self):
+        self.transport.close()
+
+def create_publisher(transport, address, port, keyframe_interval=30):
+    """
+    Create a publisher from the BROADCAST_* settings.
+
+    Args:
+        transport: 'udp' (multicast or unicast to `address`) or 'tcp' (listen on all interfaces)
+        address: UDP destination (multicast group); unused for TCP
+        port: Port
+        keyframe_interval: Frames between keyframes
+
+    Returns:
+        StatePublisher
+    """
+    if transport == 'udp':
+        return StatePublisher(UdpSender(address, port), keyframe_interval)
+    if transport == 'tcp':
+        return StatePublisher(TcpServer('0.0.0.0', port), keyframe_interval)
+    raise ValueError(f"Unknown broadcast transport: {transport!r} (expected 'udp' or 'tcp')")
+
+def create_subscriber(transport, address, port):
+    """
+    Create a subscriber from the BROADCAST_* settings.
+
+    Args:
+        transport: 'udp' or 'tcp'
+        address: Multicast group (UDP) or the publisher's address (TCP)
+        port: Port
+
+    Returns:
+        StateSubscriber
+    """
+    if transport == 'udp':
+        return StateSubscriber(UdpReceiver(address, port))
+    if transport == 'tcp':
+        return StateSubscriber(TcpClient(address, port))
+    raise ValueError(f"Unknown broadcast transport: {transport!r} (expected 'udp' or 'tcp')")
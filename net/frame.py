@@ -0,0 +1,393 @@
+"""
+Frame codec - Render data as columnar arrays, delta-compressed against the previous frame
+
+A frame's render data (nested dicts/lists of visitors, auras, trails,
+agents, dances, structures and mycelium) is flattened into a fixed set of
+typed 1-D columns. Records of nested lists (trail points, dance particles)
+are concatenated with a per-parent length column, and optional records
+(auras, agent glows) carry a presence column.
+
+Wire message:
+    <4sBBHIIddd  magic, version, flags, columns, frame id, base frame id,
+                 render time, clock time, mycelium flow
+    <N I         element count per column
+    zlib(...)    column bytes; in a delta frame, every column with the same
+                 length as in the base frame is XORed with it (unchanged
+                 values become zero bytes, which compress to almost nothing)
+
+Keyframes (base id = frame id) decode on their own; a delta frame decodes
+only against its base, so a receiver that lost a frame waits for the next
+keyframe.
+"""
+
+import struct
+import zlib
+from operator import itemgetter
+import numpy as np
+
+FRAME_MAGIC = b'BSTF'
+FRAME_VERSION = 1
+FLAG_KEYFRAME = 1
+
+_HEADER = struct.Struct('<4sBBHIIddd')
+
+# Record tables: column prefix -> fields as (key, kind); kinds:
+# 'f' float32, 'i' int32, 'c' RGB color (3 float32 per record)
+_POINT_FIELDS = (('x', 'f'), ('y', 'f'), ('color', 'c'), ('alpha', 'f'), ('size', 'f'))
+_TABLES = (
+    ('visitor', (('id', 'i'), ('x', 'f'), ('y', 'f'))),
+    ('aura', (('x', 'f'), ('y', 'f'), ('color', 'c'), ('intensity', 'f'), ('glow_radius', 'f'), ('pulse', 'f'))),
+    ('trail_point', _POINT_FIELDS),
+    ('structure', (('x', 'f'), ('y', 'f'), ('radius', 'f'), ('color', 'c'), ('energy', 'f'), ('pulse', 'f'))),
+    ('agent', (('x', 'f'), ('y', 'f'), ('size', 'f'), ('base_color', 'c'))),
+    ('glow', (('color', 'c'), ('intensity', 'f'), ('radius', 'f'), ('pulse', 'f'))),
+    ('agent_point', _POINT_FIELDS),
+    ('dance', (('id', 'i'), ('center_x', 'f'), ('center_y', 'f'), ('visitor_color', 'c'),
+               ('structure_color', 'c'), ('alpha', 'f'))),
+    ('particle', _POINT_FIELDS),
+    ('ring', (('x', 'f'), ('y', 'f'), ('radius', 'f'), ('color', 'c'), ('alpha', 'f'))),
+)
+_TABLE_FIELDS = dict(_TABLES)
+
+# Presence, length and mycelium columns
+_EXTRA_COLUMNS = (
+    ('aura.present', np.uint8),
+    ('trail.length', np.int32),
+    ('glow.present', np.uint8),
+    ('agent.trail_length', np.int32),
+    ('dance.particles', np.int32),
+    ('dance.rings', np.int32),
+    ('mycelium.edge_a', np.int32),
+    ('mycelium.edge_b', np.int32),
+    ('mycelium.x1', np.float32),
+    ('mycelium.y1', np.float32),
+    ('mycelium.x2', np.float32),
+    ('mycelium.y2', np.float32),
+    ('mycelium.particle_x', np.float32),
+    ('mycelium.particle_y', np.float32),
+    ('mycelium.particle_alpha', np.float32),
+)
+
+def _column_list():
+    columns = []
+    for table, fields in _TABLES:
+        for key, kind in fields:
+            columns.append((f'{table}.{key}', np.int32 if kind == 'i' else np.float32))
+    return tuple(columns) + _EXTRA_COLUMNS
+
+# Wire order of the columns: (name, dtype)
+COLUMNS = _column_list()
+
+def _colors(values):
+    """(N,) list of RGB(A) tuples or arrays -> flat float32 RGB array."""
+    try:
+        array = np.array(values, dtype=np.float32)
+    except ValueError:
+        # Mixed RGB / RGBA
+        array = np.array([value[:3] for value in values], dtype=np.float32)
+    return array.reshape(len(values), -1)[:, :3].ravel()
+
+def _pack(columns, table, records):
+    """Append a list of record dicts to the table's columns (one chunk per column)."""
+    if not records:
+        return
+    for key, kind in _TABLE_FIELDS[table]:
+        name = f'{table}.{key}'
+        if kind == 'c':
+            # Colors are often small numpy arrays: one np.array() call instead of iterating each
+            columns[name].append(_colors(list(map(itemgetter(key), records))))
+        elif kind == 'i':
+            columns[name].append([-1 if record.get(key) is None else record[key] for record in records])  # -1 = no id
+        else:
+            columns[name].append(list(map(itemgetter(key), records)))
+
+def _pack_optional(columns, table, records):
+    """Like _pack, with a presence column; missing (None) records are stored as zeros."""
+    columns[f'{table}.present'].append([0 if record is None else 1 for record in records])
+    zero = {key: ((0.0, 0.0, 0.0) if kind == 'c' else 0) for key, kind in _TABLE_FIELDS[table]}
+    _pack(columns, table, [zero if record is None else record for record in records])
+
+def render_data_to_columns(render_data):
+    """
+    Flatten render data into the codec's columns.
+
+    Args:
+        render_data: Dictionary from PollinationSystem.get_render_data()
+
+    Returns:
+        (columns, scalars): dict name -> 1-D array (every name in COLUMNS),
+        and (time, mycelium flow)
+    """
+    lists = {name: [] for name, _ in COLUMNS}  # Column name -> chunks (lists or arrays)
+    _pack(lists, 'visitor', render_data.get('visitors', ()))
+    _pack_optional(lists, 'aura', render_data.get('visitor_auras', ()))
+
+    trails = render_data.get('visitor_trails', ())
+    lists['trail.length'].append([len(points) for points in trails])
+    _pack(lists, 'trail_point', [point for points in trails for point in points])
+
+    _pack(lists, 'structure', render_data.get('structures', ()))
+
+    agents = render_data.get('agents', ())
+    _pack(lists, 'agent', agents)
+    _pack_optional(lists, 'glow', [agent.get('glow') for agent in agents])
+    lists['agent.trail_length'].append([len(agent.get('trail', ())) for agent in agents])
+    _pack(lists, 'agent_point', [point for agent in agents for point in agent.get('trail', ())])
+
+    dances = render_data.get('dances', ())
+    _pack(lists, 'dance', dances)
+    lists['dance.particles'].append([len(dance['particles']) for dance in dances])
+    lists['dance.rings'].append([len(dance['rings']) for dance in dances])
+    _pack(lists, 'particle', [p for dance in dances for p in dance['particles']])
+    _pack(lists, 'ring', [r for dance in dances for r in dance['rings']])
+
+    columns = {}
+    for name, dtype in COLUMNS:
+        chunks = lists[name]
+        if len(chunks) == 1:
+            columns[name] = np.asarray(chunks[0], dtype=dtype)
+        elif chunks:
+            columns[name] = np.concatenate([np.asarray(chunk, dtype=dtype) for chunk in chunks])
+        else:
+            columns[name] = np.zeros(0, dtype=dtype)
+
+    flow = 0.0
+    mycelium = render_data.get('mycelium')
+    if mycelium is not None and 'edge_a' in mycelium:
+        for key in ('edge_a', 'edge_b', 'x1', 'y1', 'x2', 'y2'):
+            columns[f'mycelium.{key}'] = np.asarray(mycelium[key], dtype=columns[f'mycelium.{key}'].dtype)
+        particles = mycelium['particles']
+        columns['mycelium.particle_x'] = np.asarray(particles['x'], dtype=np.float32)
+        columns['mycelium.particle_y'] = np.asarray(particles['y'], dtype=np.float32)
+        columns['mycelium.particle_alpha'] = np.asarray(particles['alpha'], dtype=np.float32)
+        flow = float(mycelium['flow'])
+
+    return columns, (float(render_data.get('time', 0.0)), flow)
+
+def _unpack(columns, table):
+    """Rebuild the table's record dicts from its columns."""
+    fields = _TABLE_FIELDS[table]
+    values = []
+    for key, kind in fields:
+        column = columns[f'{table}.{key}']
+        if kind == 'c':
+            values.append([tuple(c) for c in column.reshape(-1, 3).tolist()])
+        else:
+            values.append(column.tolist())
+    keys = [key for key, _ in fields]
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+def _split(records, lengths):
+    """Split a flat record list into consecutive groups of the given lengths."""
+    groups = []
+    start = 0
+    for length in lengths:
+        groups.append(records[start:start + length])
+        start += length
+    return groups
+
+def columns_to_render_data(columns, scalars):
+    """
+    Rebuild render data from codec columns (inverse of render_data_to_columns).
+
+    Values come back as Python floats (float32 precision) and colors as tuples.
+    """
+    render_time, flow = scalars
+
+    auras = _unpack(columns, 'aura')
+    auras = [aura if present else None for aura, present in zip(auras, columns['aura.present'].tolist())]
+
+    trails = _split(_unpack(columns, 'trail_point'), columns['trail.length'].tolist())
+
+    agents = _unpack(columns, 'agent')
+    glows = _unpack(columns, 'glow')
+    agent_trails = _split(_unpack(columns, 'agent_point'), columns['agent.trail_length'].tolist())
+    for agent, glow, present, trail in zip(agents, glows, columns['glow.present'].tolist(), agent_trails):
+        agent['glow'] = glow if present else None
+        agent['trail'] = trail
+
+    dances = _unpack(columns, 'dance')
+    particles = _split(_unpack(columns, 'particle'), columns['dance.particles'].tolist())
+    rings = _split(_unpack(columns, 'ring'), columns['dance.rings'].tolist())
+    for dance, dance_particles, dance_rings in zip(dances, particles, rings):
+        dance['particles'] = dance_particles
+        dance['rings'] = dance_rings
+
+    mycelium = {
+        'edge_a': columns['mycelium.edge_a'],
+        'edge_b': columns['mycelium.edge_b'],
+        'x1': columns['mycelium.x1'],
+        'y1': columns['mycelium.y1'],
+        'x2': columns['mycelium.x2'],
+        'y2': columns['mycelium.y2'],
+        'flow': flow,
+        'particles': {
+            'x': columns['mycelium.particle_x'],
+            'y': columns['mycelium.particle_y'],
+            'alpha': columns['mycelium.particle_alpha'],
+        },
+    }
+
+    return {
+        'mycelium': mycelium,
+        'structures': _unpack(columns, 'structure'),
+        'visitor_auras': auras,
+        'visitor_trails': trails,
+        'dances': dances,
+        'agents': agents,
+        'visitors': _unpack(columns, 'visitor'),
+        'time': render_time,
+    }
+
+def _xor(current, base):
+    """Bitwise XOR of two same-length columns (as raw bytes)."""
+    a = current.view(np.uint8)
+    return np.bitwise_xor(a, base.view(np.uint8), out=np.empty_like(a))
+
+class FrameEncoder:
+    """
+    Encodes render data into wire messages, delta-compressed against the
+    previous frame with a keyframe every `keyframe_interval` frames.
+    """
+
+    def __init__(self, keyframe_interval=30, level=1):
+        """
+        Initialize encoder.
+
+        Args:
+            keyframe_interval: Frames between keyframes (loss recovery and late joiners)
+            level: zlib compression level
+        """
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self.level = level
+        self._previous = None  # Columns of the last encoded frame
+        self._previous_id = None
+        self._force_keyframe = True
+        self.frames = 0
+        self.keyframes = 0
+        self.bytes_sent = 0
+        self.last_bytes = 0
+
+    def force_keyframe(self):
+        """Make the next frame a keyframe (e.g. a subscriber just connected)."""
+        self._force_keyframe = True
+
+    def encode(self, render_data, frame_id, clock_time):
+        """
+        Encode one frame.
+
+        Args:
+            render_data: Dictionary from PollinationSystem.get_render_data()
+            frame_id: Frame number (increasing)
+            clock_time: Simulation clock time of the frame
+
+        Returns:
+            Message bytes
+        """
+        columns, (render_time, flow) = render_data_to_columns(render_data)
+        keyframe = (self._force_keyframe or self._previous is None
+                    or frame_id % self.keyframe_interval == 0)
+
+        previous = self._previous
+        counts = []
+        chunks = []
+        for name, _ in COLUMNS:
+            column = columns[name]
+            counts.append(len(column))
+            if not keyframe and len(previous[name]) == len(column):
+                chunks.append(_xor(column, previous[name]).tobytes())
+            else:
+                chunks.append(column.tobytes())
+
+        header = _HEADER.pack(FRAME_MAGIC, FRAME_VERSION, FLAG_KEYFRAME if keyframe else 0, len(COLUMNS),
+                              frame_id & 0xFFFFFFFF,
+                              (frame_id if keyframe else self._previous_id) & 0xFFFFFFFF,
+                              render_time, clock_time, flow)
+        message = (header + struct.pack(f'<{len(COLUMNS)}I', *counts)
+                   + zlib.compress(b''.join(chunks), self.level))
+
+        self._previous = columns
+        self._previous_id = frame_id
+        self._force_keyframe = False
+        self.frames += 1
+        self.keyframes += keyframe
+        self.bytes_sent += len(message)
+        self.last_bytes = len(message)
+        return message
+
+class FrameDecoder:
+    """
+    Decodes wire messages back into render data, tracking the delta base.
+    """
+
+    def __init__(self):
+        """Initialize decoder (waits for the first keyframe)."""
+        self._base = None  # Columns of the last decoded frame
+        self._base_id = None
+        self.frame_id = None  # Id of the last decoded frame
+        self.clock_time = None
+        self.frames = 0
+        self.keyframes = 0
+        self.skipped = 0  # Delta frames whose base was lost (waiting for a keyframe)
+        self.stale = 0  # Frames older than the last decoded one
+
+    def decode(self, message):
+        """
+        Decode one message.
+
+        Args:
+            message: Bytes from FrameEncoder.encode()
+
+        Returns:
+            Render data dict, or None if the frame can't be decoded yet
+            (delta against a frame this decoder didn't see)
+
+        Raises:
+            ValueError: Not a frame message, another codec version, or a corrupt payload
+        """
+        if len(message) < _HEADER.size:
+            raise ValueError("Truncated frame message")
+        magic, version, flags, num_columns, frame_id, base_id, render_time, clock_time, flow = \
+            _HEADER.unpack_from(message)
+        if magic != FRAME_MAGIC:
+            raise ValueError("Not a frame message")
+        if version != FRAME_VERSION or num_columns != len(COLUMNS):
+            raise ValueError(f"Frame codec version {version} ({num_columns} columns) is not supported")
+
+        if self.frame_id is not None and frame_id <= self.frame_id and not flags & FLAG_KEYFRAME:
+            self.stale += 1
+            return None
+        keyframe = bool(flags & FLAG_KEYFRAME)
+        if not keyframe and (self._base is None or base_id != self._base_id):
+            self.skipped += 1
+            return None
+
+        offset = _HEADER.size
+        counts = struct.unpack_from(f'<{num_columns}I', message, offset)
+        try:
+            payload = zlib.decompress(message[offset + 4 * num_columns:])
+        except zlib.error as e:
+            raise ValueError(f"Corrupt frame payload: {e}")
+
+        columns = {}
+        position = 0
+        for (name, dtype), count in zip(COLUMNS, counts):
+            size = count * np.dtype(dtype).itemsize
+            column = np.frombuffer(payload, dtype=dtype, count=count, offset=position)
+            position += size
+            if not keyframe and len(self._base[name]) == count:
+                column = _xor(column, self._base[name]).view(dtype)
+            columns[name] = column
+
+        self._base = columns
+        self._base_id = frame_id
+        self.frame_id = frame_id
+        self.clock_time = clock_time
+        self.frames += 1
+        self.keyframes += keyframe
+        return columns_to_render_data(columns, (render_time, flow))
+
+def empty_render_data():
+    """Render data for a frame with nothing in it (a render node before its first frame)."""
+    columns = {name: np.zeros(0, dtype=dtype) for name, dtype in COLUMNS}
+    return columns_to_render_data(columns, (0.0, 0.0))
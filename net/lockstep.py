@@ -0,0 +1,409 @@
+"""
+Lockstep - Every node runs the same seeded simulation; only inputs go over the wire
+
+The coordinator sends, for every simulation step, the frame number, dt,
+clock time and visitor positions (a few hundred bytes, whatever the
+particle counts). Render nodes feed them to their own PollinationSystem
+with a replay clock, exactly like ingest.replay, so they stay
+bit-identical to the coordinator.
+
+Every `hash_interval` frames the coordinator attaches its state_hash().
+A node that disagrees, misses a step, or has just started asks for a
+resync: a small UDP request to the coordinator (port + 1), answered with a
+zlib'd core.snapshot of the coordinator's state on the broadcast. TCP
+subscribers get a snapshot as soon as they connect.
+
+Messages (little-endian):
+    <4sBBBxH     magic, version, kind, flags, step count
+    steps:       <IddH frame, dt, clock time, visitors; then int32 ids and
+                 float64 (x, y) pairs
+    hash:        <I16s frame, state hash (FLAG_HASH)
+    snapshot:    <I frame, zlib(encode_snapshot())
+    resync:      <IB node frame, reason
+"""
+
+import struct
+import time
+import zlib
+import numpy as np
+
+from core.snapshot import encode_snapshot, decode_snapshot
+from .transport import UdpSender, UdpReceiver, TcpServer, TcpClient
+
+LOCKSTEP_MAGIC = b'BSLK'
+LOCKSTEP_VERSION = 1
+
+KIND_STEPS = 0
+KIND_SNAPSHOT = 1
+KIND_RESYNC = 2
+
+FLAG_HASH = 1
+
+# Resync reasons (node -> coordinator)
+RESYNC_JOIN = 0  # No state yet
+RESYNC_GAP = 1  # Missed a step
+RESYNC_MISMATCH = 2  # State hash differs
+RESYNC_REASONS = ('join', 'gap', 'mismatch')
+
+_HEADER = struct.Struct('<4sBBBxH')
+_STEP = struct.Struct('<IddH')
+_HASH = struct.Struct('<I16s')
+_FRAME = struct.Struct('<I')
+_RESYNC = struct.Struct('<IB')
+
+def wire_visitors(visitors):
+    """
+    Visitors exactly as the nodes will receive them (int ids, float64 positions).
+
+    The coordinator steps its own system with these, so both sides see
+    the same values even if the input arrived as e.g. float32.
+    """
+    return [{'id': int(v['id']), 'x': float(v['x']), 'y': float(v['y'])} for v in visitors]
+
+def encode_steps(steps, state_hash=None):
+    """
+    Encode a steps message.
+
+    Args:
+        steps: List of (frame, dt, clock_time, visitors)
+        state_hash: Optional (frame, hex digest) of the state after the last step
+
+    Returns:
+        Message bytes
+    """
+    flags = FLAG_HASH if state_hash is not None else 0
+    parts = [_HEADER.pack(LOCKSTEP_MAGIC, LOCKSTEP_VERSION, KIND_STEPS, flags, len(steps))]
+    for frame, dt, clock_time, visitors in steps:
+        parts.append(_STEP.pack(frame & 0xFFFFFFFF, dt, clock_time, len(visitors)))
+        if visitors:
+            parts.append(np.array([v['id'] for v in visitors], dtype='<i4').tobytes())
+            parts.append(np.array([(v['x'], v['y']) for v in visitors], dtype='<f8').tobytes())
+    if state_hash is not None:
+        frame, digest = state_hash
+        parts.append(_HASH.pack(frame & 0xFFFFFFFF, bytes.fromhex(digest)))
+    return b''.join(parts)
+
+def decode_steps(message):
+    """
+    Decode a steps message (inverse of encode_steps).
+
+    Returns:
+        (steps, state_hash) with state_hash None when not attached
+    """
+    _, _, _, flags, count = _HEADER.unpack_from(message)
+    offset = _HEADER.size
+    steps = []
+    for _ in range(count):
+        frame, dt, clock_time, num_visitors = _STEP.unpack_from(message, offset)
+        offset += _STEP.size
+        ids = np.frombuffer(message, dtype='<i4', count=num_visitors, offset=offset).tolist()
+        offset += 4 * num_visitors
+        xy = np.frombuffer(message, dtype='<f8', count=2 * num_visitors, offset=offset).tolist()
+        offset += 16 * num_visitors
+        visitors = [{'id': i, 'x': xy[2 * k], 'y': xy[2 * k + 1]} for k, i in enumerate(ids)]
+        steps.append((frame, dt, clock_time, visitors))
+    state_hash = None
+    if flags & FLAG_HASH:
+        frame, digest = _HASH.unpack_from(message, offset)
+        state_hash = (frame, digest.hex())
+    return steps, state_hash
+
+def _parse_header(message, kind=None):
+    if len(message) < _HEADER.size:
+        raise ValueError("Truncated lockstep message")
+    magic, version, message_kind, _, _ = _HEADER.unpack_from(message)
+    if magic != LOCKSTEP_MAGIC:
+        raise ValueError("Not a lockstep message")
+    if version != LOCKSTEP_VERSION:
+        raise ValueError(f"Lockstep protocol version {version} is not supported")
+    if kind is not None and message_kind != kind:
+        raise ValueError(f"Unexpected lockstep message kind {message_kind}")
+    return message_kind
+
+class LockstepCoordinator:
+    """
+    Broadcasts the coordinator's simulation inputs, hashes and resync snapshots.
+    """
+
+    def __init__(self, system, transport, requests, hash_interval=60, snapshot_cooldown=0.5):
+        """
+        Initialize coordinator.
+
+        Args:
+            system: The PollinationSystem being stepped on this machine
+            transport: UdpSender or TcpServer (to the render nodes)
+            requests: UdpReceiver for resync requests from the nodes
+            hash_interval: Frames between state hashes (0 = never)
+            snapshot_cooldown: Minimum seconds between resync snapshots
+        """
+        self.system = system
+        self.transport = transport
+        self.requests = requests
+        self.hash_interval = hash_interval
+        self.snapshot_cooldown = snapshot_cooldown
+        self._steps = []  # Steps taken since the last flush
+        self._hash_frame = system.frame
+        self._snapshot_pending = False
+        self._last_snapshot = float('-inf')
+        self.messages = 0
+        self.bytes_sent = 0
+        self.last_bytes = 0
+        self.hash_ms = 0.0
+        self.snapshots = 0
+        self.snapshot_bytes = 0
+        self.resync_requests = {reason: 0 for reason in RESYNC_REASONS}
+
+    def set_system(self, system):
+        """Switch to a new system (e.g. after a hot reload) and resync every node."""
+        self.system = system
+        self._steps = []
+        self._snapshot_pending = True
+        self._last_snapshot = float('-inf')
+
+    def record_step(self, visitors):
+        """Queue the step the system just took (call after every update/step)."""
+        clock = self.system.clock
+        self._steps.append((self.system.frame, clock.dt, clock.now, visitors))
+
+    def _poll_requests(self):
+        for message in self.requests.receive():
+            try:
+                _parse_header(message, KIND_RESYNC)
+                _, reason = _RESYNC.unpack_from(message, _HEADER.size)
+            except (ValueError, struct.error):
+                continue
+            if reason < len(RESYNC_REASONS):
+                self.resync_requests[RESYNC_REASONS[reason]] += 1
+            self._snapshot_pending = True
+        if self.transport.take_joins():
+            self.resync_requests['join'] += 1
+            self._snapshot_pending = True
+
+    def flush(self):
+        """Send this frame's steps (with a hash when due) and any requested snapshot."""
+        self._poll_requests()
+        system = self.system
+
+        if self._steps:
+            state_hash = None
+            if self.hash_interval and system.frame - self._hash_frame >= self.hash_interval:
+                start = time.perf_counter()
+                state_hash = (system.frame, system.state_hash())
+                self.hash_ms = (time.perf_counter() - start) * 1000
+                self._hash_frame = system.frame
+            message = encode_steps(self._steps, state_hash)
+            self._steps = []
+            self.transport.send(message)
+            self.messages += 1
+            self.bytes_sent += len(message)
+            self.last_bytes = len(message)
+
+        now = time.monotonic()
+        if self._snapshot_pending and now - self._last_snapshot >= self.snapshot_cooldown:
+            # Several nodes asking at once share one snapshot
+            snapshot = zlib.compress(encode_snapshot(system.get_state()), 1)
+            message = (_HEADER.pack(LOCKSTEP_MAGIC, LOCKSTEP_VERSION, KIND_SNAPSHOT, 0, 0)
+                       + _FRAME.pack(system.frame & 0xFFFFFFFF) + snapshot)
+            self.transport.send(message)
+            self._snapshot_pending = False
+            self._last_snapshot = now
+            self.snapshots += 1
+            self.snapshot_bytes = len(message)
+
+    def get_stats(self):
+        """Get coordinator counters."""
+        return {
+            'frame': self.system.frame,
+            'messages': self.messages,
+            'bytes_sent': self.bytes_sent,
+            'last_bytes': self.last_bytes,
+            'avg_bytes': self.bytes_sent / self.messages if self.messages else 0.0,
+            'hash_ms': self.hash_ms,
+            'snapshots': self.snapshots,
+            'snapshot_bytes': self.snapshot_bytes,
+            'resync_requests': dict(self.resync_requests),
+            'clients': getattr(self.transport, 'num_clients', None),
+        }
+
+    def close(self):
+        self.transport.close()
+        self.requests.close()
+
+class LockstepNode:
+    """
+    Steps a local PollinationSystem with the coordinator's inputs.
+    """
+
+    def __init__(self, system, transport, request_port, retry_interval=1.0):
+        """
+        Initialize node.
+
+        Args:
+            system: Local PollinationSystem (same canvas, structures and
+                    mycelium seed as the coordinator's; its state comes
+                    from the first snapshot)
+            transport: UdpReceiver or TcpClient (from the coordinator)
+            request_port: Coordinator port for resync requests
+            retry_interval: Seconds between repeated resync requests
+        """
+        self.system = system
+        system.clock.configure('replay')
+        self.transport = transport
+        self.request_port = request_port
+        self.retry_interval = retry_interval
+        self._requests = None  # UdpSender, opened once the coordinator's address is known
+        self._requested_at = float('-inf')
+        self.synced = False
+        self.latest = None  # Render data of the newest step (None until synced)
+        self.steps = 0
+        self.resyncs = 0
+        self.gaps = 0
+        self.mismatches = 0
+        self.hash_checks = 0
+        self.bad_messages = 0
+        self.step_ms = 0.0
+
+    def set_system(self, system):
+        """Switch to a new system (e.g. after a hot reload); resyncs from the coordinator."""
+        self.system = system
+        system.clock.configure('replay')
+        self.synced = False
+
+    def _request_resync(self, reason):
+        self.synced = False
+        now = time.monotonic()
+        if self.transport.source is None or now - self._requested_at < self.retry_interval:
+            return
+        if self._requests is None:
+            self._requests = UdpSender(self.transport.source, self.request_port)
+        self._requests.send(_HEADER.pack(LOCKSTEP_MAGIC, LOCKSTEP_VERSION, KIND_RESYNC, 0, 0)
+                            + _RESYNC.pack(self.system.frame & 0xFFFFFFFF, reason))
+        self._requested_at = now
+
+    def _apply_snapshot(self, message):
+        if self.synced:
+            return
+        frame, = _FRAME.unpack_from(message, _HEADER.size)
+        try:
+            _, state = decode_snapshot(bytearray(zlib.decompress(message[_HEADER.size + _FRAME.size:])))
+            self.system.set_state(state)
+        except (zlib.error, ValueError, KeyError):
+            self.bad_messages += 1
+            return
+        self.synced = True
+        self.resyncs += 1
+        self._requested_at = float('-inf')
+        self.latest = self.system.get_render_data([], self.system.clock.now)
+        self.latest['timestamps'] = {}
+
+    def _apply_steps(self, message):
+        steps, state_hash = decode_steps(message)
+        system = self.system
+        for frame, dt, clock_time, visitors in steps:
+            if not self.synced:
+                break
+            if frame <= system.frame:
+                continue  # Already have it (e.g. from a snapshot)
+            if frame != system.frame + 1:
+                self.gaps += 1
+                self._request_resync(RESYNC_GAP)
+                break
+            self.latest = system.update(visitors, dt, clock_time)
+            self.steps += 1
+
+        if self.synced and state_hash is not None and state_hash[0] == system.frame:
+            self.hash_checks += 1
+            if system.state_hash() != state_hash[1]:
+                self.mismatches += 1
+                self._request_resync(RESYNC_MISMATCH)
+
+    def poll(self):
+        """
+        Apply everything that arrived since the last poll.
+
+        Returns:
+            Render data of the newest step, or None if nothing was stepped
+        """
+        messages = self.transport.receive()
+        if not messages:
+            if not self.synced:
+                self._request_resync(RESYNC_JOIN)
+            return None
+        start = time.perf_counter()
+        steps = self.steps
+        for message in messages:
+            try:
+                kind = _parse_header(message)
+                if kind == KIND_STEPS:
+                    self._apply_steps(message)
+                elif kind == KIND_SNAPSHOT:
+                    self._apply_snapshot(message)
+            except (ValueError, struct.error):
+                self.bad_messages += 1
+        if not self.synced:
+            self._request_resync(RESYNC_JOIN)
+        self.step_ms = (time.perf_counter() - start) * 1000
+        return self.latest if self.steps != steps else None
+
+    def get_stats(self):
+        """Get node counters."""
+        return {
+            'frame': self.system.frame,
+            'synced': self.synced,
+            'steps': self.steps,
+            'resyncs': self.resyncs,
+            'gaps': self.gaps,
+            'mismatches': self.mismatches,
+            'hash_checks': self.hash_checks,
+            'bad_messages': self.bad_messages,
+            'messages_dropped': self.transport.messages_dropped,
+            'step_ms': self.step_ms,
+        }
+
+    def close(self):
+        self.transport.close()
+        if self._requests is not None:
+            self._requests.close()
+
+def create_coordinator(system, transport, address, port, hash_interval=60):
+    """
+    Create a coordinator from the BROADCAST_* settings.
+
+    Args:
+        system: PollinationSystem stepped on this machine
+        transport: 'udp' or 'tcp' (see net.broadcast.create_publisher)
+        address: UDP destination (multicast group); unused for TCP
+        port: Broadcast port (resync requests arrive on port + 1)
+        hash_interval: Frames between state hashes
+
+    Returns:
+        LockstepCoordinator
+    """
+    if transport == 'udp':
+        sender = UdpSender(address, port)
+    elif transport == 'tcp':
+        sender = TcpServer('0.0.0.0', port)
+    else:
+        raise ValueError(f"Unknown broadcast transport: {transport!r} (expected 'udp' or 'tcp')")
+    return LockstepCoordinator(system, sender, UdpReceiver('0.0.0.0', port + 1), hash_interval)
+
+def create_node(system, transport, address, port):
+    """
+    Create a lockstep node from the BROADCAST_* settings.
+
+    Args:
+        system: Local PollinationSystem
+        transport: 'udp' or 'tcp'
+        address: Multicast group (UDP) or the coordinator's address (TCP)
+        port: Broadcast port (resync requests go to port + 1)
+
+    Returns:
+        LockstepNode
+    """
+    if transport == 'udp':
+        receiver = UdpReceiver(address, port)
+    elif transport == 'tcp':
+        receiver = TcpClient(address, port)
+    else:
+        raise ValueError(f"Unknown broadcast transport: {transport!r} (expected 'udp' or 'tcp')")
+    return LockstepNode(system, receiver, port + 1)
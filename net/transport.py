@@ -0,0 +1,345 @@
+"""
+Transports - Message delivery for the state broadcast (UDP multicast/unicast, TCP)
+
+Senders take whole messages (bytes) and receivers hand whole messages
+back; nothing blocks the frame. UDP splits messages into datagrams that
+fit one Ethernet frame and reassembles them on the other side (a message
+with a lost datagram is dropped). TCP frames messages with a length prefix
+and keeps a send buffer per subscriber (slow subscribers are dropped
+instead of stalling the publisher).
+"""
+
+import errno
+import ipaddress
+import select
+import socket
+import struct
+
+_DATAGRAM_MAGIC = b'BSTD'
+_DATAGRAM_HEADER = struct.Struct('<4sIHH')  # magic, message id, fragment index, fragment count
+_LENGTH = struct.Struct('<I')
+
+# Payload per datagram (stays under a 1500-byte MTU with IP/UDP headers)
+MAX_DATAGRAM_PAYLOAD = 1400
+
+def _is_multicast(address):
+    try:
+        return ipaddress.ip_address(address).is_multicast
+    except ValueError:
+        return False
+
+class UdpSender:
+    """
+    Sends messages as UDP datagrams to a multicast group (or one unicast address).
+    """
+
+    def __init__(self, address, port, ttl=1, interface='0.0.0.0', payload_size=MAX_DATAGRAM_PAYLOAD):
+        """
+        Initialize sender.
+
+        Args:
+            address: Multicast group (e.g. 239.0.0.42) or unicast address
+            port: Destination port
+            ttl: Multicast hops (1 = local network only)
+            interface: Local interface address for multicast
+            payload_size: Message bytes per datagram
+        """
+        self.destination = (address, port)
+        self.payload_size = payload_size
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if _is_multicast(address):
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        self.sock.setblocking(False)
+        self._message_id = 0
+        self.datagrams_sent = 0
+        self.send_errors = 0
+
+    def take_joins(self):
+        """UDP receivers join silently (they wait for the next keyframe)."""
+        return False
+
+    def send(self, message):
+        """Send one message (split into datagrams)."""
+        self._message_id = (self._message_id + 1) & 0xFFFFFFFF
+        size = self.payload_size
+        count = max(1, -(-len(message) // size))
+        if count > 0xFFFF:
+            raise ValueError(f"Message of {len(message)} bytes is too large for UDP")
+        view = memoryview(message)
+        for index in range(count):
+            header = _DATAGRAM_HEADER.pack(_DATAGRAM_MAGIC, self._message_id, index, count)
+            try:
+                self.sock.sendto(header + view[index * size:(index + 1) * size], self.destination)
+                self.datagrams_sent += 1
+            except (BlockingIOError, OSError):
+                # Socket buffer full or network down - the receivers recover at the next keyframe
+                self.send_errors += 1
+
+    def close(self):
+        self.sock.close()
+
+class UdpReceiver:
+    """
+    Receives messages sent by UdpSender (joins the multicast group if needed).
+    """
+
+    def __init__(self, address, port, interface='0.0.0.0', buffer_bytes=4 * 1024 * 1024):
+        """
+        Initialize receiver.
+
+        Args:
+            address: Multicast group to join, or the local address to listen on
+            port: Port to listen on
+            interface: Local interface address for multicast
+            buffer_bytes: Socket receive buffer (holds a few frames of datagrams)
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, buffer_bytes)
+        except OSError:
+            pass
+        if _is_multicast(address):
+            self.sock.bind(('', port))
+            membership = socket.inet_aton(address) + socket.inet_aton(interface)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        else:
+            self.sock.bind((address, port))
+        self.sock.setblocking(False)
+        self._partial_id = None  # Message being reassembled
+        self._fragments = {}
+        self.source = None  # Address of the last sender (where to send requests back)
+        self.messages_received = 0
+        self.messages_dropped = 0  # Incomplete (a datagram was lost or reordered away)
+
+    def receive(self):
+        """
+        Collect the messages that arrived since the last call.
+
+        Returns:
+            List of message bytes, oldest first
+        """
+        messages = []
+        while True:
+            try:
+                datagram, (self.source, _) = self.sock.recvfrom(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                break
+            if len(datagram) < _DATAGRAM_HEADER.size:
+                continue
+            magic, message_id, index, count = _DATAGRAM_HEADER.unpack_from(datagram)
+            if magic != _DATAGRAM_MAGIC:
+                continue
+            if message_id != self._partial_id:
+                if self._fragments:
+                    self.messages_dropped += 1
+                self._partial_id = message_id
+                self._fragments = {}
+            self._fragments[index] = datagram[_DATAGRAM_HEADER.size:]
+            if len(self._fragments) == count:
+                messages.append(b''.join(self._fragments[i] for i in range(count)))
+                self._fragments = {}
+                self.messages_received += 1
+        return messages
+
+    def close(self):
+        self.sock.close()
+
+class TcpServer:
+    """
+    Publishes messages to every connected TCP subscriber (length-prefixed).
+    """
+
+    def __init__(self, host, port, max_buffer=8 * 1024 * 1024):
+        """
+        Initialize server.
+
+        Args:
+            host: Address to listen on ('0.0.0.0' = all interfaces)
+            port: Port to listen on
+            max_buffer: Unsent bytes per subscriber before it is dropped
+        """
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(8)
+        self.sock.setblocking(False)
+        self.max_buffer = max_buffer
+        self._clients = []  # [socket, pending bytearray]
+        self._joined = False  # A subscriber connected since the last take_joins()
+        self.dropped_clients = 0
+
+    @property
+    def port(self):
+        return self.sock.getsockname()[1]
+
+    @property
+    def num_clients(self):
+        return len(self._clients)
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            conn.setblocking(False)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._clients.append([conn, bytearray()])
+            self._joined = True
+
+    def take_joins(self):
+        """
+        Accept waiting subscribers.
+
+        Returns:
+            True if any subscriber connected since the last call (the next
+            message should be a keyframe: it's the first one they get)
+        """
+        self._accept()
+        joined = self._joined
+        self._joined = False
+        return joined
+
+    def send(self, message):
+        """Queue a message for every subscriber and send what the sockets take now."""
+        framed = _LENGTH.pack(len(message)) + message
+        alive = []
+        for client in self._clients:
+            conn, pending = client
+            pending += framed
+            try:
+                sent = conn.send(pending)
+                del pending[:sent]
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError:
+                conn.close()
+                self.dropped_clients += 1
+                continue
+            if len(pending) > self.max_buffer:
+                conn.close()
+                self.dropped_clients += 1
+                continue
+            alive.append(client)
+        self._clients = alive
+
+    def close(self):
+        for conn, _ in self._clients:
+            conn.close()
+        self._clients = []
+        self.sock.close()
+
+class TcpClient:
+    """
+    Receives length-prefixed messages from a TcpServer, reconnecting when dropped.
+    """
+
+    def __init__(self, host, port, retry_interval=1.0):
+        """
+        Initialize client (connects lazily on receive(), without blocking).
+
+        Args:
+            host, port: Publisher address
+            retry_interval: Seconds between connection attempts (and how
+                            long one attempt may stay in progress)
+        """
+        self.address = (host, port)
+        self.source = host  # Same attribute as UdpReceiver
+        self.retry_interval = retry_interval
+        self.sock = None
+        self._connecting = None  # Socket with a non-blocking connect in progress
+        self._buffer = bytearray()
+        self._next_attempt = 0.0
+        self.connects = 0
+        self.messages_received = 0
+        self.messages_dropped = 0  # Always 0 (TCP is reliable); kept for the same stats as UDP
+
+    def _connect(self):
+        """Start a connection attempt, or check on the one in progress (never waits)."""
+        import time
+        now = time.monotonic()
+        if self._connecting is None:
+            if now < self._next_attempt:
+                return
+            self._next_attempt = now + self.retry_interval
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            error = sock.connect_ex(self.address)
+            if error not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+                sock.close()
+                return
+            self._connecting = sock
+
+        sock = self._connecting
+        try:
+            _, writable, failed = select.select([], [sock], [sock], 0)
+        except (OSError, ValueError):
+            writable, failed = [], [sock]
+        if not writable and not failed:
+            if now >= self._next_attempt:
+                # Still not connected after retry_interval - start over
+                sock.close()
+                self._connecting = None
+            return
+        self._connecting = None
+        if failed or sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR):
+            sock.close()
+            return
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = sock
+        self._buffer = bytearray()
+        self.connects += 1
+
+    def receive(self):
+        """
+        Collect the complete messages that arrived since the last call.
+
+        Returns:
+            List of message bytes, oldest first
+        """
+        if self.sock is None:
+            self._connect()
+            if self.sock is None:
+                return []
+        while True:
+            try:
+                data = self.sock.recv(1 << 20)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError:
+                data = b''
+            if not data:
+                # Publisher went away - reconnect later (it sends a keyframe on connect)
+                self.sock.close()
+                self.sock = None
+                break
+            self._buffer += data
+
+        messages = []
+        buffer = self._buffer
+        offset = 0
+        while len(buffer) - offset >= _LENGTH.size:
+            (length,) = _LENGTH.unpack_from(buffer, offset)
+            if len(buffer) - offset - _LENGTH.size < length:
+                break
+            start = offset + _LENGTH.size
+            messages.append(bytes(buffer[start:start + length]))
+            offset = start + length
+        del buffer[:offset]
+        self.messages_received += len(messages)
+        return messages
+
+    def close(self):
+        if self._connecting is not None:
+            self._connecting.close()
+            self._connecting = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
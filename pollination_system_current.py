@@ -5,6 +5,7 @@ Main system controller
 
 import sys
 import os
+import time
 
 # Add biotelia-td to path FIRST before any imports
 # Use dynamic path resolution based on .toe file location
@@ -28,7 +29,18 @@ if biotelia_path not in sys.path:
 print(f"✓ Project path: {biotelia_path}")
 
 # NOW import the modules
-from core.system import PollinationSystem
+# (core classes are looked up through their modules so hot reloads take effect)
+import core.system
+import core.clock
+import core.stepper
+import core.snapshot
+from core.latency import now_ns
+from core.reload import ReloadManager
+from ingest.channels import MocapChannels, visitors_from_arrays
+from ingest.calibration import Calibration
+from net.broadcast import create_publisher, create_subscriber
+from net.frame import empty_render_data
+from net.lockstep import create_coordinator, create_node, wire_visitors
 import config
 import numpy as np
 
@@ -36,9 +48,37 @@ import numpy as np
 system = None
 initialized = False
 
+# Mocap session recorder (ingest.SessionRecorder, None when not recording)
+recorder = None
+
+# Fixed-timestep driver (None = one variable-dt update per frame)
+stepper = None
+
+# Time of the last state snapshot (time.monotonic)
+last_snapshot = 0.0
+
+# Hot reload of core/ and config.py (None when config.HOT_RELOAD is off)
+reloader = None
+
+# Mocap channel discovery (ingest.MocapChannels, created on first mocap frame)
+mocap_channels = None
+
+# Tracker -> canvas transform (ingest.Calibration, None = positions already in pixels)
+calibration = None
+
+# State broadcast (config.NODE_ROLE): net.StatePublisher on the simulation node,
+# net.StateSubscriber on a render node (both None when standalone)
+publisher = None
+subscriber = None
+
+# Lockstep (config.BROADCAST_MODE = 'lockstep'): net.LockstepCoordinator on the
+# simulation node, net.LockstepNode on a render node
+coordinator = None
+lockstep_node = None
+
 def initialize(width=None, height=None):
     """Initialize the pollination system (call once)."""
-    global system, initialized
+    global system, initialized, stepper, reloader
 
     if initialized:
         return
@@ -63,12 +103,13 @@ def initialize(width=None, height=None):
         else:
             height = config.DEFAULT_HEIGHT
 
+        # Multi-projector floor: the resolution above is one projector's tile
+        if config.TILE_COLUMNS * config.TILE_ROWS > 1:
+            width = config.TILE_COLUMNS * width - (config.TILE_COLUMNS - 1) * config.TILE_OVERLAP
+            height = config.TILE_ROWS * height - (config.TILE_ROWS - 1) * config.TILE_OVERLAP
+
     # Create system with configured resolution
-    system = PollinationSystem(
-        canvas_width=width,
-        canvas_height=height,
-        structures_config=config.STRUCTURES
-    )
+    system = _create_system(width, height)
 
     # Add autonomous agents only in test mode
     # In production/mocap mode, only mocap-tracked visitors are shown
@@ -85,16 +126,57 @@ def initialize(width=None, height=None):
         system.add_autonomous_agent('moth')
         num_agents = 3
 
+    stepper = _create_stepper(system)
+    load_calibration()
+
+    # Warm restart: continue from the last snapshot (auras, trails, dances, ...)
+    if config.SNAPSHOT_RESTORE:
+        try:
+            restored = core.snapshot.restore_snapshot(system, _snapshot_path(), max_age=config.SNAPSHOT_MAX_AGE)
+            if use_mocap and system.agents:
+                # Snapshot was saved in mouse/test mode; a mocap show has no autonomous agents
+                print(f"  - Dropped {len(system.agents)} restored agents (not used in mocap mode)")
+                system.agents = []
+            num_agents = len(system.agents)
+            print(f"✓ Restored snapshot from frame {restored['frame']} "
+                  f"({restored['age']:.0f} s old, {restored['ms']:.1f} ms)")
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            print(f"⚠ Snapshot not restored: {e}")
+
+    if config.HOT_RELOAD:
+        reloader = ReloadManager(
+            interval=config.HOT_RELOAD_INTERVAL,
+            budget_ms=config.HOT_RELOAD_BUDGET_MS,
+            on_reload=_migrate_system
+        )
+
+    _start_broadcast()
+
     initialized = True
 
-    # Determine mode from actual resolution
-    mode = "PRODUCTION" if width == config.PRODUCTION_WIDTH else "TEST"
+    if config.MOCAP_RECORD:
+        start_recording()
+
+    # Determine mode from actual resolution (of one projector's tile)
+    tile_width = (width + (config.TILE_COLUMNS - 1) * config.TILE_OVERLAP) // config.TILE_COLUMNS
+    mode = "PRODUCTION" if tile_width == config.PRODUCTION_WIDTH else "TEST"
 
     print(f"✓ Biotelia Pollination System initialized ({mode} mode)")
     print(f"  - Canvas: {width}x{height}")
+    if config.TILE_COLUMNS * config.TILE_ROWS > 1:
+        print(f"  - Projectors: {config.TILE_COLUMNS}x{config.TILE_ROWS} tiles, {config.TILE_OVERLAP} px overlap")
+    if reloader is not None:
+        print(f"  - Hot reload: watching {reloader.get_stats()['watched']} modules")
+    if stepper is not None:
+        print(f"  - Simulation: fixed {config.SIM_HZ} Hz (max {config.SIM_MAX_CATCHUP} steps/frame)")
+    if config.NODE_ROLE != 'standalone':
+        print(f"  - Node: {config.NODE_ROLE} ({config.BROADCAST_MODE}, {config.BROADCAST_TRANSPORT} "
+              f"{config.BROADCAST_ADDRESS}:{config.BROADCAST_PORT})")
     print(f"  - Structures: {len(config.STRUCTURES)}")
     if num_agents > 0:
-        print(f"  - Agents: {num_agents} (bee, butterfly, moth)")
+        print(f"  - Agents: {num_agents} ({', '.join(agent.type for agent in system.agents)})")
     else:
         print(f"  - Agents: 0 (mocap mode - visitors only)")
 
@@ -104,15 +186,73 @@ def initialize(width=None, height=None):
     else:
         print(f"  - Settings: config.py (fallback)")
 
-def update_frame(chop_data, dt=1.0/60.0):
+def _create_system(width, height):
+    """Create a PollinationSystem from config (without agents)."""
+    return core.system.PollinationSystem(
+        canvas_width=width,
+        canvas_height=height,
+        structures_config=config.STRUCTURES,
+        mycelium_seed=config.MYCELIUM_SEED,
+        profile_frames=config.PROFILE_FRAMES,
+        seed=config.SIMULATION_SEED,
+        clock=core.clock.Clock(config.CLOCK_MODE, dt=1.0 / config.TARGET_FPS)
+    )
+
+def _create_stepper(sim):
+    """Create the fixed-timestep driver for a system (None when SIM_FIXED_STEP is off)."""
+    if not config.SIM_FIXED_STEP:
+        return None
+    return core.stepper.FixedTimestepper(
+        sim,
+        sim_hz=config.SIM_HZ,
+        max_catchup=config.SIM_MAX_CATCHUP,
+        on_step=_record_step
+    )
+
+def _migrate_system(modules):
+    """
+    Move the running system onto freshly reloaded classes (ReloadManager hook).
+
+    The state goes through the snapshot format, so anything a warm restart
+    keeps survives a reload. Runs as two budgeted steps: build the new
+    system, then copy the state and swap.
+    """
+    global system, stepper
+
+    new_system = _create_system(system.canvas_width, system.canvas_height)
+    new_stepper = _create_stepper(new_system)
+    yield 'create'
+
+    try:
+        _, state = core.snapshot.decode_snapshot(core.snapshot.encode_snapshot(system.get_state()))
+        new_system.set_state(state)
+    except ValueError as e:
+        # E.g. config.STRUCTURES changed the layout
+        print(f"⚠ State not migrated, starting fresh: {e}")
+        new_system = _create_system(system.canvas_width, system.canvas_height)
+        new_stepper = _create_stepper(new_system)
+        for agent in system.agents:
+            new_system.add_autonomous_agent(agent.type)
+
+    system = new_system
+    stepper = new_stepper
+    if coordinator is not None:
+        coordinator.set_system(system)  # Nodes resync from a snapshot of the migrated state
+    if lockstep_node is not None:
+        lockstep_node.set_system(system)
+    yield 'migrate'
+
+def update_frame(chop_data, dt=None):
     """
     Update pollination system each frame.
 
     Args:
         chop_data: CHOP with position data
                    Mouse mode: channels tx, ty
-                   Mocap mode: channels p0x, p0y, p1x, p1y, ... p8x, p8y
-        dt: Delta time in seconds
+                   Mocap mode: channels p1x, p1y, p2x, p2y, ... (discovered from the
+                   CHOP, any number of bodies; pN is visitor id N-1, see ingest.channels)
+        dt: Delta time in seconds (default: from the system clock; with
+            SIM_FIXED_STEP, real time since the previous frame)
 
     Returns:
         Render data dictionary
@@ -122,13 +262,22 @@ def update_frame(chop_data, dt=1.0/60.0):
     if not initialized:
         initialize()
 
+    if reloader is not None:
+        reloader.poll()
+
+    # Ingest timestamp: when this frame's input sample is read
+    ingest = now_ns()
+
+    if subscriber is not None or lockstep_node is not None:
+        # Render node: draw the newest frame from the simulation node
+        return _receive_frame(ingest)
+
     # Parse visitor positions from CHOP
     visitors = []
 
     if not chop_data or not hasattr(chop_data, 'chan'):
         # No input data, return with empty visitors
-        render_data = system.update(visitors, dt)
-        return render_data
+        return _update_system(visitors, dt, ingest)
 
     # Get input mode from TouchDesigner UI if available
     settings = op('/project1/settings_control')
@@ -142,31 +291,19 @@ def update_frame(chop_data, dt=1.0/60.0):
         use_mocap = config.USE_MOCAP_INPUT
 
     if use_mocap:
-        # PRODUCTION MODE: Parse mocap data (p1x, p1y, p2x, p2y, ...)
-        # Channel names start at 1, not 0
-        for person_id in range(1, config.MAX_VISITORS + 1):
-            try:
-                # Get channels for this person
-                x_channel_name = f'p{person_id}x'
-                y_channel_name = f'p{person_id}y'
-
-                x_chan = chop_data.chan(x_channel_name)
-                y_chan = chop_data.chan(y_channel_name)
-
-                if x_chan and y_chan:
-                    # Get mocap values (already mapped to pixel coordinates in TD)
-                    x_val = x_chan.eval() if hasattr(x_chan, 'eval') else x_chan[0]
-                    y_val = y_chan.eval() if hasattr(y_chan, 'eval') else y_chan[0]
-
-                    # Coordinates are already mapped to pixels in TouchDesigner
-                    visitors.append({
-                        'id': person_id - 1,
-                        'x': x_val,
-                        'y': y_val,
-                    })
-            except Exception as e:
-                # Channel not found or error - skip this person
-                pass
+        # PRODUCTION MODE: Mocap data (p1x, p1y, p2x, p2y, ...; any number of bodies)
+        # Channel names start at 1, not 0; coordinates are mapped to pixels by the
+        # calibration if there is one, otherwise they must arrive in pixels from TD
+        try:
+            ids, xs, ys = _get_mocap_channels().read(chop_data)
+            if calibration is not None:
+                xs, ys = calibration.apply(xs, ys)
+                # Round to the recorder's float32 so a replay feeds the exact same positions
+                xs, ys = xs.astype(np.float32), ys.astype(np.float32)
+            visitors = visitors_from_arrays(ids, xs, ys)
+        except Exception as e:
+            # Channels changing mid-read - skip this frame's visitors
+            pass
     else:
         # TEST MODE: Use mouse input for single visitor
         try:
@@ -187,10 +324,207 @@ def update_frame(chop_data, dt=1.0/60.0):
             pass
 
     # Update system
-    render_data = system.update(visitors, dt)
+    return _update_system(visitors, dt, ingest)
 
+def load_calibration():
+    """
+    (Re)load the mocap calibration from MOCAP_CALIBRATION (next to config.py).
+
+    Returns:
+        The Calibration, or None when there is no calibration file
+    """
+    global calibration
+    calibration = None
+    if config.MOCAP_CALIBRATION:
+        path = os.path.join(biotelia_path, config.MOCAP_CALIBRATION)
+        if os.path.exists(path):
+            try:
+                calibration = Calibration.load(path)
+                print(f"✓ Mocap calibration: {config.MOCAP_CALIBRATION} ({calibration.kind})")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠ Mocap calibration not loaded: {e}")
+    return calibration
+
+def _start_broadcast():
+    """Open the publisher / subscriber (or lockstep coordinator / node) for config.NODE_ROLE."""
+    global publisher, subscriber, coordinator, lockstep_node
+    role = config.NODE_ROLE
+    if role not in ('standalone', 'publisher', 'render'):
+        raise ValueError(f"Unknown NODE_ROLE: {role!r} (expected 'standalone', 'publisher' or 'render')")
+    if config.BROADCAST_MODE not in ('state', 'lockstep'):
+        raise ValueError(f"Unknown BROADCAST_MODE: {config.BROADCAST_MODE!r} (expected 'state' or 'lockstep')")
+    lockstep = config.BROADCAST_MODE == 'lockstep'
+    transport, address, port = config.BROADCAST_TRANSPORT, config.BROADCAST_ADDRESS, config.BROADCAST_PORT
+
+    if role == 'publisher' and lockstep:
+        coordinator = create_coordinator(system, transport, address, port, config.LOCKSTEP_HASH_INTERVAL)
+    elif role == 'publisher':
+        publisher = create_publisher(transport, address, port, config.BROADCAST_KEYFRAME_INTERVAL)
+    elif role == 'render' and lockstep:
+        lockstep_node = create_node(system, transport, address, port)
+    elif role == 'render':
+        subscriber = create_subscriber(transport, address, port)
+
+def _receive_frame(ingest):
+    """Render data of the newest received (or lockstep-simulated) frame, blank until the first arrives."""
+    node = lockstep_node if lockstep_node is not None else subscriber
+    node.poll()
+    render_data = node.latest if node.latest is not None else empty_render_data()
+    # Fresh dict per frame: the renderer adds its own timestamps
+    return dict(render_data, timestamps={'ingest': ingest})
+
+def _get_mocap_channels():
+    """Get the persistent mocap channel map (discovers pNx/pNy channels as they appear)."""
+    global mocap_channels
+    if mocap_channels is None:
+        mocap_channels = MocapChannels(first_id=1, rescan_frames=config.MOCAP_RESCAN_FRAMES)
+    return mocap_channels
+
+def _update_system(visitors, dt, ingest):
+    """Step the system (fixed-step or once per frame) and stamp the ingest time."""
+    if coordinator is not None:
+        # Step with exactly the values the lockstep nodes will receive
+        visitors = wire_visitors(visitors)
+    if stepper is not None:
+        render_data = stepper.advance(visitors, dt)
+    else:
+        render_data = system.update(visitors, dt)
+        _record_step(visitors)
+    render_data['timestamps']['ingest'] = ingest
+
+    if publisher is not None:
+        publisher.publish(render_data, system.clock.now)
+    if coordinator is not None:
+        coordinator.flush()
+
+    if config.SNAPSHOT_INTERVAL and time.monotonic() - last_snapshot >= config.SNAPSHOT_INTERVAL:
+        save_state()
     return render_data
 
+def _record_step(visitors):
+    """Log the real visitor motion with the step's clock time and dt (for exact replay and lockstep)."""
+    if recorder is not None:
+        recorder.record(system.clock.now, system.clock.dt, visitors)
+    if coordinator is not None:
+        coordinator.record_step(visitors)
+
+def _snapshot_path():
+    return os.path.join(biotelia_path, config.SNAPSHOT_PATH)
+
+def save_state(path=None):
+    """
+    Snapshot the system state for a warm restart.
+
+    Args:
+        path: Snapshot file (default: SNAPSHOT_PATH)
+
+    Returns:
+        Dict with path, bytes and ms, or None before initialization / on error
+    """
+    global last_snapshot
+    if not initialized or subscriber is not None or lockstep_node is not None:
+        # A render node's state belongs to the simulation node - don't overwrite the snapshot with it
+        return None
+    last_snapshot = time.monotonic()
+    try:
+        return core.snapshot.save_snapshot(system, path or _snapshot_path())
+    except OSError as e:
+        print(f"⚠ Snapshot failed: {e}")
+        return None
+
+def shutdown():
+    """Save a final snapshot and close the recorder and broadcast (call from an Execute DAT's onExit)."""
+    global publisher, subscriber, coordinator, lockstep_node
+    result = save_state()
+    stop_recording()
+    for node in (publisher, subscriber, coordinator, lockstep_node):
+        if node is not None:
+            node.close()
+    publisher = subscriber = coordinator = lockstep_node = None
+    if result is not None:
+        print(f"✓ State saved: {result['path']} ({result['bytes']} bytes)")
+    return result
+
+def start_recording(path=None):
+    """
+    Start recording visitor positions to a mocap session file.
+
+    Args:
+        path: Output file (default: MOCAP_RECORD_DIR/session_<date>_<time>.bmoc)
+
+    Returns:
+        Path of the session file
+    """
+    global recorder
+    from ingest.recorder import SessionRecorder
+
+    stop_recording()
+    if path is None:
+        folder = os.path.join(biotelia_path, config.MOCAP_RECORD_DIR)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, time.strftime('session_%Y%m%d_%H%M%S.bmoc'))
+
+    recorder = SessionRecorder(
+        path,
+        num_slots=config.MAX_VISITORS,
+        compress=config.MOCAP_RECORD_COMPRESS,
+        fps=config.TARGET_FPS,
+        metadata={
+            # Everything ingest.replay needs to rebuild this system
+            'canvas_width': system.canvas_width,
+            'canvas_height': system.canvas_height,
+            'structures': [dict(st, color=[int(c) for c in st['color']]) for st in config.STRUCTURES],
+            'agents': [agent.type for agent in system.agents],
+            'seed': system.seed,
+            'mycelium_seed': config.MYCELIUM_SEED,
+            'start_frame': system.frame,  # 0 = recorded from initialization (replay is exact)
+        }
+    )
+    print(f"✓ Recording mocap session: {path}")
+    return path
+
+def stop_recording():
+    """Stop recording (flushes the last chunk). Returns the final recorder stats or None."""
+    global recorder
+    if recorder is None:
+        return None
+    recorder.close()
+    stats = recorder.get_stats()
+    recorder = None
+    print(f"✓ Mocap session saved: {stats['path']} ({stats['frames_recorded']} frames)")
+    return stats
+
+def get_recording_stats():
+    """Get the active recorder's counters (or None when not recording)."""
+    if recorder is None:
+        return None
+    return recorder.get_stats()
+
+def get_broadcast_stats():
+    """Get the publisher's, subscriber's or lockstep counters (or None when standalone)."""
+    for node in (publisher, subscriber, coordinator, lockstep_node):
+        if node is not None:
+            return node.get_stats()
+    return None
+
+def get_stepper_stats():
+    """Get the fixed-timestep counters (or None when stepping once per frame)."""
+    if stepper is None:
+        return None
+    return stepper.get_stats()
+
+def get_reload_stats():
+    """Get the hot-reload counters (or None when HOT_RELOAD is off)."""
+    if reloader is None:
+        return None
+    return reloader.get_stats()
+
+def get_profile(worst=5):
+    """Get the system's per-subsystem frame profile (or None before initialization)."""
+    if not initialized:
+        return None
+    return system.get_profile(worst)
+
 def get_render_info():
     """Get information about what needs to be rendered."""
     if not initialized:
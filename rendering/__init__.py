@@ -0,0 +1,26 @@
+"""
+Rendering helpers for the production NumPy renderer (improved_rendering.py)
+"""
+
+from .output import OutputEncoder, OUTPUT_FORMATS
+from .drawlist import DrawList, cull_splats, offset_splats, rasterize_splats
+from .layers import RenderLayer, LayerStack
+from .context import RendererContext
+from .warp import WarpStage, RemapLUT
+from .tiles import TileLayout, TileRenderer
+
+__all__ = [
+    'OutputEncoder',
+    'OUTPUT_FORMATS',
+    'RenderLayer',
+    'LayerStack',
+    'RendererContext',
+    'WarpStage',
+    'RemapLUT',
+    'TileLayout',
+    'TileRenderer',
+    'DrawList',
+    'cull_splats',
+    'offset_splats',
+    'rasterize_splats',
+]
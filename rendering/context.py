@@ -0,0 +1,77 @@
+"""
+RendererContext - Per-cook lookups of improved_rendering.onCook, resolved once
+"""
+
+from .output import OUTPUT_FORMATS
+
+def _setting(settings, name, default):
+    """Evaluate a settings_control parameter, or the config fallback if it doesn't exist."""
+    if settings and hasattr(settings.par, name):
+        return getattr(settings.par, name).eval()
+    return default
+
+class RendererContext:
+    """
+    Everything onCook used to look up on every cook: operator handles,
+    the resolution and output settings from settings_control (with config
+    fallbacks), and module references.
+
+    Created on the first cook and kept until invalidate_context() is called
+    (a Parameter Execute DAT on settings_control does this on every value
+    change) or one of the operator handles is deleted.
+    """
+
+    def __init__(self, find_op, project_folder, config):
+        """
+        Resolve the context.
+
+        Args:
+            find_op: Operator lookup (TouchDesigner's op())
+            project_folder: Folder holding config.py, core/ and rendering/
+            config: Config module
+        """
+        from core.latency import now_ns
+        self.config = config
+        self.now_ns = now_ns
+        self.project_folder = project_folder
+
+        # Operator handles
+        self.settings = find_op('/project1/settings_control')
+        self.pollination_dat = find_op('/project1/pollination_system')
+        self.input_chop = find_op('/project1/input_switch')
+
+        settings = self.settings
+
+        # Resolution ("test" or "production")
+        if settings and hasattr(settings.par, 'Resmode'):
+            use_production = (settings.par.Resmode.eval() == "production")
+            self.width = config.PRODUCTION_WIDTH if use_production else config.TEST_WIDTH
+            self.height = config.PRODUCTION_HEIGHT if use_production else config.TEST_HEIGHT
+        else:
+            self.width = config.DEFAULT_WIDTH
+            self.height = config.DEFAULT_HEIGHT
+
+        # Output: uint8 (projector signal), float16 or float32
+        self.output_format = _setting(settings, 'Outputformat', config.OUTPUT_FORMAT)
+        if self.output_format not in OUTPUT_FORMATS:
+            # Checked once here rather than failing every cook in OutputEncoder.set_format
+            print(f"⚠ Unknown Outputformat '{self.output_format}', using '{config.OUTPUT_FORMAT}' "
+                  f"(expected one of {', '.join(OUTPUT_FORMATS)})")
+            self.output_format = config.OUTPUT_FORMAT
+        self.dither = bool(_setting(settings, 'Dither', config.OUTPUT_DITHER))
+
+        # Photodiode test marker
+        self.flash_mode = _setting(settings, 'Latencyflash', config.LATENCY_FLASH)
+
+        # Keystone / lens correction stage
+        self.warp = bool(_setting(settings, 'Warp', config.WARP_ENABLED))
+
+        # Multi-projector output (width/height above are one projector's)
+        self.tiled = config.TILE_COLUMNS * config.TILE_ROWS > 1
+
+    def is_valid(self):
+        """Whether the operator handles still exist (TouchDesigner ops report .valid)."""
+        for handle in (self.settings, self.pollination_dat, self.input_chop):
+            if handle is not None and not getattr(handle, 'valid', True):
+                return False
+        return True
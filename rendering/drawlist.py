@@ -0,0 +1,198 @@
+"""
+DrawList - Batched splat list with culling before rasterization
+"""
+
+import numpy as np
+
+# Splat kinds (each maps to one draw_circle* primitive)
+ADDITIVE = 0  # draw_circle_additive(canvas, x, y, radius, color, alpha)
+BLEND = 1  # draw_circle(canvas, x, y, radius, color, alpha)
+RING_SOFT = 2  # draw_circle_ring_soft(canvas, x, y, radius, inner_radius, color, alpha)
+
+# Column order of the finalized (N, 9) splat array
+COLUMNS = ('kind', 'x', 'y', 'radius', 'inner_radius', 'r', 'g', 'b', 'alpha')
+
+
+class DrawList:
+    """
+    Columnar list of splats emitted by a render layer.
+
+    Layers append splats in draw order (scalar or vectorized); the list is
+    then culled and rasterized through the draw_circle* primitives, which
+    see exactly the arguments the layer would have passed directly.
+    """
+
+    def __init__(self):
+        """Initialize an empty draw list."""
+        self._rows = []  # Pending scalar splats (tuples in COLUMNS order)
+        self._chunks = []  # Finalized (n, 9) float64 arrays, in draw order
+        self._array = None  # Cached concatenation of _chunks
+
+    def __len__(self):
+        return sum(len(c) for c in self._chunks) + len(self._rows)
+
+    def clear(self):
+        """Remove all splats (keeps the object for reuse)."""
+        self._rows = []
+        self._chunks = []
+        self._array = None
+
+    def _add(self, kind, x, y, radius, inner_radius, color, alpha):
+        self._rows.append((kind, x, y, radius, inner_radius, color[0], color[1], color[2], alpha))
+        self._array = None
+
+    def circle_additive(self, x, y, radius, color, alpha):
+        """Queue an additive circle (see draw_circle_additive)."""
+        self._add(ADDITIVE, x, y, radius, 0, color, alpha)
+
+    def circle(self, x, y, radius, color, alpha):
+        """Queue an alpha-blended circle (see draw_circle)."""
+        self._add(BLEND, x, y, radius, 0, color, alpha)
+
+    def ring_soft(self, x, y, outer_radius, inner_radius, color, alpha):
+        """Queue a soft additive ring (see draw_circle_ring_soft)."""
+        self._add(RING_SOFT, x, y, outer_radius, inner_radius, color, alpha)
+
+    def circles_additive(self, xs, ys, radii, color, alphas):
+        """
+        Queue many additive circles at once.
+
+        Args:
+            xs, ys, radii, alphas: Arrays (or scalars), flattened and broadcast to one length
+            color: RGB color (0-255) shared by all circles, or (N, 3) array
+        """
+        xs, ys, radii, alphas = np.broadcast_arrays(
+            np.ravel(xs), np.ravel(ys), np.ravel(radii), np.ravel(alphas))
+        chunk = np.empty((len(xs), len(COLUMNS)), dtype=np.float64)
+        chunk[:, 0] = ADDITIVE
+        chunk[:, 1] = xs
+        chunk[:, 2] = ys
+        chunk[:, 3] = radii
+        chunk[:, 4] = 0.0
+        chunk[:, 5:8] = np.asarray(color, dtype=np.float64).reshape(-1, 3)
+        chunk[:, 8] = alphas
+        self._flush_rows()
+        self._chunks.append(chunk)
+        self._array = None
+
+    def _flush_rows(self):
+        if self._rows:
+            self._chunks.append(np.array(self._rows, dtype=np.float64))
+            self._rows = []
+
+    def as_array(self):
+        """
+        Get all splats as one (N, 9) float64 array in draw order.
+
+        Returns:
+            Array with columns as in COLUMNS
+        """
+        if self._array is None:
+            self._flush_rows()
+            if not self._chunks:
+                self._array = np.empty((0, len(COLUMNS)), dtype=np.float64)
+            elif len(self._chunks) == 1:
+                self._array = self._chunks[0]
+            else:
+                self._array = np.concatenate(self._chunks)
+                self._chunks = [self._array]
+        return self._array
+
+
+def cull_splats(splats, width, height, min_contribution=0.0):
+    """
+    Find splats that would touch visible pixels.
+
+    Uses the same integer truncation as the draw_circle* primitives, so a
+    splat is only culled if the primitive would have skipped it anyway
+    (offscreen, zero radius, zero alpha) or if its peak contribution is
+    below `min_contribution`.
+
+    Args:
+        splats: (N, 9) array from DrawList.as_array()
+        width, height: Target size in pixels
+        min_contribution: Minimum alpha * brightest channel (0-1) to keep
+
+    Returns:
+        (keep, stats) - boolean mask of length N and a dict with
+        'total', 'offscreen' and 'invisible' counts
+    """
+    n = len(splats)
+    if n == 0:
+        return np.zeros(0, dtype=bool), {'total': 0, 'offscreen': 0, 'invisible': 0}
+
+    x = np.trunc(splats[:, 1])
+    y = np.trunc(splats[:, 2])
+    radius = np.trunc(splats[:, 3])
+    alpha = splats[:, 8]
+
+    onscreen = ((x + radius >= 0) & (x - radius < width) &
+                (y + radius >= 0) & (y - radius < height))
+
+    peak = alpha * (splats[:, 5:8].max(axis=1) / 255.0)
+    is_blend = splats[:, 0] == BLEND
+    visible = (radius > 0) & (alpha > 0)
+    if min_contribution > 0:
+        # Blended splats replace colour rather than add light: judge by alpha
+        visible &= np.where(is_blend, alpha, peak) >= min_contribution
+
+    keep = onscreen & visible
+    stats = {
+        'total': n,
+        'offscreen': int(n - np.count_nonzero(onscreen)),
+        'invisible': int(np.count_nonzero(onscreen & ~visible)),
+    }
+    return keep, stats
+
+
+def offset_splats(splats, x, y):
+    """
+    Move splats into a viewport whose top-left is (x, y) on the full canvas.
+
+    Positions are truncated first, as the draw_circle* primitives do, so a
+    viewport renders exactly the same pixels as that region of the full canvas.
+
+    Args:
+        splats: (N, 9) array from DrawList.as_array()
+        x, y: Integer viewport origin in canvas pixels
+
+    Returns:
+        New (N, 9) array in viewport coordinates
+    """
+    moved = splats.copy()
+    moved[:, 1] = np.trunc(splats[:, 1]) - x
+    moved[:, 2] = np.trunc(splats[:, 2]) - y
+    return moved
+
+
+def rasterize_splats(canvas, splats, primitives, keep=None):
+    """
+    Draw splats through the draw_circle* primitives in order.
+
+    Args:
+        canvas: (H, W, 3) float32 target
+        splats: (N, 9) array from DrawList.as_array()
+        primitives: Dict kind -> primitive function
+        keep: Optional boolean mask from cull_splats()
+
+    Returns:
+        Number of splats drawn
+    """
+    if keep is not None:
+        splats = splats[keep]
+    if len(splats) == 0:
+        return 0
+
+    draw_additive = primitives[ADDITIVE]
+    draw_blend = primitives[BLEND]
+    draw_ring = primitives[RING_SOFT]
+
+    for kind, x, y, radius, inner_radius, r, g, b, alpha in splats.tolist():
+        color = (r, g, b)
+        if kind == ADDITIVE:
+            draw_additive(canvas, x, y, radius, color, alpha)
+        elif kind == BLEND:
+            draw_blend(canvas, x, y, radius, color, alpha)
+        else:
+            draw_ring(canvas, x, y, radius, inner_radius, color, alpha)
+    return len(splats)
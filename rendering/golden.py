@@ -0,0 +1,201 @@
+"""
+Golden-image harness - Compare candidate fast paths against the reference draw_circle* renderer
+"""
+
+import numpy as np
+
+# Default tolerances (errors in 0-1 units)
+DEFAULT_TOLERANCES = {
+    'max_abs': 4.0 / 255.0,  # Largest single-channel error
+    'mean_abs': 0.25 / 255.0,  # Mean absolute error over all channels
+    'bad_fraction': 0.001,  # Fraction of pixels with any channel off by > bad_threshold
+    'bad_threshold': 2.0 / 255.0,
+    'min_psnr': 45.0,  # dB
+    'min_ssim': 0.995,  # Luminance SSIM
+}
+
+
+def render_reference(render_data, flow_time, width, height):
+    """
+    Render a scene through the reference path.
+
+    Every layer redraws (no cached buffers) and every splat goes through
+    the draw_circle* primitives (no culling), in float32.
+
+    Returns:
+        (H, W, 3) float32 RGB canvas
+    """
+    import config
+    import improved_rendering
+    stack = improved_rendering.build_layer_stack(config, rates={})
+    stack.cull = False
+    canvas = np.empty((height, width, 3), dtype=np.float32)
+    improved_rendering.fill_background(canvas)
+    stack.render(canvas, render_data, flow_time)
+    return canvas
+
+
+def to_float_rgb(image):
+    """Convert a renderer canvas/output (RGB or RGBA, uint8 or float) to float32 RGB in 0-1."""
+    image = np.asarray(image)
+    rgb = image[:, :, :3]
+    if rgb.dtype == np.uint8:
+        return rgb.astype(np.float32) / 255.0
+    return rgb.astype(np.float32)
+
+
+def _box_mean(a, window):
+    """Mean over window x window boxes ('valid' region) via integral images."""
+    s = np.cumsum(np.cumsum(a, axis=0, dtype=np.float64), axis=1)
+    s = np.pad(s, ((1, 0), (1, 0)))
+    total = s[window:, window:] - s[:-window, window:] - s[window:, :-window] + s[:-window, :-window]
+    return total / float(window * window)
+
+
+def ssim(a, b, window=8):
+    """
+    Structural similarity of two RGB images on luminance (box window).
+
+    Args:
+        a, b: (H, W, 3) float arrays in 0-1
+        window: Window size in pixels
+
+    Returns:
+        Mean SSIM (1.0 = identical)
+    """
+    weights = np.array([0.2126, 0.7152, 0.0722])
+    la = a @ weights
+    lb = b @ weights
+    if min(la.shape) < window:
+        window = max(1, min(la.shape))
+
+    c1 = (0.01) ** 2
+    c2 = (0.03) ** 2
+    mu_a = _box_mean(la, window)
+    mu_b = _box_mean(lb, window)
+    var_a = _box_mean(la * la, window) - mu_a * mu_a
+    var_b = _box_mean(lb * lb, window) - mu_b * mu_b
+    cov = _box_mean(la * lb, window) - mu_a * mu_b
+
+    ssim_map = (((2 * mu_a * mu_b + c1) * (2 * cov + c2)) /
+                ((mu_a * mu_a + mu_b * mu_b + c1) * (var_a + var_b + c2)))
+    return float(ssim_map.mean())
+
+
+def compare_images(reference, candidate, bad_threshold=DEFAULT_TOLERANCES['bad_threshold']):
+    """
+    Per-pixel and perceptual error metrics between two images.
+
+    Args:
+        reference, candidate: Renderer canvases/outputs (any supported format)
+        bad_threshold: Per-channel error above which a pixel counts as bad
+
+    Returns:
+        (metrics dict, (H, W) per-pixel max-channel error map)
+    """
+    ref = to_float_rgb(reference)
+    cand = to_float_rgb(candidate)
+    if ref.shape != cand.shape:
+        raise ValueError(f"Image shapes differ: reference {ref.shape}, candidate {cand.shape}")
+
+    diff = np.abs(ref - cand)
+    error_map = diff.max(axis=2)
+    mse = float(np.mean(diff.astype(np.float64) ** 2))
+    metrics = {
+        'max_abs': float(diff.max()),
+        'mean_abs': float(diff.mean()),
+        'rmse': mse ** 0.5,
+        'psnr': float('inf') if mse == 0 else float(10.0 * np.log10(1.0 / mse)),
+        'bad_fraction': float(np.count_nonzero(error_map > bad_threshold) / error_map.size),
+        'ssim': ssim(ref, cand),
+    }
+    return metrics, error_map
+
+
+def check_tolerances(metrics, tolerances=None):
+    """
+    Check metrics against tolerances.
+
+    Returns:
+        List of failure messages (empty = pass)
+    """
+    tol = dict(DEFAULT_TOLERANCES)
+    tol.update(tolerances or {})
+    failures = []
+    if metrics['max_abs'] > tol['max_abs']:
+        failures.append(f"max_abs {metrics['max_abs'] * 255:.2f}/255 > {tol['max_abs'] * 255:.2f}/255")
+    if metrics['mean_abs'] > tol['mean_abs']:
+        failures.append(f"mean_abs {metrics['mean_abs'] * 255:.3f}/255 > {tol['mean_abs'] * 255:.3f}/255")
+    if metrics['bad_fraction'] > tol['bad_fraction']:
+        failures.append(f"bad_fraction {metrics['bad_fraction']:.5f} > {tol['bad_fraction']:.5f}")
+    if metrics['psnr'] < tol['min_psnr']:
+        failures.append(f"psnr {metrics['psnr']:.1f} dB < {tol['min_psnr']:.1f} dB")
+    if metrics['ssim'] < tol['min_ssim']:
+        failures.append(f"ssim {metrics['ssim']:.5f} < {tol['min_ssim']:.5f}")
+    return failures
+
+
+def diff_heatmap(error_map, gain=32.0):
+    """
+    Colour a per-pixel error map (black -> red -> yellow -> white).
+
+    Args:
+        error_map: (H, W) errors in 0-1
+        gain: Error multiplier (32 = an error of 8/255 saturates)
+
+    Returns:
+        (H, W, 4) uint8 RGBA image
+    """
+    e = np.clip(error_map * gain, 0.0, 1.0) * 3.0
+    heat = np.empty(error_map.shape + (4,), dtype=np.uint8)
+    heat[:, :, 0] = (np.clip(e, 0, 1) * 255).astype(np.uint8)
+    heat[:, :, 1] = (np.clip(e - 1, 0, 1) * 255).astype(np.uint8)
+    heat[:, :, 2] = (np.clip(e - 2, 0, 1) * 255).astype(np.uint8)
+    heat[:, :, 3] = 255
+    return heat
+
+
+# === CANDIDATES ===
+# Each candidate is a callable(render_data, flow_time, width, height) -> image
+
+def candidate_culled(render_data, flow_time, width, height):
+    """Production layer stack with culling (every layer redrawn)."""
+    import config
+    import improved_rendering
+    stack = improved_rendering.build_layer_stack(config, rates={})
+    canvas = np.empty((height, width, 3), dtype=np.float32)
+    improved_rendering.fill_background(canvas)
+    stack.render(canvas, render_data, flow_time)
+    return canvas
+
+
+def candidate_uint8(render_data, flow_time, width, height):
+    """Culled production stack encoded to dithered uint8 output."""
+    from .output import OutputEncoder
+    return OutputEncoder('uint8', dither=True).encode(candidate_culled(render_data, flow_time, width, height))
+
+
+def candidate_float16(render_data, flow_time, width, height):
+    """Culled production stack encoded to float16 output."""
+    from .output import OutputEncoder
+    return OutputEncoder('float16').encode(candidate_culled(render_data, flow_time, width, height))
+
+
+CANDIDATES = {
+    'culled': candidate_culled,
+    'uint8': candidate_uint8,
+    'float16': candidate_float16,
+}
+
+
+def resolve_candidate(name):
+    """
+    Get a candidate by registry name or 'module:function' path.
+    """
+    if name in CANDIDATES:
+        return CANDIDATES[name]
+    if ':' in name:
+        import importlib
+        module_name, func_name = name.split(':', 1)
+        return getattr(importlib.import_module(module_name), func_name)
+    raise KeyError(f"Unknown candidate '{name}', expected one of {sorted(CANDIDATES)} or module:function")
@@ -0,0 +1,260 @@
+"""
+Headless rendering - Drive PollinationSystem + improved_rendering.onCook outside TouchDesigner
+"""
+
+import math
+import os
+import struct
+import time
+import zlib
+import numpy as np
+
+
+class StandInScriptOp:
+    """Stands in for the Script TOP: keeps the last array passed to copyNumpyArray."""
+
+    def __init__(self):
+        self.frame = None
+        self.copy_time = None  # perf_counter() when copyNumpyArray was called
+
+    def copyNumpyArray(self, array):
+        self.frame = array
+        self.copy_time = time.perf_counter()
+
+
+class StandInPar:
+    """A TouchDesigner parameter stand-in with eval()."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def eval(self):
+        return self.value
+
+
+class StandInSettings:
+    """
+    Stands in for /project1/settings_control.
+
+    Only parameters given a value exist (hasattr() is how the renderer and
+    system detect UI settings, falling back to config otherwise).
+    """
+
+    def __init__(self, **params):
+        self.par = type('Par', (), {})()
+        for name, value in params.items():
+            if value is not None:
+                setattr(self.par, name, StandInPar(value))
+
+
+class ScriptedInput:
+    """
+    Deterministic visitor motion: each visitor walks a Lissajous loop across
+    the floor, passing through the trees so colours, trails and dances occur.
+    """
+
+    def __init__(self, canvas_width, canvas_height, num_visitors=3, speed=0.05):
+        """
+        Initialize scripted input.
+
+        Args:
+            canvas_width, canvas_height: Canvas dimensions
+            num_visitors: Number of visitors
+            speed: Loop frequency scale (loops per second ~ speed)
+        """
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.num_visitors = num_visitors
+        self.speed = speed
+
+    def positions(self, frame, sim_time):
+        """Get visitor positions for a frame (list of {id, x, y})."""
+        visitors = []
+        for i in range(self.num_visitors):
+            phase = i * 2.399  # Golden angle spreads the visitors out
+            fx = self.speed * (1.0 + 0.13 * i)
+            fy = self.speed * (0.7 + 0.11 * i)
+            visitors.append({
+                'id': i,
+                'x': self.canvas_width * (0.5 + 0.48 * math.sin(sim_time * fx * 2 * math.pi + phase)),
+                'y': self.canvas_height * (0.5 + 0.48 * math.sin(sim_time * fy * 2 * math.pi + phase * 1.7)),
+            })
+        return visitors
+
+
+class RecordedInput:
+    """
+    Visitor positions recorded per frame.
+
+    JSON format: {"frames": [[[id, x, y], ...], ...]} (one list per frame).
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    @classmethod
+    def load(cls, path):
+        """Load recorded frames from a JSON file or a mocap session (.bmoc)."""
+        if path.endswith('.bmoc'):
+            from ingest.recorder import read_session, session_frames
+            _, columns = read_session(path)
+            return cls(session_frames(columns))
+        import json
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data['frames'])
+
+    def __len__(self):
+        return len(self.frames)
+
+    def positions(self, frame, sim_time):
+        """Get visitor positions for a frame (last frame repeats when exhausted)."""
+        if not self.frames:
+            return []
+        entries = self.frames[min(frame, len(self.frames) - 1)]
+        return [{'id': int(pid), 'x': float(x), 'y': float(y)} for pid, x, y in entries]
+
+
+class HeadlessPollinationModule:
+    """
+    Stands in for op('/project1/pollination_system').module: update_frame()
+    feeds positions from an input source into a PollinationSystem.
+    """
+
+    def __init__(self, system, input_source):
+        self.system = system
+        self.input_source = input_source
+        self.frame = 0
+        self.last_update_ms = 0.0
+        self.error = None
+
+    def update_frame(self, chop_data, dt=None):
+        start = time.perf_counter()
+        ingest = time.perf_counter_ns()
+        try:
+            visitors = self.input_source.positions(self.frame, self.system.time)
+            render_data = self.system.update(visitors, dt)
+            render_data['timestamps']['ingest'] = ingest
+        except Exception as e:
+            # onCook swallows update errors - keep it for the driver to raise
+            self.error = e
+            raise
+        self.frame += 1
+        self.last_update_ms = (time.perf_counter() - start) * 1000.0
+        return render_data
+
+
+class _StandInDat:
+    def __init__(self, module):
+        self.module = module
+
+
+class _StandInProject:
+    def __init__(self, folder):
+        self.folder = folder
+
+
+class HeadlessRenderer:
+    """
+    Runs the production renderer (improved_rendering.onCook) without TouchDesigner.
+
+    Installs stand-ins for the `op` and `project` globals the callback DAT
+    normally gets from TouchDesigner, and switches the system's clock to
+    fixed steps of 1/fps so frames are exact and render faster than real time.
+    """
+
+    def __init__(self, system, input_source, settings=None, fps=60.0, start_time=0.0, project_folder=None):
+        """
+        Initialize headless renderer.
+
+        Args:
+            system: PollinationSystem to drive
+            input_source: Object with positions(frame, sim_time) -> list of {id, x, y}
+            settings: StandInSettings (None = config fallbacks)
+            fps: Frame rate of the animation clock
+            start_time: Clock time of frame 0 (seconds)
+            project_folder: Folder containing config.py and core/ (default: repo root)
+        """
+        import improved_rendering
+        self.renderer = improved_rendering
+        self.module = HeadlessPollinationModule(system, input_source)
+        self.script_op = StandInScriptOp()
+        self.fps = fps
+        self.start_time = start_time
+        self.frame = 0
+
+        if project_folder is None:
+            project_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        ops = {
+            '/project1/pollination_system': _StandInDat(self.module),
+            '/project1/settings_control': settings,
+            '/project1/input_switch': None,
+        }
+        self.renderer.op = lambda path: ops.get(path)
+        self.renderer.project = _StandInProject(project_folder)
+        self.renderer.invalidate_context()
+
+        # First tick lands on start_time
+        system.clock.configure('fixed', dt=1.0 / fps, start_time=start_time - 1.0 / fps)
+
+    def render_frame(self):
+        """
+        Cook one frame.
+
+        Returns:
+            (frame array, timing dict with update_ms, render_ms, cook_ms and
+            the per-layer breakdown under 'layers')
+        """
+        start = time.perf_counter()
+        self.renderer.onCook(self.script_op)
+        end = time.perf_counter()
+
+        if self.module.error is not None:
+            error, self.module.error = self.module.error, None
+            raise RuntimeError(f"update_frame failed on frame {self.frame}") from error
+
+        cook_ms = (end - start) * 1000.0
+        timing = {
+            'frame': self.frame,
+            'update_ms': self.module.last_update_ms,
+            'render_ms': cook_ms - self.module.last_update_ms,
+            'cook_ms': cook_ms,
+            'layers': self.renderer.get_layer_timings() or {},
+        }
+        self.frame += 1
+        return self.script_op.frame, timing
+
+
+def to_uint8_rgba(frame):
+    """Convert an output frame (uint8 / float16 / float32 RGBA) to uint8 RGBA."""
+    if frame.dtype == np.uint8:
+        return frame
+    return (np.clip(frame.astype(np.float32), 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8)
+
+
+def write_png(path, frame, compression=6):
+    """
+    Write an RGBA frame as a PNG (standard library only).
+
+    Args:
+        path: Output file path
+        frame: (H, W, 4) output array (any renderer output format)
+        compression: zlib level 0-9
+    """
+    rgba = np.ascontiguousarray(to_uint8_rgba(frame))
+    height, width = rgba.shape[:2]
+
+    # Each scanline is prefixed with filter type 0 (None)
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(tag, data):
+        return (struct.pack('>I', len(data)) + tag + data +
+                struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)))
+        f.write(chunk(b'IDAT', zlib.compress(raw.tobytes(), compression)))
+        f.write(chunk(b'IEND', b''))
@@ -0,0 +1,272 @@
+"""
+LayerStack - Named render layers with per-layer update rates and cached buffers
+"""
+
+import math
+import time
+import numpy as np
+from .drawlist import DrawList, cull_splats, offset_splats, rasterize_splats
+
+
+class RenderLayer:
+    """
+    A named renderer layer.
+
+    Layers emit splats into a DrawList, which is culled and rasterized by the
+    LayerStack. Layers with an update rate redraw into their own cached RGB
+    buffer only when due; the buffer is composited (added) onto the canvas
+    every frame. Layers without a rate draw straight onto the canvas every frame.
+    """
+
+    def __init__(self, name, build, rate_hz=None, additive=True):
+        """
+        Initialize render layer.
+
+        Args:
+            name: Layer name (used for rates, timing and cull stats)
+            build: Callable build(draw_list, render_data, flow_time, width, height)
+            rate_hz: Update rate in Hz, or None to redraw every frame
+            additive: True if the layer only adds light (required for caching)
+        """
+        if rate_hz is not None and not additive:
+            raise ValueError(f"Layer '{name}' blends non-additively and cannot be cached")
+
+        self.name = name
+        self.build = build
+        self.rate_hz = rate_hz
+        self.additive = additive
+        self.draw_list = DrawList()
+
+        # Cache state
+        self.buffer = None  # (H, W, 3) float32, only for rate-limited layers
+        self.phase = 0.0  # Stagger offset as a fraction of one period
+        self.last_slot = None  # Update slot index of the last redraw
+
+        # Timing (milliseconds) and cull stats of the last redraw
+        self.last_ms = 0.0
+        self.avg_ms = 0.0
+        self.refreshed = False
+        self.cull_stats = {'total': 0, 'offscreen': 0, 'invisible': 0}
+
+    @property
+    def cached(self):
+        """Check if this layer is rate-limited with a cached buffer."""
+        return self.rate_hz is not None and self.rate_hz > 0
+
+    def is_due(self, now):
+        """Check if the cached buffer needs a redraw at time `now`."""
+        if self.buffer is None or self.last_slot is None:
+            return True
+        return self._slot(now) != self.last_slot
+
+    def _slot(self, now):
+        """Index of the update period containing `now` (shifted by phase)."""
+        return math.floor(now * self.rate_hz + self.phase)
+
+
+class LayerStack:
+    """
+    Ordered set of render layers composited onto the canvas every frame.
+    """
+
+    def __init__(self, layers, primitives, stagger=True, cull=True, min_contribution=0.0,
+                 timing_smoothing=0.1, profiler=None, viewport=None):
+        """
+        Initialize layer stack.
+
+        Args:
+            layers: List of RenderLayer, bottom to top
+            primitives: Dict splat kind -> draw_circle* function (see rendering.drawlist)
+            stagger: Offset cached layers' update phases so they don't all
+                     redraw on the same frame
+            cull: Drop offscreen / invisible splats before rasterizing
+            min_contribution: Visibility threshold for culling (0-1)
+            timing_smoothing: Weight of the newest sample in avg_ms
+            profiler: Optional core.FrameProfiler; one span per layer name
+                      (draw + composite) and 'composite' for the final clamp
+            viewport: Optional (x, y, floor_width, floor_height): layers are
+                      built for the whole floor and the canvas shows the
+                      region at (x, y) (one projector tile); splats outside
+                      it are culled
+        """
+        self.layers = list(layers)
+        self.primitives = primitives
+        self.cull = cull
+        self.min_contribution = min_contribution
+        self.timing_smoothing = timing_smoothing
+        self.profiler = profiler
+        self.viewport = viewport
+        self.composite_ms = 0.0
+        self.total_ms = 0.0
+
+        cached = [layer for layer in self.layers if layer.cached]
+        for i, layer in enumerate(cached):
+            layer.phase = (i / len(cached)) if stagger else 0.0
+
+    def get_layer(self, name):
+        """Get a layer by name (or None)."""
+        for layer in self.layers:
+            if layer.name == name:
+                return layer
+        return None
+
+    def set_rate(self, name, rate_hz):
+        """Change a layer's update rate (None = every frame)."""
+        layer = self.get_layer(name)
+        if layer is None:
+            raise KeyError(f"Unknown render layer '{name}'")
+        if rate_hz is not None and not layer.additive:
+            raise ValueError(f"Layer '{name}' blends non-additively and cannot be cached")
+        layer.rate_hz = rate_hz
+        layer.buffer = None if rate_hz is None else layer.buffer
+        layer.last_slot = None
+
+    def invalidate(self):
+        """Force every cached layer to redraw on the next frame."""
+        for layer in self.layers:
+            layer.last_slot = None
+
+    def draw_layer(self, layer, target, render_data, flow_time):
+        """
+        Build, cull and rasterize one layer onto a target buffer.
+
+        Args:
+            layer: RenderLayer to draw
+            target: (H, W, 3) float32 buffer
+            render_data: Dictionary from PollinationSystem.get_render_data()
+            flow_time: Animation time in seconds
+        """
+        height, width = target.shape[:2]
+        draw_list = layer.draw_list
+        draw_list.clear()
+        if self.viewport is None:
+            layer.build(draw_list, render_data, flow_time, width, height)
+            splats = draw_list.as_array()
+        else:
+            x, y, floor_width, floor_height = self.viewport
+            layer.build(draw_list, render_data, flow_time, floor_width, floor_height)
+            splats = offset_splats(draw_list.as_array(), x, y)
+
+        if self.cull:
+            keep, layer.cull_stats = cull_splats(splats, width, height, self.min_contribution)
+        else:
+            keep = None
+            layer.cull_stats = {'total': len(splats), 'offscreen': 0, 'invisible': 0}
+
+        rasterize_splats(target, splats, self.primitives, keep)
+
+    def render(self, canvas, render_data, flow_time):
+        """
+        Draw/composite all layers onto the canvas (background already filled).
+
+        Cached layers hold unclamped-additive contributions; since every
+        cached layer only adds light, summing them and clamping once gives
+        the same result as clamping after each draw.
+
+        Args:
+            canvas: (H, W, 3) float32 RGB canvas
+            render_data: Dictionary from PollinationSystem.get_render_data()
+            flow_time: Animation time in seconds
+        """
+        frame_start = time.perf_counter()
+        profiler = self.profiler
+        composite_s = 0.0
+        unclamped = False
+        height, width = canvas.shape[:2]
+
+        for layer in self.layers:
+            start = time.perf_counter()
+            layer.refreshed = False
+
+            if layer.cached:
+                if layer.buffer is None or layer.buffer.shape[:2] != (height, width):
+                    layer.buffer = np.zeros((height, width, 3), dtype=np.float32)
+                    layer.last_slot = None
+
+                if layer.is_due(flow_time):
+                    layer.buffer.fill(0.0)
+                    self.draw_layer(layer, layer.buffer, render_data, flow_time)
+                    layer.last_slot = layer._slot(flow_time)
+                    layer.refreshed = True
+
+                draw_done = time.perf_counter()
+                np.add(canvas, layer.buffer, out=canvas)
+                unclamped = True
+                composite_s += time.perf_counter() - draw_done
+                self._record(layer, (draw_done - start) * 1000.0)
+            else:
+                if unclamped:
+                    # Non-additive draws must see the clamped canvas
+                    clamp_start = time.perf_counter()
+                    np.minimum(canvas, 1.0, out=canvas)
+                    unclamped = False
+                    composite_s += time.perf_counter() - clamp_start
+                    start = time.perf_counter()
+                self.draw_layer(layer, canvas, render_data, flow_time)
+                layer.refreshed = True
+                self._record(layer, (time.perf_counter() - start) * 1000.0)
+
+            if profiler is not None:
+                profiler.lap(layer.name)
+
+        if unclamped:
+            clamp_start = time.perf_counter()
+            np.minimum(canvas, 1.0, out=canvas)
+            composite_s += time.perf_counter() - clamp_start
+        if profiler is not None:
+            profiler.lap('composite')
+
+        self.composite_ms = composite_s * 1000.0
+        self.total_ms = (time.perf_counter() - frame_start) * 1000.0
+
+    def _record(self, layer, ms):
+        """Update a layer's timing stats."""
+        layer.last_ms = ms
+        if layer.avg_ms == 0.0:
+            layer.avg_ms = ms
+        else:
+            layer.avg_ms += (ms - layer.avg_ms) * self.timing_smoothing
+
+    def get_timings(self):
+        """
+        Get per-layer timing breakdown of the last frame.
+
+        Returns:
+            Dictionary: layer name -> {ms, avg_ms, rate_hz, refreshed},
+            plus 'composite_ms' and 'total_ms'
+        """
+        timings = {
+            layer.name: {
+                'ms': layer.last_ms,
+                'avg_ms': layer.avg_ms,
+                'rate_hz': layer.rate_hz,
+                'refreshed': layer.refreshed,
+            }
+            for layer in self.layers
+        }
+        timings['composite_ms'] = self.composite_ms
+        timings['total_ms'] = self.total_ms
+        return timings
+
+    def get_cull_stats(self):
+        """
+        Get splat counts of each layer's last redraw.
+
+        Returns:
+            Dictionary: layer name -> {total, offscreen, invisible, drawn}
+        """
+        stats = {}
+        for layer in self.layers:
+            s = dict(layer.cull_stats)
+            s['drawn'] = s['total'] - s['offscreen'] - s['invisible']
+            stats[layer.name] = s
+        return stats
+
+    def count_drawn(self):
+        """Number of splats rasterized this frame (refreshed layers only)."""
+        drawn = 0
+        for layer in self.layers:
+            if layer.refreshed:
+                s = layer.cull_stats
+                drawn += s['total'] - s['offscreen'] - s['invisible']
+        return drawn
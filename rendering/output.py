@@ -0,0 +1,126 @@
+"""
+OutputEncoder - Converts the float accumulation canvas into the array handed to copyNumpyArray
+"""
+
+import numpy as np
+
+# Formats accepted by OutputEncoder (settings_control 'Outputformat' menu values)
+OUTPUT_FORMATS = ('uint8', 'float16', 'float32')
+
+# 4x4 Bayer matrix as per-pixel offsets in (-0.5, 0.5) of one 8-bit step
+_BAYER_4X4 = np.array([
+    [0, 8, 2, 10],
+    [12, 4, 14, 6],
+    [3, 11, 1, 9],
+    [15, 7, 13, 5],
+], dtype=np.float32)
+BAYER_OFFSETS = (_BAYER_4X4 + 0.5) / 16.0 - 0.5
+
+
+class OutputEncoder:
+    """
+    Encodes an RGB float canvas (0-1) into an opaque RGBA output array.
+
+    The renderer accumulates into an RGB float32 canvas (the alpha channel is
+    always opaque, so it is not carried through the draw calls). Output and
+    scratch buffers are allocated once per resolution and reused every cook.
+    """
+
+    def __init__(self, output_format='uint8', dither=True):
+        """
+        Initialize output encoder.
+
+        Args:
+            output_format: 'uint8', 'float16' or 'float32'
+            dither: Apply 4x4 ordered dithering before quantizing to uint8
+        """
+        self._output = None  # (H, W, 4) output buffer in output_format
+        self._scratch = None  # (H, W, 3) float32 scratch for quantization
+        self._dither_tile = None  # (H, W, 1) Bayer offsets (+0.5) tiled to canvas size
+
+        self.output_format = 'uint8'
+        self.dither = bool(dither)
+        self.set_format(output_format, dither)
+
+    def set_format(self, output_format, dither=None):
+        """
+        Change output format (buffers are reallocated lazily on next encode).
+
+        Args:
+            output_format: 'uint8', 'float16' or 'float32'
+            dither: Optional new dithering flag
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+
+        if output_format != self.output_format:
+            self._output = None
+        self.output_format = output_format
+        if dither is not None:
+            self.dither = bool(dither)
+
+    def _ensure_buffers(self, height, width):
+        """Allocate output (and uint8 scratch) buffers for this resolution."""
+        dtype = np.dtype(self.output_format)
+        if self._output is None or self._output.shape[:2] != (height, width) or self._output.dtype != dtype:
+            self._output = np.empty((height, width, 4), dtype=dtype)
+            # Alpha is always opaque - write it once
+            self._output[:, :, 3] = 255 if dtype == np.uint8 else 1.0
+
+        if self.output_format == 'uint8':
+            if self._scratch is None or self._scratch.shape[:2] != (height, width):
+                self._scratch = np.empty((height, width, 3), dtype=np.float32)
+                reps = (height // 4 + 1, width // 4 + 1)
+                # Bayer offset + 0.5 rounding, so dithering costs a single add
+                self._dither_tile = np.tile(BAYER_OFFSETS + 0.5, reps)[:height, :width, np.newaxis].copy()
+
+    def encode(self, canvas):
+        """
+        Encode an RGB float canvas.
+
+        Args:
+            canvas: (H, W, 3) float32 array with values in 0-1
+
+        Returns:
+            (H, W, 4) array in the configured output format (reused between calls)
+        """
+        height, width = canvas.shape[:2]
+        self._ensure_buffers(height, width)
+        out = self._output
+
+        if self.output_format == 'uint8':
+            scratch = self._scratch
+            np.multiply(canvas[:, :, :3], 255.0, out=scratch)
+            if self.dither:
+                # Offset in (0, 1) then truncate = ordered dither
+                scratch += self._dither_tile
+            else:
+                # Round to nearest
+                scratch += 0.5
+            np.clip(scratch, 0.0, 255.0, out=scratch)
+            out[:, :, :3] = scratch  # Truncating cast
+        else:
+            out[:, :, :3] = canvas[:, :, :3]
+
+        return out
+
+    def blank(self, height, width, background=None):
+        """
+        Get an opaque output frame (black, or filled with a background color).
+
+        Args:
+            height, width: Output dimensions
+            background: Optional RGB color (0-255)
+
+        Returns:
+            (H, W, 4) array in the configured output format
+        """
+        self._ensure_buffers(height, width)
+        out = self._output
+        if background is None:
+            out[:, :, :3] = 0
+        elif self.output_format == 'uint8':
+            out[:, :, :3] = np.asarray(background, dtype=np.uint8)
+        else:
+            out[:, :, :3] = np.asarray(background, dtype=np.float32) / 255.0
+        return out
@@ -0,0 +1,419 @@
+"""
+Multi-projector tiling - Overlapping floor tiles rendered by worker processes
+
+The floor canvas (the simulation's coordinate space) is split into a grid
+of overlapping tiles, one per projector. Each tile has its own layer stack
+with a viewport on the floor: layers are built once for the whole floor
+but rasterize only the splats touching the tile, so per-projector cost
+follows what that projector shows rather than the floor size. Soft-edge
+blend ramps are applied in the overlaps, then the tile is encoded into a
+shared-memory frame that its projector's Script TOP copies out. Each tile
+has two shared frames: workers render into the back one and it becomes
+the shown frame only once complete, so a late worker never tears a frame.
+"""
+
+import sys
+import time
+import numpy as np
+
+class Tile:
+    """
+    One projector's region of the floor, with its edge-blend ramps.
+    """
+
+    def __init__(self, index, x, y, width, height):
+        """
+        Initialize tile.
+
+        Args:
+            index: Tile (projector) number, row-major
+            x, y: Top-left corner on the floor canvas
+            width, height: Tile (projector) size in pixels
+        """
+        self.index = index
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        # Blend ramps (1-D float32, 0 -> 1 towards the tile interior) per overlapped edge
+        self.ramps = {}
+
+    def apply_blend(self, canvas):
+        """Attenuate the overlap strips of a (H, W, 3) tile canvas in place."""
+        for edge, ramp in self.ramps.items():
+            size = len(ramp)
+            if edge == 'left':
+                canvas[:, :size] *= ramp[np.newaxis, :, np.newaxis]
+            elif edge == 'right':
+                canvas[:, -size:] *= ramp[np.newaxis, ::-1, np.newaxis]
+            elif edge == 'top':
+                canvas[:size] *= ramp[:, np.newaxis, np.newaxis]
+            else:
+                canvas[-size:] *= ramp[::-1, np.newaxis, np.newaxis]
+
+def blend_ramp(size, gamma=2.2):
+    """
+    Soft-edge ramp across an overlap of `size` pixels (0 at the outer edge).
+
+    Smoothstep in linear light, so the two projectors' light sums to one
+    across the overlap, converted to signal values through the projector gamma.
+    """
+    t = (np.arange(size, dtype=np.float64) + 0.5) / size
+    light = t * t * (3.0 - 2.0 * t)
+    return (light ** (1.0 / gamma)).astype(np.float32)
+
+class TileLayout:
+    """
+    Grid of equally sized, overlapping projector tiles covering the floor.
+    """
+
+    def __init__(self, tile_width, tile_height, columns=1, rows=1, overlap=0, gamma=2.2):
+        """
+        Initialize layout.
+
+        Args:
+            tile_width, tile_height: Projector resolution
+            columns, rows: Projector grid
+            overlap: Pixels shared by neighbouring tiles (blend zone)
+            gamma: Projector gamma for the blend ramps
+        """
+        if columns < 1 or rows < 1:
+            raise ValueError("Tile layout needs at least one column and one row")
+        if overlap < 0 or (columns > 1 and overlap >= tile_width) or (rows > 1 and overlap >= tile_height):
+            raise ValueError(f"Tile overlap {overlap} must be between 0 and the tile size")
+
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.columns = columns
+        self.rows = rows
+        self.overlap = overlap
+        self.gamma = gamma
+        self.floor_width, self.floor_height = floor_size(tile_width, tile_height, columns, rows, overlap)
+
+        ramp = blend_ramp(overlap, gamma) if overlap > 0 else None
+        self.tiles = []
+        for row in range(rows):
+            for column in range(columns):
+                tile = Tile(len(self.tiles),
+                            column * (tile_width - overlap), row * (tile_height - overlap),
+                            tile_width, tile_height)
+                if ramp is not None:
+                    if column > 0:
+                        tile.ramps['left'] = ramp
+                    if column < columns - 1:
+                        tile.ramps['right'] = ramp
+                    if row > 0:
+                        tile.ramps['top'] = ramp
+                    if row < rows - 1:
+                        tile.ramps['bottom'] = ramp
+                self.tiles.append(tile)
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def get_spec(self):
+        """Constructor arguments (to rebuild the layout in a worker process)."""
+        return (self.tile_width, self.tile_height, self.columns, self.rows, self.overlap, self.gamma)
+
+def floor_size(tile_width, tile_height, columns=1, rows=1, overlap=0):
+    """Floor canvas size covered by a grid of overlapping tiles."""
+    return (columns * tile_width - (columns - 1) * overlap,
+            rows * tile_height - (rows - 1) * overlap)
+
+class TileJob:
+    """
+    Renders one tile: background, layer stack with the tile's viewport,
+    edge blend, output encoding. Used in-process and inside each worker.
+    """
+
+    def __init__(self, layout, index, config, output_format='uint8', dither=True, output=None):
+        """
+        Initialize tile job.
+
+        Args:
+            layout: TileLayout
+            index: Tile number
+            config: Config module (layer rates, culling)
+            output_format: Output encoder format
+            dither: Ordered dithering for uint8 output
+            output: Optional (H, W, 4) array to encode into (shared memory)
+        """
+        import improved_rendering
+        from rendering.output import OutputEncoder
+        self.renderer = improved_rendering
+        self.tile = layout.tiles[index]
+        tile = self.tile
+        self.layer_stack = improved_rendering.build_layer_stack(
+            config, viewport=(tile.x, tile.y, layout.floor_width, layout.floor_height))
+        self.canvas = np.empty((tile.height, tile.width, 3), dtype=np.float32)
+        self.encoder = OutputEncoder(output_format, dither)
+        self.output = output
+        self.last_ms = 0.0
+
+    def render(self, render_data, flow_time):
+        """
+        Render the tile.
+
+        Returns:
+            (H, W, 4) encoded frame (the shared output if one was given)
+        """
+        start = time.perf_counter()
+        canvas = self.canvas
+        self.renderer.fill_background(canvas)
+        self.layer_stack.render(canvas, render_data, flow_time)
+        self.tile.apply_blend(canvas)
+        frame = self.encoder.encode(canvas)
+        if self.output is not None:
+            self.output[...] = frame
+            frame = self.output
+        self.last_ms = (time.perf_counter() - start) * 1000.0
+        return frame
+
+    def get_stats(self):
+        """Render time and splat counts of the last frame."""
+        stats = self.layer_stack.get_cull_stats()
+        return {
+            'ms': self.last_ms,
+            'drawn': self.layer_stack.count_drawn(),
+            'offscreen': sum(s['offscreen'] for s in stats.values()),
+        }
+
+def _tile_worker(conn, project_folder, layout_spec, index, shm_names, output_format, dither):
+    """Worker process main loop: render the tile for every frame received until None."""
+    from multiprocessing import shared_memory
+    if project_folder not in sys.path:
+        sys.path.insert(0, project_folder)
+    import config
+
+    layout = TileLayout(*layout_spec)
+    tile = layout.tiles[index]
+    memory = [shared_memory.SharedMemory(name=name) for name in shm_names]
+    try:
+        outputs = [np.ndarray((tile.height, tile.width, 4), dtype=np.dtype(output_format), buffer=shm.buf)
+                   for shm in memory]
+        job = TileJob(layout, index, config, output_format, dither)
+        conn.send(('ready', index))
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            sequence, slot, render_data, flow_time = message
+            job.output = outputs[slot]  # The back frame (the projector is showing the other one)
+            try:
+                job.render(render_data, flow_time)
+                conn.send(('done', sequence, job.get_stats()))
+            except Exception as e:
+                conn.send(('error', sequence, repr(e)))
+        job.output = None
+        del outputs
+    finally:
+        for shm in memory:
+            shm.close()
+        conn.close()
+
+class TileRenderer:
+    """
+    Renders every tile of a layout from the same frame state, either in one
+    worker process per tile (frames in shared memory) or in-process.
+
+    submit() hands the frame to all workers, collect() waits for them; the
+    frames returned by collect() stay valid until the next submit(). Workers
+    write into each tile's back frame, which collect() swaps in only when the
+    tile finished in time: a tile that misses the deadline (counted as
+    `late`, not as an error) keeps showing its previous complete frame.
+    """
+
+    def __init__(self, layout, project_folder, config, workers=True, output_format='uint8',
+                 dither=True, python=None, timeout=1.0):
+        """
+        Initialize tile renderer.
+
+        Args:
+            layout: TileLayout
+            project_folder: Folder holding config.py, core/ and rendering/
+            config: Config module
+            workers: One process per tile (False = render tiles in turn in-process)
+            output_format: Output encoder format ('uint8', 'float16', 'float32')
+            dither: Ordered dithering for uint8 output
+            python: Interpreter for the workers (inside TouchDesigner: a
+                    standalone Python with numpy; None = sys.executable)
+            timeout: Seconds to wait for a tile before giving up on the frame
+        """
+        self.layout = layout
+        self.project_folder = project_folder
+        self.config = config
+        self.workers = workers
+        self.output_format = output_format
+        self.dither = dither
+        self.python = python
+        self.timeout = timeout
+
+        self._jobs = []  # In-process TileJobs
+        self._processes = []
+        self._connections = []
+        self._memory = []  # SharedMemory (two per tile)
+        self._buffers = []  # [front/back (H, W, 4) frames] per tile
+        self._front = []  # Index into _buffers of the frame each projector shows
+        self._slots = []  # Buffer each tile is rendering the submitted frame into
+        self.frames = []  # (H, W, 4) output per tile
+        self.tile_stats = [None] * len(layout)
+        self.errors = 0
+        self.late = 0  # Tiles that missed the deadline (their previous frame was shown again)
+        self.last_ms = 0.0
+        self._sequence = 0  # Frame number sent with each submit (replies to older frames are dropped)
+        self._submit_time = 0.0
+        self._pending = False
+        self._started = False
+
+    def start(self):
+        """Start the worker processes (or build the in-process jobs)."""
+        if self._started:
+            return
+        self._started = True
+        layout = self.layout
+        if not self.workers:
+            self._jobs = [TileJob(layout, tile.index, self.config, self.output_format, self.dither)
+                          for tile in layout.tiles]
+            return
+
+        import atexit
+        import multiprocessing
+        from multiprocessing import shared_memory
+        # Release the shared frames even if close() is never called
+        atexit.register(self.close)
+        context = multiprocessing.get_context('spawn')
+        if self.python:
+            context.set_executable(self.python)
+        dtype = np.dtype(self.output_format)
+        for tile in layout.tiles:
+            size = tile.height * tile.width * 4 * dtype.itemsize
+            memory = [shared_memory.SharedMemory(create=True, size=size) for _ in range(2)]
+            buffers = []
+            for shm in memory:
+                frame = np.ndarray((tile.height, tile.width, 4), dtype=dtype, buffer=shm.buf)
+                frame[:, :, :3] = 0
+                frame[:, :, 3] = 255 if dtype == np.uint8 else 1.0
+                buffers.append(frame)
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_tile_worker,
+                args=(child, self.project_folder, layout.get_spec(), tile.index,
+                      [shm.name for shm in memory], self.output_format, self.dither),
+                name=f'tile-{tile.index}',
+                daemon=True
+            )
+            process.start()
+            child.close()
+            self._memory.extend(memory)
+            self._buffers.append(buffers)
+            self._front.append(0)
+            self.frames.append(buffers[0])
+            self._processes.append(process)
+            self._connections.append(parent)
+
+        # Workers import numpy and build their layer stacks before the first frame
+        for conn in self._connections:
+            if not conn.poll(30.0):
+                self.close()
+                raise RuntimeError("Tile worker did not start")
+            conn.recv()
+
+    def submit(self, render_data, flow_time):
+        """Start rendering a frame on every tile."""
+        self.start()
+        self._submit_time = time.perf_counter()
+        if not self.workers:
+            self._pending = (render_data, flow_time)
+            return
+        if self._pending:
+            self.collect()
+        self._sequence += 1
+        # Render into the back frame; a worker still busy with a late frame
+        # writes there too (messages run in order), never into the shown one
+        self._slots = [1 - front for front in self._front]
+        for conn, slot in zip(self._connections, self._slots):
+            conn.send((self._sequence, slot, render_data, flow_time))
+        self._pending = True
+
+    def collect(self):
+        """
+        Wait for the submitted frame.
+
+        Returns:
+            List of (H, W, 4) frames, one per tile
+        """
+        if not self._pending:
+            return self.frames
+        if not self.workers:
+            render_data, flow_time = self._pending
+            self.frames = [job.render(render_data, flow_time) for job in self._jobs]
+            self.tile_stats = [job.get_stats() for job in self._jobs]
+        else:
+            deadline = self._submit_time + self.timeout
+            for index, conn in enumerate(self._connections):
+                while True:
+                    remaining = deadline - time.perf_counter()
+                    if not conn.poll(max(remaining, 0.0)):
+                        # Too slow: the projector keeps its previous frame
+                        self.late += 1
+                        break
+                    status, sequence, payload = conn.recv()
+                    if sequence != self._sequence:
+                        continue  # Late reply to a frame that already timed out
+                    if status == 'done':
+                        # Complete: swap it in (the old front becomes the next back frame)
+                        slot = self._slots[index]
+                        self._front[index] = slot
+                        self.frames[index] = self._buffers[index][slot]
+                        self.tile_stats[index] = payload
+                    else:
+                        self.errors += 1
+                        self.tile_stats[index] = {'error': payload}
+                    break
+        self._pending = False
+        self.last_ms = (time.perf_counter() - self._submit_time) * 1000.0
+        return self.frames
+
+    def render(self, render_data, flow_time):
+        """Render a frame on every tile and wait for it (submit + collect)."""
+        self.submit(render_data, flow_time)
+        return self.collect()
+
+    def get_stats(self):
+        """Per-tile render time and splat counts of the last frame."""
+        return {
+            'tiles': len(self.layout),
+            'floor': (self.layout.floor_width, self.layout.floor_height),
+            'workers': self.workers,
+            'frame_ms': self.last_ms,
+            'errors': self.errors,
+            'late': self.late,
+            'per_tile': list(self.tile_stats),
+        }
+
+    def close(self):
+        """Stop the workers and release the shared frames."""
+        for conn in self._connections:
+            try:
+                conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._connections:
+            conn.close()
+        self.frames = []
+        self._buffers = []
+        self._front = []
+        self._slots = []
+        for shm in self._memory:
+            shm.close()
+            shm.unlink()
+        self._processes = []
+        self._connections = []
+        self._memory = []
+        self._jobs = []
+        self._pending = False
+        self._started = False
@@ -0,0 +1,324 @@
+"""
+Projection warp - Keystone / lens correction as a precomputed per-pixel remap
+
+The calibration (four corner pins or a mesh) is turned once into a lookup
+table: for every output pixel, the flat index of the canvas pixel(s) it
+shows (bilinear: four of them, plus the interpolation fractions). Each cook is then a gather from the
+persistent canvas into a persistent output buffer - no TD operators, no
+extra frame of latency. The table is rebuilt only when the calibration or
+the resolution changes.
+"""
+
+import json
+import os
+import time
+import numpy as np
+
+from ingest.calibration import fit_homography, apply_matrix
+
+WARP_INTERPOLATIONS = ('nearest', 'bilinear')
+
+def corner_pin_map(corners, width, height):
+    """
+    Source map for a corner pin.
+
+    Args:
+        corners: Output positions (normalized 0-1) of the canvas corners,
+                 in order top-left, top-right, bottom-right, bottom-left
+        width, height: Canvas (and output) size in pixels
+
+    Returns:
+        (sx, sy): (H, W) arrays of the canvas pixel each output pixel shows
+    """
+    corners = np.asarray(corners, dtype=np.float64).reshape(-1, 2)
+    if len(corners) != 4:
+        raise ValueError("Corner pin needs 4 corners (top-left, top-right, bottom-right, bottom-left)")
+    dst = corners * [width - 1, height - 1]
+    src = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float64)
+    # Output pixel -> canvas pixel (the direction a gather needs)
+    matrix = fit_homography(dst, src)
+
+    ys, xs = np.mgrid[0:height, 0:width]
+    points = np.stack([xs.ravel(), ys.ravel()], axis=1).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mapped = apply_matrix(matrix, points)
+    return mapped[:, 0].reshape(height, width), mapped[:, 1].reshape(height, width)
+
+def mesh_map(mesh, width, height):
+    """
+    Source map for a warp mesh.
+
+    Args:
+        mesh: (rows, cols, 2) canvas positions (normalized 0-1) shown at
+              evenly spaced output points, edges included (rows, cols >= 2)
+        width, height: Canvas (and output) size in pixels
+
+    Returns:
+        (sx, sy): (H, W) arrays of the canvas pixel each output pixel shows
+    """
+    mesh = np.asarray(mesh, dtype=np.float64)
+    if mesh.ndim != 3 or mesh.shape[2] != 2 or mesh.shape[0] < 2 or mesh.shape[1] < 2:
+        raise ValueError("Warp mesh must be a (rows, cols, 2) grid with at least 2x2 points")
+    rows, cols = mesh.shape[:2]
+
+    # Bilinear upsampling, one axis at a time
+    r = np.linspace(0.0, rows - 1, height)
+    r0 = np.minimum(r.astype(np.int64), rows - 2)
+    fr = (r - r0)[:, np.newaxis, np.newaxis]
+    along_rows = mesh[r0] * (1.0 - fr) + mesh[r0 + 1] * fr  # (H, cols, 2)
+
+    c = np.linspace(0.0, cols - 1, width)
+    c0 = np.minimum(c.astype(np.int64), cols - 2)
+    fc = (c - c0)[np.newaxis, :, np.newaxis]
+    full = along_rows[:, c0] * (1.0 - fc) + along_rows[:, c0 + 1] * fc  # (H, W, 2)
+
+    return full[:, :, 0] * (width - 1), full[:, :, 1] * (height - 1)
+
+def _pixels(array):
+    """Flat view of an (H, W, C) array with one element per pixel (a pixel gathers as one item)."""
+    height, width, channels = array.shape
+    return array.reshape(height * width, channels).view(np.dtype((np.void, channels * array.itemsize))).reshape(-1)
+
+class RemapLUT:
+    """
+    Precomputed gather table: output pixel -> canvas pixel index (and weight).
+
+    'nearest' stores one index per output pixel; 'bilinear' stores four
+    indices and the x/y fractions (about 4x the cost per cook). Output pixels
+    that show nothing of the canvas are listed separately and painted black.
+    """
+
+    def __init__(self, sx, sy, width, height, interpolation='nearest'):
+        """
+        Build the table.
+
+        Args:
+            sx, sy: (H, W) canvas pixel shown at each output pixel
+            width, height: Canvas size in pixels
+            interpolation: 'nearest' or 'bilinear'
+        """
+        if interpolation not in WARP_INTERPOLATIONS:
+            raise ValueError(f"Unknown warp interpolation '{interpolation}', expected one of {WARP_INTERPOLATIONS}")
+        self.width = width
+        self.height = height
+        self.interpolation = interpolation
+
+        sx = np.asarray(sx, dtype=np.float64).ravel()
+        sy = np.asarray(sy, dtype=np.float64).ravel()
+        inside = (np.isfinite(sx) & np.isfinite(sy)
+                  & (sx >= -0.5) & (sx <= width - 0.5) & (sy >= -0.5) & (sy <= height - 0.5))
+        sx = np.where(inside, sx, 0.0)
+        sy = np.where(inside, sy, 0.0)
+        self.outside = np.flatnonzero(~inside)
+
+        if interpolation == 'nearest':
+            x = np.clip(np.floor(sx + 0.5), 0, width - 1).astype(np.intp)
+            y = np.clip(np.floor(sy + 0.5), 0, height - 1).astype(np.intp)
+            self.taps = [y * width + x]
+            self.fx = self.fy = None
+        else:
+            sx = np.clip(sx, 0.0, width - 1)
+            sy = np.clip(sy, 0.0, height - 1)
+            x0 = np.minimum(sx.astype(np.intp), max(width - 2, 0))
+            y0 = np.minimum(sy.astype(np.intp), max(height - 2, 0))
+            index = y0 * width + x0
+            self.taps = [index, index + 1, index + width, index + width + 1]
+            # Fractions as (N, 1) so they broadcast over the color channels
+            self.fx = (sx - x0).astype(np.float32)[:, np.newaxis]
+            self.fy = (sy - y0).astype(np.float32)[:, np.newaxis]
+
+        self._output = None  # (H, W, C) warped frame, reused between cooks
+        self._scratch = None  # Two (H*W, C) gather buffers (bilinear)
+
+    def apply(self, canvas):
+        """
+        Warp a canvas.
+
+        Args:
+            canvas: (H, W, C) C-contiguous array of the table's size
+
+        Returns:
+            (H, W, C) warped array (reused between calls)
+        """
+        if canvas.shape[:2] != (self.height, self.width):
+            raise ValueError(f"Canvas is {canvas.shape[1]}x{canvas.shape[0]}, warp table is {self.width}x{self.height}")
+        if self._output is None or self._output.shape != canvas.shape or self._output.dtype != canvas.dtype:
+            self._output = np.empty_like(canvas)
+            self._scratch = None
+        output = self._output
+        source = _pixels(np.ascontiguousarray(canvas))
+        taps = self.taps
+
+        # mode='clip' skips the bounds check (indices are in range by construction)
+        if self.fx is None:
+            np.take(source, taps[0], out=_pixels(output), mode='clip')
+        else:
+            if self._scratch is None:
+                self._scratch = (np.empty_like(canvas), np.empty_like(canvas))
+            top, right = self._scratch
+            channels = canvas.shape[2]
+            flat_top = top.reshape(-1, channels)
+            flat_right = right.reshape(-1, channels)
+            flat_out = output.reshape(-1, channels)
+
+            # Top row: top = t00 + (t01 - t00) * fx
+            np.take(source, taps[0], out=_pixels(top), mode='clip')
+            np.take(source, taps[1], out=_pixels(right), mode='clip')
+            flat_right -= flat_top
+            flat_right *= self.fx
+            flat_top += flat_right
+            # Bottom row, into the output
+            np.take(source, taps[2], out=_pixels(output), mode='clip')
+            np.take(source, taps[3], out=_pixels(right), mode='clip')
+            flat_right -= flat_out
+            flat_right *= self.fx
+            flat_out += flat_right
+            # Between rows: out = top + (bottom - top) * fy
+            flat_out -= flat_top
+            flat_out *= self.fy
+            flat_out += flat_top
+
+        if len(self.outside):
+            pixels = _pixels(output)
+            np.put(pixels, self.outside, np.zeros(1, dtype=pixels.dtype))
+        return output
+
+class WarpStage:
+    """
+    Optional last render stage: remaps the canvas through the calibration
+    in a JSON file, rebuilding the lookup table when the file (or the
+    resolution) changes.
+
+    Calibration file: {"corners": [[x, y] x 4]} (normalized output
+    positions of the canvas corners, TL/TR/BR/BL) or {"mesh": rows x cols
+    grid of normalized [x, y] canvas positions}, plus an optional
+    "interpolation". Without a file the canvas is passed through unchanged.
+    """
+
+    def __init__(self, path, interpolation='nearest', check_interval=1.0, time_source=time.monotonic):
+        """
+        Initialize warp stage.
+
+        Args:
+            path: Calibration JSON file
+            interpolation: Default 'nearest' or 'bilinear' (the file may override)
+            check_interval: Seconds between checks of the file's modification time
+            time_source: Monotonic clock in seconds
+        """
+        self.path = path
+        self.interpolation = interpolation
+        self.check_interval = check_interval
+        self.time_source = time_source
+
+        self.calibration = None  # Loaded calibration dict (None = pass-through)
+        self._mtime = None
+        self._next_check = 0.0
+        self._lut = None
+        self._lut_key = None  # (width, height) the table was built for
+        self.rebuilds = 0
+        self.last_build_ms = 0.0
+        self.error = None  # Last load/build error (calibration is then ignored)
+
+    def set_calibration(self, corners=None, mesh=None, interpolation=None, save=False):
+        """
+        Replace the calibration (e.g. from a Textport or a pin-dragging UI).
+
+        Args:
+            corners: Corner pin (see corner_pin_map)
+            mesh: Warp mesh (see mesh_map)
+            interpolation: Optional 'nearest' / 'bilinear'
+            save: Also write it to the calibration file
+        """
+        calibration = {}
+        if corners is not None:
+            calibration['corners'] = np.asarray(corners, dtype=np.float64).tolist()
+        if mesh is not None:
+            calibration['mesh'] = np.asarray(mesh, dtype=np.float64).tolist()
+        if interpolation is not None:
+            calibration['interpolation'] = interpolation
+        if save:
+            with open(self.path, 'w') as f:
+                json.dump(calibration, f, indent=2)
+            self._mtime = os.path.getmtime(self.path)
+        self.calibration = calibration or None
+        self._lut = None
+        self.error = None
+
+    def _check_file(self):
+        """Reload the calibration file if it appeared, changed or disappeared."""
+        now = self.time_source()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        self._lut = None
+        self.error = None
+        if mtime is None:
+            self.calibration = None
+            return
+        try:
+            with open(self.path) as f:
+                self.calibration = json.load(f)
+        except (OSError, ValueError) as e:
+            self.calibration = None
+            self.error = str(e)
+
+    def build(self, width, height):
+        """Build the lookup table for the current calibration (None = pass-through)."""
+        calibration = self.calibration
+        if not calibration:
+            return None
+        start = time.perf_counter()
+        interpolation = calibration.get('interpolation', self.interpolation)
+        if 'mesh' in calibration:
+            sx, sy = mesh_map(calibration['mesh'], width, height)
+        elif 'corners' in calibration:
+            sx, sy = corner_pin_map(calibration['corners'], width, height)
+        else:
+            raise ValueError("Warp calibration needs 'corners' or 'mesh'")
+        lut = RemapLUT(sx, sy, width, height, interpolation)
+        self.rebuilds += 1
+        self.last_build_ms = (time.perf_counter() - start) * 1000.0
+        return lut
+
+    def apply(self, canvas):
+        """
+        Warp the canvas (or return it unchanged without a calibration).
+
+        Args:
+            canvas: (H, W, C) render canvas
+
+        Returns:
+            Warped canvas (a persistent buffer owned by the stage) or `canvas`
+        """
+        self._check_file()
+        if self.calibration is None or self.error:
+            return canvas
+        height, width = canvas.shape[:2]
+        if self._lut is None or self._lut_key != (width, height):
+            try:
+                self._lut = self.build(width, height)
+            except (ValueError, KeyError, TypeError) as e:
+                self.error = str(e)
+                return canvas
+            self._lut_key = (width, height)
+        return self._lut.apply(canvas)
+
+    def get_stats(self):
+        """Warp state for diagnostics."""
+        lut = self._lut
+        return {
+            'path': self.path,
+            'active': lut is not None and not self.error,
+            'interpolation': lut.interpolation if lut is not None else None,
+            'outside_pixels': int(len(lut.outside)) if lut is not None else 0,
+            'rebuilds': self.rebuilds,
+            'last_build_ms': self.last_build_ms,
+            'error': self.error,
+        }
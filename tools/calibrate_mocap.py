@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Biotelia Pollination System - Mocap Floor Calibration
+
+Fits the tracker -> canvas transform from measured floor points and saves
+it as config.MOCAP_CALIBRATION (calibration.json next to config.py), which
+pollination_system_current applies to every visitor position.
+
+Measure each point by standing a marker on a floor spot, reading the
+tracker coordinates, and noting the canvas pixel the projection shows at
+that spot. Use 4+ points spread toward the corners (homography corrects
+perspective / keystone); 3 points are enough for an affine fit.
+
+Points come from a CSV (tracker_x, tracker_y, canvas_x, canvas_y per line)
+or from --point arguments.
+
+Examples:
+  python tools/calibrate_mocap.py --csv floor_points.csv
+  python tools/calibrate_mocap.py --point 0.1,0.1,96,108 --point 0.9,0.1,1824,108 \\
+      --point 0.9,0.9,1824,2052 --point 0.1,0.9,96,2052
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config
+from ingest.calibration import Calibration, CALIBRATION_KINDS
+
+def read_points(args):
+    rows = []
+    if args.csv:
+        with open(args.csv, newline='') as f:
+            for row in csv.reader(f):
+                if not row or row[0].strip().startswith('#'):
+                    continue
+                try:
+                    rows.append([float(v) for v in row[:4]])
+                except ValueError:
+                    continue  # Header line
+    for point in args.point or ():
+        rows.append([float(v) for v in point.split(',')])
+    if any(len(row) != 4 for row in rows):
+        raise SystemExit("Each point needs tracker_x, tracker_y, canvas_x, canvas_y")
+    return [row[:2] for row in rows], [row[2:] for row in rows]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fit the mocap floor calibration from measured points.")
+    parser.add_argument('--csv', help="CSV of tracker_x, tracker_y, canvas_x, canvas_y")
+    parser.add_argument('--point', action='append', help="One point as tracker_x,tracker_y,canvas_x,canvas_y")
+    parser.add_argument('--kind', choices=CALIBRATION_KINDS, default='homography', help="Transform to fit")
+    parser.add_argument('--output', default=os.path.join(ROOT, config.MOCAP_CALIBRATION or 'calibration.json'),
+                        help="Calibration file to write")
+    args = parser.parse_args(argv)
+
+    src, dst = read_points(args)
+    try:
+        calibration = Calibration.fit(src, dst, args.kind)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+
+    for (sx, sy), (dx, dy), error in zip(src, dst, calibration.residuals()):
+        print(f"  ({sx:9.3f}, {sy:9.3f}) -> ({dx:7.1f}, {dy:7.1f})  error {error:6.2f} px")
+    calibration.save(args.output)
+    print(f"✓ {args.kind} calibration from {len(src)} points, RMS error {calibration.rms_error():.2f} px "
+          f"-> {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
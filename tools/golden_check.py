@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Biotelia Pollination System - Golden-Image Check
+
+Renders fixed-seed, fixed-time canonical scenes through the reference
+draw_circle* path and through a candidate fast path, compares them with
+per-pixel and perceptual (SSIM) metrics and writes diff heatmaps.
+Exits with status 1 if any comparison is outside tolerance.
+
+Examples:
+  python tools/golden_check.py --candidate culled
+  python tools/golden_check.py --candidate uint8 --max-abs 3 --heatmaps golden/uint8
+  python tools/golden_check.py --candidate mypkg.fast:render --scenes crowd_9 --times 100 101.5
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.scenes import SCENES, RESOLUTIONS, build_scene
+from rendering.golden import (DEFAULT_TOLERANCES, render_reference, resolve_candidate,
+                              compare_images, check_tolerances, diff_heatmap)
+from rendering.headless import write_png
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a candidate renderer against the reference path.")
+    parser.add_argument('--candidate', default='culled',
+                        help="Candidate name (culled, uint8, float16) or module:function")
+    parser.add_argument('--scenes', nargs='+', choices=sorted(SCENES), default=list(SCENES))
+    parser.add_argument('--resolution', choices=sorted(RESOLUTIONS), default='test')
+    parser.add_argument('--times', nargs='+', type=float, default=[100.0, 103.7],
+                        help="Animation times to render (seconds)")
+    parser.add_argument('--max-abs', type=float, default=DEFAULT_TOLERANCES['max_abs'] * 255,
+                        help="Max per-channel error (in 8-bit steps)")
+    parser.add_argument('--mean-abs', type=float, default=DEFAULT_TOLERANCES['mean_abs'] * 255,
+                        help="Max mean error (in 8-bit steps)")
+    parser.add_argument('--bad-fraction', type=float, default=DEFAULT_TOLERANCES['bad_fraction'])
+    parser.add_argument('--min-psnr', type=float, default=DEFAULT_TOLERANCES['min_psnr'])
+    parser.add_argument('--min-ssim', type=float, default=DEFAULT_TOLERANCES['min_ssim'])
+    parser.add_argument('--heatmaps', help="Directory for diff heatmaps (and a report.json)")
+    parser.add_argument('--gain', type=float, default=32.0, help="Heatmap error gain")
+    args = parser.parse_args(argv)
+
+    tolerances = {
+        'max_abs': args.max_abs / 255.0,
+        'mean_abs': args.mean_abs / 255.0,
+        'bad_fraction': args.bad_fraction,
+        'min_psnr': args.min_psnr,
+        'min_ssim': args.min_ssim,
+    }
+    candidate = resolve_candidate(args.candidate)
+    width, height = RESOLUTIONS[args.resolution]
+    if args.heatmaps:
+        os.makedirs(args.heatmaps, exist_ok=True)
+
+    report = []
+    failed = 0
+    for scene in args.scenes:
+        for flow_time in args.times:
+            # Both paths render the same fixed-seed scene (renderers don't modify render_data)
+            render_data, _ = build_scene(scene, width, height)
+            reference = render_reference(render_data, flow_time, width, height)
+            image = candidate(render_data, flow_time, width, height)
+
+            metrics, error_map = compare_images(reference, image)
+            failures = check_tolerances(metrics, tolerances)
+            failed += bool(failures)
+            report.append({'scene': scene, 'time': flow_time, 'metrics': metrics, 'failures': failures})
+
+            status = "FAIL" if failures else "ok"
+            print(f"{status:>4} {scene:>14} t={flow_time:<7g} max {metrics['max_abs'] * 255:5.2f}/255  "
+                  f"mean {metrics['mean_abs'] * 255:6.3f}/255  psnr {metrics['psnr']:6.1f}  "
+                  f"ssim {metrics['ssim']:.5f}" + (f"  ({'; '.join(failures)})" if failures else ""))
+
+            if args.heatmaps:
+                name = f"{scene}_t{flow_time:g}".replace('.', '_')
+                write_png(os.path.join(args.heatmaps, name + '_diff.png'), diff_heatmap(error_map, args.gain))
+
+    if args.heatmaps:
+        with open(os.path.join(args.heatmaps, 'report.json'), 'w') as f:
+            json.dump({'candidate': args.candidate, 'resolution': args.resolution,
+                       'tolerances': tolerances, 'results': report}, f, indent=2)
+
+    total = len(report)
+    print(f"\n{'✓' if not failed else '✗'} {total - failed}/{total} comparisons within tolerance")
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Biotelia Pollination System - Headless Offline Renderer
+
+Drives PollinationSystem and the production NumPy renderer
+(improved_rendering.py) without TouchDesigner, writing frames and
+per-frame timings to disk.
+
+Examples:
+  python tools/render_offline.py --scenario crowd --frames 300 --out renders/crowd
+  python tools/render_offline.py --input visitors.json --write raw --out renders/replay
+  python tools/render_offline.py --resolution production --write none --out renders/prof
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+# Run from anywhere: project root holds config.py, core/ and rendering/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import config
+from core import PollinationSystem
+from rendering.headless import (HeadlessRenderer, ScriptedInput, RecordedInput,
+                                StandInSettings, write_png)
+
+# Built-in scenarios: number of scripted visitors
+SCENARIOS = {
+    'empty': 0,
+    'single': 1,
+    'crowd': 9,
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render Biotelia frames headlessly.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--scenario', choices=sorted(SCENARIOS), default='single',
+                        help="Built-in scripted scenario (default: single)")
+    source.add_argument('--input', help="Recorded visitor positions (JSON or .bmoc mocap session)")
+    parser.add_argument('--frames', type=int, default=None,
+                        help="Frames to render (default: 120, or the recording length)")
+    parser.add_argument('--agents', action='store_true', help="Add bee, butterfly and moth agents")
+    parser.add_argument('--resolution', choices=['test', 'production'], default='test')
+    parser.add_argument('--output-format', choices=['uint8', 'float16', 'float32'],
+                        default=config.OUTPUT_FORMAT)
+    parser.add_argument('--no-dither', action='store_true', help="Disable ordered dithering")
+    parser.add_argument('--write', choices=['png', 'raw', 'none'], default='png',
+                        help="Frame output (raw = output array bytes, none = timings only)")
+    parser.add_argument('--every', type=int, default=1, help="Write every Nth frame")
+    parser.add_argument('--fps', type=float, default=60.0)
+    parser.add_argument('--seed', type=int, default=0, help="Simulation seed (agents and dances)")
+    parser.add_argument('--out', required=True, help="Output directory")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    production = args.resolution == 'production'
+    width = config.PRODUCTION_WIDTH if production else config.TEST_WIDTH
+    height = config.PRODUCTION_HEIGHT if production else config.TEST_HEIGHT
+
+    system = PollinationSystem(
+        canvas_width=width,
+        canvas_height=height,
+        structures_config=config.STRUCTURES,
+        mycelium_seed=config.MYCELIUM_SEED,
+        seed=args.seed
+    )
+    if args.agents:
+        for agent_type in ('bee', 'butterfly', 'moth'):
+            system.add_autonomous_agent(agent_type)
+
+    if args.input:
+        input_source = RecordedInput.load(args.input)
+        frames = args.frames if args.frames is not None else len(input_source)
+    else:
+        input_source = ScriptedInput(width, height, num_visitors=SCENARIOS[args.scenario])
+        frames = args.frames if args.frames is not None else 120
+
+    settings = StandInSettings(
+        Resmode=args.resolution,
+        Outputformat=args.output_format,
+        Dither=not args.no_dither,
+    )
+    renderer = HeadlessRenderer(system, input_source, settings=settings, fps=args.fps)
+
+    os.makedirs(args.out, exist_ok=True)
+    timings_path = os.path.join(args.out, 'timings.csv')
+    layer_names = [layer.name for layer in renderer.renderer._get_layer_stack(config).layers]
+
+    print(f"Rendering {frames} frames at {width}x{height} ({args.output_format}) -> {args.out}")
+    cook_ms = []
+    with open(timings_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['frame', 'update_ms', 'render_ms', 'cook_ms'] + [f'{n}_ms' for n in layer_names])
+
+        for i in range(frames):
+            frame, timing = renderer.render_frame()
+            cook_ms.append(timing['cook_ms'])
+            layers = timing['layers']
+            writer.writerow(
+                [i, f"{timing['update_ms']:.3f}", f"{timing['render_ms']:.3f}", f"{timing['cook_ms']:.3f}"] +
+                [f"{layers[n]['ms']:.3f}" for n in layer_names])
+
+            if args.write != 'none' and i % args.every == 0:
+                name = os.path.join(args.out, f'frame_{i:05d}')
+                if args.write == 'png':
+                    write_png(name + '.png', frame)
+                else:
+                    frame.tofile(name + '.raw')
+
+            if (i + 1) % 60 == 0:
+                print(f"  {i + 1}/{frames} frames...")
+
+    with open(os.path.join(args.out, 'frames.json'), 'w') as f:
+        json.dump({
+            'frames': frames,
+            'every': args.every,
+            'width': width,
+            'height': height,
+            'channels': 4,
+            'dtype': args.output_format,
+            'fps': args.fps,
+            'write': args.write,
+        }, f, indent=2)
+
+    cook_ms = np.array(cook_ms)
+    if len(cook_ms):
+        print(f"✓ Done: cook median {np.median(cook_ms):.1f} ms, "
+              f"p95 {np.percentile(cook_ms, 95):.1f} ms, max {cook_ms.max():.1f} ms")
+    print(f"  Timings: {timings_path}")
+
+if __name__ == '__main__':
+    main()
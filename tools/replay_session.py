@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Biotelia Pollination System - Deterministic Session Replay
+
+Replays a recorded mocap session (.bmoc) through PollinationSystem as
+fast as possible, taking state-hash checkpoints every N frames. Save the
+checkpoints once, then verify later runs (after a code change, on another
+machine) against them; the first mismatching checkpoint is reported.
+
+Examples:
+  python tools/replay_session.py recordings/session.bmoc --save replay/session.json
+  python tools/replay_session.py recordings/session.bmoc --verify replay/session.json
+  python tools/replay_session.py recordings/session.bmoc --twice
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingest.replay import ReplayDriver, compare_checkpoints, save_checkpoints, load_checkpoints
+
+def replay(path, args):
+    driver = ReplayDriver.load(path, checkpoint_every=args.checkpoint_every)
+    result = driver.run(frames=args.frames)
+    print(f"Replayed {result['frames']} frames in {result['wall_s']:.2f} s "
+          f"({result['speedup']:.1f}x real time), final hash {result['final_hash']}")
+    if not result['exact']:
+        print("  ! Recording started mid-session: replay is consistent but does not match the live run")
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a mocap session deterministically.")
+    parser.add_argument('session', help="Session file (.bmoc)")
+    parser.add_argument('--checkpoint-every', type=int, default=60, help="Frames between state hashes")
+    parser.add_argument('--frames', type=int, help="Replay only the first N frames")
+    parser.add_argument('--save', help="Write checkpoints to JSON")
+    parser.add_argument('--verify', help="Compare checkpoints with a saved JSON")
+    parser.add_argument('--twice', action='store_true', help="Replay twice and compare (determinism check)")
+    args = parser.parse_args(argv)
+
+    result = replay(args.session, args)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        save_checkpoints(args.save, result)
+        print(f"✓ {len(result['checkpoints'])} checkpoints written to {args.save}")
+
+    expected = None
+    if args.twice:
+        expected = replay(args.session, args)['checkpoints']
+    elif args.verify:
+        expected = load_checkpoints(args.verify)
+
+    if expected is not None:
+        mismatch = compare_checkpoints(expected, result['checkpoints'])
+        if mismatch is not None:
+            frame, want, got = mismatch
+            print(f"✗ State diverges by frame {frame}: expected {want}, got {got}")
+            return 1
+        print(f"✓ All {len(expected)} checkpoints match")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())